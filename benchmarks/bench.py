@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Benchmarks of columns_framework rendering and the main.py pipeline.
+
+Every fixture is synthetic and generated on the fly, so the suite runs fully
+offline: layouts with many columns, long tables, Plotly figures of 10k to 1M
+points, Matplotlib figures, and directories of generated notebooks with a
+configurable size and output mix for ``find_notebooks``,
+``check_all_notebooks`` and ``execute_all_notebooks`` (on trivial cells).
+
+Usage:
+    python benchmarks/bench.py run [--quick] [--only PATTERN] [--output FILE]
+    python benchmarks/bench.py compare BASELINE CURRENT [--threshold 0.10]
+
+``run`` writes a JSON result file (by default ``benchmarks/results/<timestamp>.json``);
+keep one as the baseline. ``compare`` prints the change of every benchmark's
+fastest time and exits with status 1 when any got slower than the threshold.
+Timings depend on the machine, so compare results from the same host.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+sys.path.insert(0, str(REPO_ROOT))
+
+# name -> (group, setup, repeat); setup(options) returns the callable to time
+BENCHMARKS: Dict[str, tuple] = {}
+
+
+def benchmark(name: str, group: str, repeat: Optional[int] = None):
+    """Register a benchmark whose function prepares fixtures and returns the timed callable."""
+
+    def register(setup: Callable):
+        BENCHMARKS[name] = (group, setup, repeat)
+        return setup
+
+    return register
+
+
+def measure(func: Callable[[], object], repeat: int, warmup: bool = True) -> dict:
+    """Wall times of ``repeat`` calls of ``func``, after one untimed call."""
+    if warmup:
+        func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "repeat": repeat,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Rendering fixtures
+# ---------------------------------------------------------------------------
+
+
+def _render_quietly(container):
+    """Render a container, returning its HTML instead of displaying it."""
+    return container.to_html()
+
+
+def _line_figure(points: int):
+    import numpy as np
+    import plotly.graph_objects as go
+
+    rng = np.random.default_rng(0)
+    x = np.arange(points, dtype=float)
+    y = np.cumsum(rng.standard_normal(points))
+    return go.Figure(go.Scatter(x=x, y=y, mode="lines"))
+
+
+def _frame(rows: int, columns: int = 8):
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.standard_normal((rows, columns)), columns=[f"c{i}" for i in range(columns)])
+    frame["label"] = [f"row {i}" for i in range(rows)]
+    frame.iloc[::17, 0] = np.nan
+    return frame
+
+
+@benchmark("render.columns_many", "render")
+def bench_columns_many(options):
+    from tulip_mania_next.columns_framework import columns
+
+    count = 10 if options.quick else 50
+
+    def run():
+        cols = columns(count, border=True)
+        for index, col in enumerate(cols):
+            col.header(f"Column {index}")
+            col.markdown("Some **bold** and *italic* text " * 5)
+            col.html("<ul>" + "".join(f"<li>item {i}</li>" for i in range(20)) + "</ul>")
+        return _render_quietly(cols.container)
+
+    return run
+
+
+@benchmark("render.table_1k", "render")
+def bench_table_1k(options):
+    from tulip_mania_next.columns_framework import Column
+
+    frame = _frame(200 if options.quick else 1000)
+    formats = {"*": ",.2f", "c0": "{:.1%}"}
+
+    def run():
+        col = Column("bench", 1)
+        col.table(frame, formats=formats)
+        return col._get_html()
+
+    return run
+
+
+@benchmark("render.table_paged_10k", "render")
+def bench_table_paged(options):
+    from tulip_mania_next.columns_framework import Column
+
+    frame = _frame(2000 if options.quick else 10000)
+
+    def run():
+        col = Column("bench", 1)
+        col.table(frame, formats={"*": ",.2f"})
+        return col._get_html()
+
+    return run
+
+
+def _plotly_benchmark(points: int, quick_points: int, decimate: bool):
+    def setup(options):
+        from tulip_mania_next import columns_framework
+        from tulip_mania_next.columns_framework import Column
+
+        figure = _line_figure(quick_points if options.quick else points)
+
+        def run():
+            saved = dict(columns_framework.OPTIONS)
+            columns_framework.configure(decimate=decimate)
+            try:
+                col = Column("bench", 1)
+                col.plotly(figure)
+                return col._get_html()
+            finally:
+                columns_framework.OPTIONS.update(saved)
+
+        return run
+
+    return setup
+
+
+benchmark("render.plotly_10k", "render")(_plotly_benchmark(10_000, 10_000, decimate=False))
+benchmark("render.plotly_100k", "render")(_plotly_benchmark(100_000, 50_000, decimate=False))
+benchmark("render.plotly_1m", "render", repeat=3)(_plotly_benchmark(1_000_000, 200_000, decimate=False))
+benchmark("render.plotly_1m_decimated", "render", repeat=3)(_plotly_benchmark(1_000_000, 200_000, decimate=True))
+
+
+@benchmark("render.matplotlib", "render")
+def bench_matplotlib(options):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import numpy as np
+
+    from tulip_mania_next.columns_framework import Column
+
+    points = 10_000 if options.quick else 100_000
+    figure, axes = plt.subplots(2, 2, figsize=(10, 6))
+    rng = np.random.default_rng(0)
+    for ax in axes.flat:
+        ax.plot(np.cumsum(rng.standard_normal(points)))
+        ax.set_title("series")
+
+    def run():
+        col = Column("bench", 1)
+        col.matplotlib(figure, dpi=100)
+        return col._get_html()
+
+    return run
+
+
+# ---------------------------------------------------------------------------
+# Pipeline fixtures
+# ---------------------------------------------------------------------------
+
+
+def make_notebooks(
+    directory: Path,
+    count: int,
+    cells: int,
+    outputs: str = "text,html,plotly",
+    html_kb: int = 20,
+    error_every: int = 10,
+    code: str = "1 + 1",
+) -> List[Path]:
+    """
+    Write ``count`` executed-looking notebooks of ``cells`` code cells each.
+
+    Args:
+        outputs: Comma-separated output kinds cycled over the cells
+            ("text", "html", "plotly", "png")
+        html_kb: Approximate size of each HTML and Plotly output
+        error_every: Every n-th notebook ends with an error output (0: none)
+        code: Source of every code cell
+    """
+    import base64
+
+    import nbformat
+
+    kinds = [kind for kind in outputs.split(",") if kind]
+    blob = "x" * (html_kb * 1024)
+    png = base64.b64encode(os.urandom(html_kb * 256)).decode("ascii")
+
+    paths = []
+    directory.mkdir(parents=True, exist_ok=True)
+    for number in range(count):
+        nb = nbformat.v4.new_notebook()
+        nb.cells.append(nbformat.v4.new_markdown_cell(f"# Notebook {number}"))
+        for index in range(cells):
+            cell = nbformat.v4.new_code_cell(code, execution_count=index + 1)
+            kind = kinds[index % len(kinds)] if kinds else None
+            if kind == "text":
+                cell.outputs = [nbformat.v4.new_output("stream", name="stdout", text="value\n" * 20)]
+            elif kind == "html":
+                cell.outputs = [nbformat.v4.new_output(
+                    "display_data", data={"text/html": f"<div>{blob}</div>", "text/plain": "<HTML>"}
+                )]
+            elif kind == "plotly":
+                cell.outputs = [nbformat.v4.new_output(
+                    "display_data",
+                    data={"application/vnd.plotly.v1+json": {"data": [{"y": [1.5] * (html_kb * 200)}]},
+                          "text/plain": "<Figure>"},
+                )]
+            elif kind == "png":
+                cell.outputs = [nbformat.v4.new_output("display_data", data={"image/png": png})]
+            nb.cells.append(cell)
+        if error_every and number % error_every == error_every - 1:
+            nb.cells[-1].outputs.append(nbformat.v4.new_output(
+                "error", ename="ValueError", evalue="synthetic", traceback=["ValueError: synthetic"]
+            ))
+        path = directory / f"nb_{number:04d}.ipynb"
+        nbformat.write(nb, str(path))
+        paths.append(path)
+    return paths
+
+
+class _InDirectory:
+    """Temporary project directory with generated notebooks; main.py works relative to cwd."""
+
+    def __init__(self):
+        self._tmp = tempfile.TemporaryDirectory(prefix="tmn-bench-")
+        self.path = Path(self._tmp.name)
+        self._cwd = os.getcwd()
+        os.chdir(self.path)
+
+    def close(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+
+_FIXTURES: List[_InDirectory] = []
+
+
+def _project(options, **kwargs) -> List[Path]:
+    project = _InDirectory()
+    _FIXTURES.append(project)
+    return make_notebooks(project.path / "notebooks", **kwargs)
+
+
+@benchmark("pipeline.find_notebooks", "pipeline")
+def bench_find_notebooks(options):
+    import main
+
+    _project(options, count=options.notebooks, cells=2, outputs="text")
+    for folder in range(20):
+        (Path("notebooks") / f"folder{folder}" / ".ipynb_checkpoints").mkdir(parents=True)
+    return main.find_notebooks
+
+
+@benchmark("pipeline.check_all_notebooks", "pipeline")
+def bench_check_all_notebooks(options):
+    import main
+
+    notebooks = _project(
+        options, count=options.notebooks, cells=options.cells, outputs=options.outputs, html_kb=options.output_kb
+    )
+    return lambda: main.check_all_notebooks(notebooks, max_workers=options.workers)
+
+
+@benchmark("pipeline.execute_all_notebooks", "pipeline", repeat=1)
+def bench_execute_all_notebooks(options):
+    import main
+
+    notebooks = _project(
+        options, count=max(2, options.notebooks // 10), cells=options.cells, outputs="", error_every=0
+    )
+    return lambda: main.execute_all_notebooks(notebooks, max_workers=options.workers, timeout=60)
+
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(options) -> int:
+    results = {}
+    selected = [
+        name for name in BENCHMARKS
+        if not options.only or any(pattern in name for pattern in options.only)
+    ]
+    for name in selected:
+        group, setup, repeat = BENCHMARKS[name]
+        if group == "pipeline" and options.skip_execute and name.endswith("execute_all_notebooks"):
+            continue
+        try:
+            func = setup(options)
+            result = measure(func, repeat or options.repeat, warmup=repeat != 1)
+        except ImportError as e:
+            print(f"{name:<36} skipped ({e})")
+            continue
+        finally:
+            while _FIXTURES:
+                _FIXTURES.pop().close()
+        results[name] = result
+        print(f"{name:<36} min {result['min'] * 1000:10.1f} ms   median {result['median'] * 1000:10.1f} ms")
+
+    output = Path(options.output) if options.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": options.quick,
+            "notebooks": options.notebooks,
+            "cells": options.cells,
+            "outputs": options.outputs,
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {output}")
+    return 0
+
+
+def compare(options) -> int:
+    with open(options.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(options.current, "r", encoding="utf-8") as f:
+        current = json.load(f)
+
+    for key in ("quick", "notebooks", "cells", "outputs"):
+        if baseline["meta"].get(key) != current["meta"].get(key):
+            print(f"Warning: runs differ in {key} ({baseline['meta'].get(key)} vs {current['meta'].get(key)})")
+
+    regressions = []
+    print(f"{'benchmark':<36} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        before = baseline["results"].get(name)
+        after = current["results"].get(name)
+        if before is None or after is None:
+            print(f"{name:<36} {'only in ' + ('current' if before is None else 'baseline'):>34}")
+            continue
+        change = after["min"] / before["min"] - 1 if before["min"] else 0.0
+        flag = ""
+        if change > options.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -options.threshold:
+            flag = "  faster"
+        print(
+            f"{name:<36} {before['min'] * 1000:10.1f}ms {after['min'] * 1000:10.1f}ms "
+            f"{change:+8.1%}{flag}"
+        )
+
+    if regressions:
+        print(f"{len(regressions)} benchmarks slower than the {options.threshold:.0%} threshold")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark columns_framework and the main.py pipeline")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--quick", action="store_true", help="Smaller fixtures for a fast sanity run")
+    run_parser.add_argument("--only", action="append", metavar="PATTERN",
+                            help="Only run benchmarks whose name contains PATTERN (repeatable)")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed calls per benchmark (default: 5)")
+    run_parser.add_argument("--output", help="Result file (default: benchmarks/results/<timestamp>.json)")
+    run_parser.add_argument("--notebooks", type=int, default=None,
+                            help="Generated notebooks for the pipeline benchmarks (default: 100, 20 with --quick)")
+    run_parser.add_argument("--cells", type=int, default=20, help="Code cells per generated notebook (default: 20)")
+    run_parser.add_argument("--outputs", default="text,html,plotly",
+                            help="Output kinds cycled over the cells: text, html, plotly, png (default: text,html,plotly)")
+    run_parser.add_argument("--output-kb", type=int, default=20, help="Size of each rich output in KB (default: 20)")
+    run_parser.add_argument("--workers", type=int, default=None, help="Worker processes of the pipeline benchmarks")
+    run_parser.add_argument("--skip-execute", action="store_true", help="Skip execute_all_notebooks (starts kernels)")
+
+    compare_parser = commands.add_parser("compare", help="Compare a result file against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="Relative slowdown reported as a regression (default: 0.10)")
+
+    options = parser.parse_args()
+    if options.command == "run":
+        if options.notebooks is None:
+            options.notebooks = 20 if options.quick else 100
+        return run(options)
+    return compare(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
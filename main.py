@@ -8,16 +8,37 @@ This script provides utilities for:
 - Building the book with proper logging
 """
 
+import os
 import sys
 import time
 import logging
 import argparse
+import contextlib
 from datetime import datetime
 from pathlib import Path
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from typing import List, Tuple, Optional
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, List, Set, Tuple, Optional
 import multiprocessing
 
+from tulip_mania_next import data_cache
+from tulip_mania_next.async_engine import run_notebooks
+from tulip_mania_next.book_build import PipelinedBuilder, run_book_build
+from tulip_mania_next.cell_cache import CellCache, execute_memoized
+from tulip_mania_next.discovery import changed_since, matches, toc_notebooks, walk_notebooks
+from tulip_mania_next.exec_cache import ExecutionCache, atomic_write_json
+from tulip_mania_next.image_assets import prune_assets, publish_assets
+from tulip_mania_next.notebook_io import write_notebook
+from tulip_mania_next.output_audit import AUDIT_REPORT, OutputBudgets, audit_notebook_outputs, format_bytes
+from tulip_mania_next.output_store import DEFAULT_STORE_DIR, MissingBlob, OutputStore, unpublished_reason
+from tulip_mania_next.parameters import DEFAULT_MATRIX, load_matrix, materialize, without_rendered
+from tulip_mania_next.notebook_scan import ScanIndex, scan_notebook_errors
+from tulip_mania_next.kernel_pool import PROBE, init_worker_pool, get_worker_pool, start_kernel
+from tulip_mania_next.memory import KernelWatchdog, MemoryAdmission, kernel_pid
+from tulip_mania_next.run_journal import DEFAULT_RETRY_PATTERNS, RetryPolicy, RunJournal, error_summary
+from tulip_mania_next.profiling import PROFILE_PATH, append_profile, cell_records, load_profile, summarize_profile
+from tulip_mania_next.telemetry import METRICS_DIR, BuildTelemetry
+from tulip_mania_next.scheduling import DurationHistory, order_longest_first, predict_makespan
+
 
 class ElapsedFilter(logging.Filter):
     """Filter that adds elapsed time to log records."""
@@ -79,12 +100,17 @@ def setup_logging(start_time):
     return logger
 
 
-def find_notebooks(exclude_patterns: Optional[List[str]] = None) -> List[Path]:
+def find_notebooks(exclude_patterns: Optional[List[str]] = None, use_toc: bool = True) -> List[Path]:
     """
-    Find all Jupyter notebooks in the project.
+    Find the Jupyter notebooks of the project.
+
+    The notebooks published by the table of contents (``myst.yml``/``toc.yml``)
+    are used when there is one; otherwise the project tree is walked, never
+    descending into build output, VCS metadata or virtual environments.
 
     Args:
         exclude_patterns: List of path patterns to exclude (default: ['_build', '.ipynb_checkpoints'])
+        use_toc: Resolve the table of contents instead of walking the whole tree
 
     Returns:
         List of Path objects for found notebooks
@@ -93,68 +119,256 @@ def find_notebooks(exclude_patterns: Optional[List[str]] = None) -> List[Path]:
         exclude_patterns = ['_build', '.ipynb_checkpoints']
 
     project_root = Path.cwd()
-    notebooks = []
+    notebooks = toc_notebooks(project_root) if use_toc else None
+    if notebooks is None:
+        notebooks = walk_notebooks(project_root)
 
-    for notebook_path in project_root.rglob("*.ipynb"):
+    return [
+        notebook_path for notebook_path in notebooks
         # Check if any exclude pattern is in the path
-        if any(pattern in str(notebook_path) for pattern in exclude_patterns):
-            continue
-        notebooks.append(notebook_path)
+        if not any(pattern in str(notebook_path) for pattern in exclude_patterns)
+    ]
+
+
+def select_notebooks(
+    notebooks: List[Path],
+    cache: Optional[ExecutionCache] = None,
+    only: Optional[List[str]] = None,
+    force: bool = False,
+    logger: Optional[logging.Logger] = None,
+    changed: Optional[Set[Path]] = None,
+) -> List[Path]:
+    """
+    Select the notebooks that need to be executed.
 
-    return sorted(notebooks)
+    Notebooks matching ``only`` or among ``changed`` are always executed (when
+    both are given, those matching both). Otherwise, notebooks whose last run
+    was clean and whose fingerprint is unchanged are skipped, unless ``force``
+    is set.
 
+    Args:
+        notebooks: Candidate notebook paths
+        cache: Execution manifest (None disables skipping)
+        only: Path substrings or globs restricting and forcing execution
+        force: Execute every notebook regardless of the manifest
+        logger: Logger instance for output
+        changed: Files changed since a git ref, restricting and forcing execution
 
-def execute_notebook(notebook_path: Path, timeout: int = 600) -> Tuple[Path, bool, str]:
+    Returns:
+        List of notebook paths to execute
+    """
+    if only or changed is not None:
+        selected = list(notebooks)
+        if only:
+            selected = [nb for nb in selected if any(matches(nb, pattern) for pattern in only)]
+            if logger:
+                logger.info(f"Selected {len(selected)} notebooks matching --only {only}")
+        if changed is not None:
+            selected = [nb for nb in selected if nb.resolve() in changed]
+            if logger:
+                logger.info(f"Selected {len(selected)} changed notebooks")
+        return selected
+
+    if force or cache is None:
+        return list(notebooks)
+
+    stale = []
+    for nb in notebooks:
+        if cache.is_fresh(nb):
+            if logger:
+                logger.info(f"↷ Unchanged, skipping: {nb.relative_to(Path.cwd())}")
+        else:
+            stale.append(nb)
+
+    if logger:
+        logger.info(f"Skipping {len(notebooks) - len(stale)} unchanged notebooks")
+    return stale
+
+
+def execute_notebook(
+    notebook_path: Path,
+    timeout: int = 600,
+    profile: bool = False,
+    extra_arguments: Optional[List[str]] = None,
+    output_store: Optional[OutputStore] = None,
+    memoize: Optional[dict] = None,
+    memory: Optional[dict] = None
+) -> Tuple[Path, bool, str, dict]:
     """
     Execute a single notebook in-place using nbclient.
 
+    When the worker was initialised with a kernel pool (see ``--kernel-pool``),
+    the notebook runs on a warm pooled kernel instead of a freshly started one.
+
     Args:
         notebook_path: Path to the notebook
         timeout: Timeout in seconds for notebook execution
+        profile: Record per-cell wall time, memory and output size
+        extra_arguments: Extra command line arguments for kernels started for this notebook
+        output_store: When given, large outputs are moved to this store before writing
+        memoize: Options of ``execute_memoized`` (``seed``, ``checkpoint_seconds``);
+            when given, only the cells from the first changed code cell on are run
+        memory: Memory options; ``limit_mb`` (optional) caps the kernel's memory,
+            killing the kernel and failing the notebook above it
 
     Returns:
-        Tuple of (notebook_path, success, error_message)
+        Tuple of (notebook_path, success, error_message, stats) where stats
+        holds:
+
+            started_at: Start time (epoch seconds)
+            elapsed: Wall time in seconds
+            kernel_start: Seconds spent starting or acquiring the kernel
+            peak_rss_mb: Peak memory of the kernel in MB
+            written: Whether the notebook was written back
+            bytes_written: Bytes written
+            cells: Per-cell profile records (when profiling)
+            memo: Reused and executed cell counts (when memoizing)
     """
+    stats = {"started_at": time.time()}
+    start = time.perf_counter()
+    path, success, error_msg = _run_notebook(
+        notebook_path, timeout, stats, profile, extra_arguments, output_store, memoize, memory
+    )
+    stats["elapsed"] = time.perf_counter() - start
+    return path, success, error_msg, stats
+
+
+def _run_notebook(
+    notebook_path: Path,
+    timeout: int,
+    stats: dict,
+    profile: bool = False,
+    extra_arguments: Optional[List[str]] = None,
+    output_store: Optional[OutputStore] = None,
+    memoize: Optional[dict] = None,
+    memory: Optional[dict] = None
+) -> Tuple[Path, bool, str]:
+    """Execute a notebook and write it back, filling ``stats`` along the way."""
+    pool = get_worker_pool()
+    kernel = None
+    watchdog = None
+    healthy = False
+
     try:
         import nbformat
         from nbclient import NotebookClient
         from nbclient.exceptions import CellExecutionError
 
-        # Read the notebook
+        # Read the notebook, keeping its text to tell whether execution changed it
         with open(notebook_path, 'r', encoding='utf-8') as f:
-            nb = nbformat.read(f, as_version=4)
+            original = f.read()
+        nb = nbformat.reads(original, as_version=4)
+
+        # Execute the notebook on a pooled kernel if available. Profiling, memoizing
+        # and capping memory need a kernel we control, so start one up front when there is no pool.
+        kernel_start = time.perf_counter()
+        if pool is not None:
+            kernel = pool.acquire()
+        elif profile or memoize is not None or memory is not None:
+            kernel = start_kernel(extra_arguments=extra_arguments)
+        if kernel:
+            stats["kernel_start"] = time.perf_counter() - kernel_start
+
+        # The kernel's peak memory is always recorded; memory options add a cap
+        watchers = contextlib.ExitStack()
+
+        def watch(km):
+            nonlocal watchdog
+            pid = kernel_pid(km)
+            if pid is not None:
+                watchdog = watchers.enter_context(KernelWatchdog(pid, limit_mb=(memory or {}).get("limit_mb")))
 
-        # Execute the notebook
         client = NotebookClient(
             nb,
+            km=kernel.km if kernel else None,
             timeout=timeout,
             kernel_name='python3',
+            extra_arguments=list(extra_arguments or []),
             allow_errors=False  # Stop on first error
         )
+        if kernel:
+            client.kc = kernel.kc
+        else:
+            def kernel_ready(notebook):
+                # nbclient started the kernel itself
+                stats["kernel_start"] = time.perf_counter() - kernel_start
+                watch(client.km)
 
-        try:
-            client.execute()
+            client.on_notebook_start = kernel_ready
+        if profile:
+            kernel.execute_silent(f"{PROBE}.install_cell_probe()")
 
-            # Write the executed notebook back
-            with open(notebook_path, 'w', encoding='utf-8') as f:
-                nbformat.write(nb, f)
+        try:
+            try:
+                with watchers:
+                    if kernel:
+                        watch(kernel.km)
+                    if memoize is not None:
+                        cell_cache = CellCache(Path(notebook_path).resolve().relative_to(Path.cwd()).as_posix())
+                        stats["memo"] = execute_memoized(client, kernel, cell_cache, **memoize)
+                    else:
+                        client.execute()
+            finally:
+                if watchdog is not None:
+                    stats["peak_rss_mb"] = watchdog.peak_mb
+                if profile and not (watchdog and watchdog.exceeded) and kernel.km is not None and kernel.km.has_kernel:
+                    probes = kernel.execute_silent(
+                        "", user_expressions={"cells": f"{PROBE}.collect_cell_probe()"}
+                    )["cells"]
+                    stats["cells"] = cell_records(
+                        nb, Path(notebook_path).relative_to(Path.cwd()).as_posix(), probes
+                    )
+            healthy = True
+
+            if output_store is not None:
+                stats["output_store"] = output_store.dehydrate(nb)
+
+            # Write the executed notebook back unless only volatile details changed
+            stats["written"] = write_notebook(nb, notebook_path, original)
+            stats["bytes_written"] = os.path.getsize(notebook_path) if stats["written"] else 0
 
             return (notebook_path, True, "")
 
         except CellExecutionError as e:
+            # The kernel finished the failing cell normally and can be reused
+            healthy = True
             error_msg = f"Cell execution error: {str(e)}"
             return (notebook_path, False, error_msg)
 
     except Exception as e:
+        if watchdog is not None and watchdog.exceeded:
+            return (notebook_path, False, watchdog.message())
         error_msg = f"Unexpected error: {str(e)}"
         return (notebook_path, False, error_msg)
 
+    finally:
+        if kernel is not None:
+            if pool is not None:
+                pool.release(kernel, healthy=healthy)
+            else:
+                kernel.shutdown()
+
 
 def execute_all_notebooks(
     notebooks: List[Path],
     max_workers: Optional[int] = None,
     timeout: int = 600,
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    cache: Optional[ExecutionCache] = None,
+    kernel_pool: Optional[dict] = None,
+    history: Optional[DurationHistory] = None,
+    profile_path: Optional[Path] = None,
+    extra_arguments: Optional[List[str]] = None,
+    output_store: Optional[OutputStore] = None,
+    memoize: Optional[dict] = None,
+    memory: Optional[dict] = None,
+    admission: Optional[MemoryAdmission] = None,
+    engine: str = "process",
+    deadline: Optional[float] = None,
+    on_result: Optional[Callable[[Path, bool], None]] = None,
+    journal: Optional[RunJournal] = None,
+    retry: Optional[RetryPolicy] = None,
+    telemetry: Optional[BuildTelemetry] = None
 ) -> Tuple[int, int, List[Tuple[Path, str]]]:
     """
     Execute all notebooks in parallel.
@@ -164,6 +378,27 @@ def execute_all_notebooks(
         max_workers: Maximum number of parallel workers (default: CPU count)
         timeout: Timeout per notebook in seconds
         logger: Logger instance for output
+        cache: Execution manifest updated with each notebook's outcome
+        kernel_pool: ``KernelPool`` options; when given, every worker keeps a warm kernel pool
+        history: Duration history; when given, notebooks are submitted longest-expected-first
+            and their wall times are recorded
+        profile_path: When given, profile every code cell and append the records to this JSONL file
+        extra_arguments: Extra command line arguments for every kernel (e.g. IPython extensions)
+        output_store: When given, executed notebooks are written with their large outputs in this store
+        memoize: Options of ``execute_memoized``; when given, notebooks resume after their unchanged prefix
+        memory: Kernel memory watch options (see ``execute_notebook``); peaks are recorded in ``history``
+        admission: When given (with ``history``), a notebook only starts once its expected
+            peak memory fits; ``max_workers`` is then an upper bound
+        engine: "process" runs every notebook in a worker process; "async" drives up to
+            ``max_workers`` kernels from one event loop in this process (see
+            ``tulip_mania_next.async_engine``), without kernel pools, profiling,
+            memoization or memory watching
+        deadline: With the async engine, cancel a notebook still running after this many seconds
+        on_result: Called with the path and success of each notebook as soon as it is recorded
+        journal: Run journal every attempt is appended to
+        retry: When given, notebooks failing with a transient error are executed again
+            after a backoff; only the last attempt counts
+        telemetry: Collector of the final outcome and timings of every notebook
 
     Returns:
         Tuple of (successful_count, failed_count, list of (failed_path, error_message))
@@ -174,41 +409,207 @@ def execute_all_notebooks(
     if logger:
         logger.info(f"Executing {len(notebooks)} notebooks with {max_workers} workers")
 
+    predicted_makespan = None
+    if history is not None:
+        notebooks = order_longest_first(notebooks, history)
+        fallback = history.fallback()
+        predicted_makespan = predict_makespan(
+            [history.estimate(nb, fallback) for nb in notebooks], max_workers
+        )
+        if logger:
+            logger.info(f"Predicted makespan: {predicted_makespan / 60:.1f} min (longest first)")
+
+    phase_start = time.perf_counter()
     successful = 0
     failed = 0
     failures = []
 
-    with ProcessPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all notebook executions
-        future_to_notebook = {
-            executor.submit(execute_notebook, nb, timeout): nb
-            for nb in notebooks
-        }
-
-        # Process results as they complete
-        for future in as_completed(future_to_notebook):
-            notebook_path = future_to_notebook[future]
-            try:
-                path, success, error_msg = future.result()
+    executor_kwargs = {}
+    if kernel_pool is not None:
+        kernel_pool = {**kernel_pool, "extra_arguments": extra_arguments}
+        executor_kwargs = {"initializer": init_worker_pool, "initargs": (kernel_pool,)}
+        if logger:
+            logger.info(f"Warming kernel pools with prelude {kernel_pool.get('prelude')}")
+
+    attempts = {}
+    # Wall time each notebook became ready to run, for its queue wait
+    queued_at = dict.fromkeys(notebooks, time.time())
+
+    def attempt_finished(path, success, error_msg, stats):
+        """Journal one attempt; return the delay before retrying it, or None if it is final."""
+        attempt = attempts[path] = attempts.get(path, 0) + 1
+        if "started_at" in stats:
+            stats["queue_wait"] = max(0.0, stats["started_at"] - queued_at[path])
+        if journal is not None:
+            journal.record(path, success, error_msg, stats, attempt=attempt)
+        if success or retry is None or not retry.should_retry(error_msg, attempt):
+            return None
+        delay = retry.delay(attempt)
+        if logger:
+            logger.warning(
+                f"↻ Transient failure, retrying in {delay:.0f}s "
+                f"(attempt {attempt + 1} of {retry.retries + 1}): {path.relative_to(Path.cwd())}"
+            )
+            logger.warning(f"  Error: {error_summary(error_msg)}")
+        queued_at[path] = time.time() + delay
+        return delay
+
+    def record_result(path, success, error_msg, stats):
+        """Record and log the outcome of one notebook."""
+        nonlocal successful, failed
+        if cache is not None:
+            cache.record(path, success)
+        # A run that resumed after cached cells says nothing about the full duration
+        if history is not None and success and not stats.get("memo", {}).get("cells_reused"):
+            history.record(path, stats["elapsed"])
+        if history is not None and stats.get("peak_rss_mb"):
+            history.record_peak(path, stats["peak_rss_mb"])
+        if profile_path is not None and stats.get("cells"):
+            append_profile(stats["cells"], profile_path)
+        if telemetry is not None:
+            telemetry.record_notebook(path, success, stats, attempts=attempts.get(path, 1))
+
+        if success:
+            successful += 1
+            if logger:
+                logger.info(f"✓ Executed: {path.relative_to(Path.cwd())} ({stats['elapsed']:.0f}s)")
+                if attempts.get(path, 1) > 1:
+                    logger.info(f"  Succeeded on attempt {attempts[path]}")
+                if stats.get("memo", {}).get("cells_reused"):
+                    logger.info(
+                        f"  Reused {stats['memo']['cells_reused']} cells, "
+                        f"executed {stats['memo']['cells_executed']}"
+                    )
+                if stats.get("memo", {}).get("unpicklable"):
+                    logger.info(
+                        f"  No checkpoint, unpicklable: {', '.join(stats['memo']['unpicklable'][:5])}"
+                    )
+                if stats.get("output_store", {}).get("moved"):
+                    logger.info(
+                        f"  Stored {stats['output_store']['moved']} outputs "
+                        f"({stats['output_store']['bytes_moved'] / 2**20:.1f} MB)"
+                    )
+                if stats.get("peak_rss_mb"):
+                    logger.info(f"  Peak kernel memory {stats['peak_rss_mb']:.0f} MB")
+                if stats.get("written") is False:
+                    logger.info("  Outputs unchanged, notebook not rewritten")
+        else:
+            failed += 1
+            failures.append((path, error_msg))
+            if logger:
+                logger.error(f"✗ Failed: {path.relative_to(Path.cwd())}")
+                logger.error(f"  Error: {error_msg}")
+
+        if on_result is not None:
+            on_result(path, success)
+
+    if memory is None and admission is not None:
+        memory = {}
+    expected_peaks = {}
+    if admission is not None and history is not None:
+        peak_fallback = history.peak_fallback()
+        expected_peaks = {nb: history.peak_mb(nb, peak_fallback) for nb in notebooks}
+        if logger and admission.budget_mb is not None:
+            logger.info(
+                f"Memory admission: {admission.budget_mb / 1024:.1f} GB budget, "
+                f"{admission.reserve_mb / 1024:.1f} GB reserve"
+            )
 
-                if success:
-                    successful += 1
-                    if logger:
-                        logger.info(f"✓ Executed: {path.relative_to(Path.cwd())}")
-                else:
-                    failed += 1
-                    failures.append((path, error_msg))
-                    if logger:
-                        logger.error(f"✗ Failed: {path.relative_to(Path.cwd())}")
-                        logger.error(f"  Error: {error_msg}")
-
-            except Exception as e:
-                failed += 1
-                error_msg = f"Execution exception: {str(e)}"
-                failures.append((notebook_path, error_msg))
-                if logger:
-                    logger.error(f"✗ Exception: {notebook_path.relative_to(Path.cwd())}")
-                    logger.error(f"  Error: {error_msg}")
+    if engine == "async":
+        run_notebooks(
+            notebooks,
+            concurrency=max_workers,
+            timeout=timeout,
+            deadline=deadline,
+            extra_arguments=extra_arguments,
+            output_store=output_store,
+            on_result=record_result,
+            on_attempt=attempt_finished,
+            log=logger
+        )
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, **executor_kwargs) as executor:
+            pending = list(notebooks)
+            future_to_notebook = {}
+            retry_at = {}
+
+            def submit(nb):
+                future = executor.submit(
+                    execute_notebook,
+                    nb,
+                    timeout,
+                    profile_path is not None,
+                    extra_arguments,
+                    output_store,
+                    memoize,
+                    memory
+                )
+                future_to_notebook[future] = nb
+                if admission is not None:
+                    admission.start(future, expected_peaks.get(nb, 0.0))
+
+            def admit():
+                # Retries that are due go first, then the pending notebooks in schedule order
+                now = time.monotonic()
+                for nb, due in list(retry_at.items()):
+                    if due <= now:
+                        del retry_at[nb]
+                        pending.insert(0, nb)
+                # Start the first pending notebooks that fit
+                for nb in list(pending):
+                    if len(future_to_notebook) >= max_workers:
+                        return
+                    if admission is None or admission.admits(expected_peaks.get(nb, 0.0)):
+                        pending.remove(nb)
+                        submit(nb)
+
+            admit()
+            while future_to_notebook or retry_at:
+                # Poll while notebooks wait for memory, which frees up as kernels finish, or for a retry
+                poll = 5 if pending else None
+                if retry_at:
+                    due = max(0.0, min(retry_at.values()) - time.monotonic())
+                    poll = due if poll is None else min(poll, due)
+                if not future_to_notebook:
+                    time.sleep(poll)
+                    admit()
+                    continue
+                done, _ = wait(future_to_notebook, timeout=poll, return_when=FIRST_COMPLETED)
+                for future in done:
+                    notebook_path = future_to_notebook.pop(future)
+                    if admission is not None:
+                        admission.finish(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        failed += 1
+                        error_msg = f"Execution exception: {str(e)}"
+                        failures.append((notebook_path, error_msg))
+                        if cache is not None:
+                            cache.record(notebook_path, False)
+                        if journal is not None:
+                            journal.record(notebook_path, False, error_msg)
+                        if telemetry is not None:
+                            telemetry.record_notebook(notebook_path, False, {})
+                        if logger:
+                            logger.error(f"✗ Exception: {notebook_path.relative_to(Path.cwd())}")
+                            logger.error(f"  Error: {error_msg}")
+                        continue
+                    delay = attempt_finished(*result)
+                    if delay is None:
+                        record_result(*result)
+                    else:
+                        retry_at[notebook_path] = time.monotonic() + delay
+                admit()
+
+    if history is not None:
+        history.save()
+        if logger and predicted_makespan is not None:
+            actual_makespan = time.perf_counter() - phase_start
+            logger.info(
+                f"Makespan: predicted {predicted_makespan / 60:.1f} min, "
+                f"actual {actual_makespan / 60:.1f} min"
+            )
 
     return successful, failed, failures
 
@@ -217,6 +618,9 @@ def check_notebook_errors(notebook_path: Path) -> Tuple[Path, bool, List[str]]:
     """
     Check a notebook for error cells.
 
+    The notebook is scanned at the byte level and only parsed when it contains
+    an error output (see ``tulip_mania_next.notebook_scan``).
+
     Args:
         notebook_path: Path to the notebook
 
@@ -224,26 +628,7 @@ def check_notebook_errors(notebook_path: Path) -> Tuple[Path, bool, List[str]]:
         Tuple of (notebook_path, has_errors, list of error descriptions)
     """
     try:
-        import nbformat
-
-        # Read the notebook
-        with open(notebook_path, 'r', encoding='utf-8') as f:
-            nb = nbformat.read(f, as_version=4)
-
-        errors = []
-
-        # Check each cell for errors
-        for idx, cell in enumerate(nb.cells):
-            if cell.cell_type == 'code':
-                # Check outputs for errors
-                if hasattr(cell, 'outputs'):
-                    for output in cell.outputs:
-                        if output.output_type == 'error':
-                            error_name = output.get('ename', 'Unknown')
-                            error_value = output.get('evalue', 'Unknown error')
-                            error_desc = f"Cell {idx + 1}: {error_name}: {error_value}"
-                            errors.append(error_desc)
-
+        errors = scan_notebook_errors(notebook_path)
         has_errors = len(errors) > 0
         return (notebook_path, has_errors, errors)
 
@@ -252,16 +637,47 @@ def check_notebook_errors(notebook_path: Path) -> Tuple[Path, bool, List[str]]:
         return (notebook_path, True, [error_msg])
 
 
+def audit_notebook(notebook_path: Path) -> Tuple[Path, Optional[dict], str]:
+    """
+    Audit the output sizes of a notebook.
+
+    Args:
+        notebook_path: Path to the notebook
+
+    Returns:
+        Tuple of (notebook_path, audit or None, error message) with the audit
+        as returned by ``audit_notebook_outputs``
+    """
+    try:
+        return (notebook_path, audit_notebook_outputs(notebook_path), "")
+    except Exception as e:
+        return (notebook_path, None, f"Failed to audit notebook: {str(e)}")
+
+
 def check_all_notebooks(
     notebooks: List[Path],
-    logger: Optional[logging.Logger] = None
+    logger: Optional[logging.Logger] = None,
+    max_workers: Optional[int] = None,
+    index: Optional[ScanIndex] = None,
+    budgets: Optional[OutputBudgets] = None,
+    audit_report: Optional[Path] = None
 ) -> Tuple[int, int, List[Tuple[Path, List[str]]]]:
     """
-    Check all notebooks for errors.
+    Check all notebooks for errors and, optionally, output size budgets.
+
+    Notebooks unchanged since their last check (same mtime and size) are
+    answered from the index; the others are scanned across a process pool.
+    With ``budgets``, every notebook's outputs are audited too: exceeding a
+    fail threshold counts as an error, exceeding a warn threshold is logged.
 
     Args:
         notebooks: List of notebook paths to check
         logger: Logger instance for output
+        max_workers: Maximum number of parallel scanners (default: CPU count)
+        index: Scan index reused between runs (None scans every notebook)
+        budgets: Output size budgets; when given, outputs are audited
+        audit_report: When given (with ``budgets``), the audit of every notebook
+            is written to this JSON file
 
     Returns:
         Tuple of (clean_count, error_count, list of (notebook_path, error_list))
@@ -269,14 +685,70 @@ def check_all_notebooks(
     if logger:
         logger.info(f"Checking {len(notebooks)} notebooks for errors")
 
+    results = {}
+    to_scan = []
+    for notebook_path in notebooks:
+        cached = index.lookup(notebook_path) if index is not None else None
+        if cached is None:
+            to_scan.append(notebook_path)
+        else:
+            results[notebook_path] = cached
+
+    if max_workers is None:
+        max_workers = multiprocessing.cpu_count()
+
+    def scan_all(func, paths):
+        if len(paths) >= 4 and max_workers > 1:
+            with ProcessPoolExecutor(max_workers=min(max_workers, len(paths))) as executor:
+                return list(executor.map(func, paths))
+        return [func(notebook_path) for notebook_path in paths]
+
+    for path, has_errors, errors in scan_all(check_notebook_errors, to_scan):
+        results[path] = errors
+        is_scan_failure = has_errors and errors[0].startswith("Failed to check notebook")
+        if index is not None and not is_scan_failure:
+            index.store(path, errors)
+
+    audits = {}
+    audit_failures = {}
+    if budgets is not None:
+        to_audit = []
+        for notebook_path in notebooks:
+            cached = index.lookup(notebook_path, kind="audit") if index is not None else None
+            if cached is None:
+                to_audit.append(notebook_path)
+            else:
+                audits[notebook_path] = cached
+        for path, audit, error_msg in scan_all(audit_notebook, to_audit):
+            if audit is None:
+                audit_failures[path] = error_msg
+                continue
+            audits[path] = audit
+            if index is not None:
+                index.store(path, audit, kind="audit")
+
+    if index is not None:
+        index.save()
+
+    if logger and index is not None:
+        logger.info(f"Scanned {len(to_scan)} notebooks, {len(notebooks) - len(to_scan)} unchanged")
+
     clean = 0
     with_errors = 0
     error_notebooks = []
 
-    for notebook_path in notebooks:
-        path, has_errors, errors = check_notebook_errors(notebook_path)
+    budget_warnings = {}
+    for path in notebooks:
+        errors = results[path]
+
+        if budgets is not None:
+            violations = budgets.evaluate(audits[path]) if path in audits else []
+            errors = errors + [f"Output budget exceeded: {v.message}" for v in violations if v.level == "fail"]
+            if path in audit_failures:
+                errors.append(audit_failures[path])
+            budget_warnings[path] = [v.message for v in violations if v.level == "warn"]
 
-        if has_errors:
+        if errors:
             with_errors += 1
             error_notebooks.append((path, errors))
             if logger:
@@ -287,32 +759,105 @@ def check_all_notebooks(
             clean += 1
             if logger:
                 logger.info(f"✓ Clean: {path.relative_to(Path.cwd())}")
+        if logger:
+            for warning in budget_warnings.get(path, []):
+                logger.warning(f"    Output budget warning: {warning}")
+
+    if audits:
+        totals = {}
+        for audit in audits.values():
+            for mime, size in audit["by_mime"].items():
+                totals[mime] = totals.get(mime, 0) + size
+        if logger:
+            logger.info(
+                "Output audit: " + ", ".join(
+                    f"{mime} {format_bytes(size)}"
+                    for mime, size in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:6]
+                )
+            )
+            heaviest = sorted(audits.items(), key=lambda item: item[1]["page_bytes"], reverse=True)[:5]
+            for path, audit in heaviest:
+                logger.info(
+                    f"  {path.relative_to(Path.cwd())}: page {format_bytes(audit['page_bytes'])}, "
+                    f"file {format_bytes(audit['file_bytes'])}"
+                )
+        if audit_report is not None:
+            atomic_write_json(Path(audit_report), {
+                "by_mime": totals,
+                "notebooks": {
+                    path.relative_to(Path.cwd()).as_posix(): {
+                        **audit,
+                        "violations": [vars(v) for v in budgets.evaluate(audit)],
+                    }
+                    for path, audit in audits.items()
+                },
+            })
+            if logger:
+                logger.info(f"Output audit written to {audit_report}")
 
     return clean, with_errors, error_notebooks
 
 
-def build_book(rebuild=False):
+def prune_output_store(output_store, logger=None):
+    """Delete the stored outputs no notebook in the tree references any more."""
+    log = logger or logging.getLogger(__name__)
+    stats = output_store.prune(walk_notebooks(Path.cwd()))
+    if stats["deleted"]:
+        log.info(f"Pruned {stats['deleted']} unreferenced outputs ({stats['bytes_deleted'] / 2**20:.1f} MB)")
+
+
+def build_book(rebuild=False, output_store=None, notebooks=None, logger=None, builder=None):
     """
-    Build the JupyterBook 2 site.
+    Build the JupyterBook 2 site, streaming the build output into the log.
 
     Args:
         rebuild: If True, rebuild all pages regardless of modification status
-    """
-    import subprocess
+        output_store: When given, the notebooks are rehydrated from this store
+            for the build and dehydrated again afterwards
+        notebooks: Notebooks to rehydrate (default: every notebook)
+        logger: Logger instance for output
+        builder: ``PipelinedBuilder`` that has been building during execution;
+            when given, only its final incremental build is run
 
-    cmd = ["jupyter", "book", "build", "--html"]
-    if rebuild:
-        cmd.append("--all")
+    Returns:
+        True if the build succeeded
+    """
+    log = logger or logging.getLogger(__name__)
 
-    try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        print(result.stdout)
-        return True
-    except subprocess.CalledProcessError as e:
-        print(f"Error building book: {e}")
-        print(e.stderr)
+    if output_store is not None:
+        notebooks = notebooks if notebooks is not None else find_notebooks()
+        try:
+            restored = sum(output_store.rehydrate_file(nb)["restored"] for nb in notebooks)
+            log.info(f"Rehydrated {restored} outputs from {output_store.store_dir}")
+            return build_book(rebuild=rebuild, logger=logger)
+        except MissingBlob as e:
+            # Never build pages that show the placeholder notes
+            log.error(f"Not building: {e}")
+            return False
+        finally:
+            for nb in notebooks:
+                output_store.dehydrate_file(nb)
+            prune_output_store(output_store, log)
+
+    if builder is not None:
+        success = builder.finish()
+    else:
+        success = run_book_build(rebuild=rebuild, log=log)
+    if not success:
         return False
 
+    # Figures referenced from dehydrated outputs live in the store, not the notebooks
+    stores = {DEFAULT_STORE_DIR.resolve()} | ({output_store.store_dir} if output_store else set())
+    stats = prune_assets([*walk_notebooks(Path.cwd()), *stores])
+    if stats["deleted"]:
+        log.info(f"Pruned {stats['deleted']} unreferenced figure assets ({stats['bytes_deleted'] / 2**20:.1f} MB)")
+
+    # Figure files referenced from notebook outputs are not copied by the book build
+    copied = publish_assets(Path("_build") / "html")
+    if copied:
+        log.info(f"Published {copied} figure assets")
+    return True
+
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -326,6 +871,13 @@ if __name__ == "__main__":
         default=False,
         help="Build the book with jupyter-book build",
     )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        default=False,
+        help="With --build, start building while notebooks execute and rebuild incrementally "
+             "as they finish (not with --output-store)",
+    )
     parser.add_argument(
         "--build-all",
         action="store_true",
@@ -352,6 +904,251 @@ if __name__ == "__main__":
         default=600,
         help="Timeout per notebook in seconds (default: 600)",
     )
+    parser.add_argument(
+        "--engine",
+        choices=("process", "async"),
+        default="process",
+        help="Run each notebook in a worker process, or drive all kernels from one asyncio "
+             "event loop (async: no kernel pool, profiling, memoization or memory limits)",
+    )
+    parser.add_argument(
+        "--notebook-deadline",
+        type=float,
+        default=None,
+        help="With --engine async, cancel a notebook still running after this many seconds",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        default=False,
+        help="Execute every notebook, ignoring the execution cache",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=None,
+        metavar="PATTERN",
+        help="Only execute notebooks whose path contains PATTERN, or matches it as a glob like "
+             "'Markets/Bonds/**' (repeatable, bypasses the cache)",
+    )
+    parser.add_argument(
+        "--changed-since",
+        default=None,
+        metavar="REF",
+        help="Only execute notebooks changed since a git ref, including uncommitted and untracked "
+             "ones (bypasses the cache)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Continue the last run in the run journal, skipping the notebooks it already completed",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="Re-execute a notebook failing with a transient error up to this many times; cell timeouts "
+             "are never retried (default: 2)",
+    )
+    parser.add_argument(
+        "--retry-backoff",
+        type=float,
+        default=30.0,
+        help="Seconds before the first retry, doubling for every further one (default: 30)",
+    )
+    parser.add_argument(
+        "--retry-pattern",
+        action="append",
+        default=None,
+        metavar="REGEX",
+        help="Error message pattern of transient failures (repeatable, replaces the defaults: "
+             "timeouts, HTTP 429 and 5xx, dropped connections)",
+    )
+    parser.add_argument(
+        "--all-notebooks",
+        action="store_true",
+        default=False,
+        help="Execute every notebook in the tree, not only those in the table of contents",
+    )
+    parser.add_argument(
+        "--data-as-of",
+        type=str,
+        default=None,
+        help="Data date folded into the execution cache key ('today' for the current date)",
+    )
+    parser.add_argument(
+        "--kernel-pool",
+        action="store_true",
+        default=False,
+        help="Reuse warm kernels with a preloaded prelude across notebooks in each worker",
+    )
+    parser.add_argument(
+        "--prelude",
+        type=str,
+        default="tulip_mania_next.prelude",
+        help="Module imported by pooled kernels at startup (default: tulip_mania_next.prelude)",
+    )
+    parser.add_argument(
+        "--kernel-max-uses",
+        type=int,
+        default=10,
+        help="Recycle a pooled kernel after this many notebooks (default: 10)",
+    )
+    parser.add_argument(
+        "--kernel-max-rss-mb",
+        type=float,
+        default=4096,
+        help="Recycle a pooled kernel whose memory exceeds this many MB (default: 4096)",
+    )
+
+    # Memory options
+    parser.add_argument(
+        "--memory-admission",
+        action="store_true",
+        default=False,
+        help="Only start a notebook when its historical peak kernel memory fits in available memory "
+             "(--max-workers becomes an upper bound)",
+    )
+    parser.add_argument(
+        "--memory-reserve-mb",
+        type=float,
+        default=2048,
+        help="With --memory-admission, memory kept free for the system (default: 2048)",
+    )
+    parser.add_argument(
+        "--notebook-max-rss-mb",
+        type=float,
+        default=None,
+        help="Kill the kernel of a notebook whose memory exceeds this many MB and fail the notebook",
+    )
+
+    # Data cache options
+    parser.add_argument(
+        "--data-cache",
+        action="store_true",
+        default=False,
+        help="Share tulip data-client results between kernels through an on-disk cache",
+    )
+    parser.add_argument(
+        "--data-cache-dir",
+        type=str,
+        default=str(data_cache.DEFAULT_CACHE_DIR),
+        help=f"Directory of the data cache (default: {data_cache.DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--data-cache-ttl",
+        type=float,
+        default=12 * 3600,
+        help="Seconds before a cached data call is fetched again (default: 43200)",
+    )
+    parser.add_argument(
+        "--data-cache-as-of",
+        type=str,
+        default=None,
+        help="Freeze the data cache at this date: entries are keyed on it and never expire",
+    )
+
+    # Profiling options
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        default=False,
+        help=f"Record per-cell wall time, memory and output size to {PROFILE_PATH}",
+    )
+    parser.add_argument(
+        "--profile-summary",
+        action="store_true",
+        default=False,
+        help="Rank the slowest cells and biggest outputs from the recorded profile (no execution or build)",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=15,
+        help="Number of entries per ranking in --profile-summary (default: 15)",
+    )
+
+    # Memoized execution options
+    parser.add_argument(
+        "--memoize",
+        action="store_true",
+        default=False,
+        help="Reuse outputs of unchanged leading cells and only run from the first changed code cell "
+             "(ignored with --force and --profile)",
+    )
+    parser.add_argument(
+        "--checkpoint-seconds",
+        type=float,
+        default=5.0,
+        help="With --memoize, checkpoint the kernel namespace after cells this slow (default: 5)",
+    )
+    parser.add_argument(
+        "--memoize-max-age",
+        type=float,
+        default=12 * 3600,
+        help="With --memoize, seconds after which cached cells are run again, since their data may have "
+             "changed; unused with --data-as-of or --data-cache-as-of (default: 43200)",
+    )
+
+    # Output store options
+    parser.add_argument(
+        "--output-store",
+        action="store_true",
+        default=False,
+        help="Keep large outputs of executed notebooks in a sidecar store instead of the notebooks",
+    )
+    parser.add_argument(
+        "--output-store-dir",
+        type=str,
+        default=str(DEFAULT_STORE_DIR),
+        help=f"Output store directory (default: {DEFAULT_STORE_DIR})",
+    )
+    parser.add_argument(
+        "--output-store-threshold",
+        type=int,
+        default=16384,
+        help="Minimum size in bytes of an output moved to the store (default: 16384)",
+    )
+    parser.add_argument(
+        "--rehydrate",
+        action="store_true",
+        default=False,
+        help="Put stored outputs back into every notebook and exit",
+    )
+    parser.add_argument(
+        "--dehydrate",
+        action="store_true",
+        default=False,
+        help="Move large outputs of every notebook to the store, delete unreferenced ones and exit",
+    )
+
+    # Parameterized execution options
+    parser.add_argument(
+        "--matrix",
+        nargs="?",
+        const=str(DEFAULT_MATRIX),
+        default=None,
+        metavar="FILE",
+        help=f"Render the notebooks of a parameter matrix (default: {DEFAULT_MATRIX}) and execute "
+             "only those, on pooled kernels sharing the data cache; unpublished previews, never part "
+             "of a build",
+    )
+
+    # Telemetry options
+    parser.add_argument(
+        "--metrics-dir",
+        default=str(METRICS_DIR),
+        help=f"Directory for the OpenMetrics textfile and JSON summary of the run, e.g. a node-exporter "
+             f"textfile collector directory (default: {METRICS_DIR})",
+    )
+    parser.add_argument(
+        "--no-metrics",
+        dest="metrics",
+        action="store_false",
+        default=True,
+        help="Do not write run metrics",
+    )
 
     # Notebook checking options
     parser.add_argument(
@@ -360,6 +1157,25 @@ if __name__ == "__main__":
         default=False,
         help="Check all notebooks for errors (no execution or build)",
     )
+    parser.add_argument(
+        "--audit-outputs",
+        action="store_true",
+        default=False,
+        help="With --check-notebooks, audit output sizes per notebook, cell and MIME type against the budgets",
+    )
+    parser.add_argument(
+        "--output-budget",
+        action="append",
+        default=None,
+        metavar="SCOPE=WARN_KB[:FAIL_KB]",
+        help="Output size budget of a cell, notebook or page, e.g. page=2048:4096 (repeatable, implies "
+             "--audit-outputs; defaults: cell=1024, notebook=4096, page=3072, warnings only)",
+    )
+    parser.add_argument(
+        "--audit-report",
+        default=str(AUDIT_REPORT),
+        help=f"JSON file for the full output audit (default: {AUDIT_REPORT})",
+    )
 
     args = parser.parse_args()
 
@@ -367,6 +1183,10 @@ if __name__ == "__main__":
     if args.build_all:
         args.build = True
 
+    # The rendered matrix pages are not published, so they are no part of a book build
+    if args.matrix and args.build:
+        parser.error("--matrix renders unpublished preview pages and cannot be combined with --build")
+
     start_time = time.perf_counter()
     logger = setup_logging(start_time)
 
@@ -374,18 +1194,101 @@ if __name__ == "__main__":
     logger.info("Starting Jupyter Book build process")
     logger.info("=" * 70)
 
+    telemetry = BuildTelemetry()
+
     try:
-        # Find all notebooks
-        notebooks = find_notebooks()
+        # Summarize a recorded profile only
+        if args.profile_summary:
+            if not PROFILE_PATH.exists():
+                logger.error(f"No profile found at {PROFILE_PATH} (run with --profile first)")
+                sys.exit(1)
+            for line in summarize_profile(load_profile(PROFILE_PATH), top=args.profile_top):
+                logger.info(line)
+            sys.exit(0)
+
+        # Render parameterized notebooks; they are executed instead of the discovered ones
+        matrix_notebooks = None
+        if args.matrix:
+            runs = load_matrix(args.matrix)
+            changed = sum(materialize(run) for run in runs)
+            matrix_notebooks = [run.output for run in runs]
+            logger.info(f"Rendered {len(runs)} notebooks from {args.matrix} ({changed} with changed code)")
+
+            # One warm environment for the whole batch, sharing common pulls
+            args.kernel_pool = True
+            args.data_cache = True
+
+        # Find the published notebooks; pages rendered from the country matrix are
+        # unpublished previews and only ever run with --matrix
+        notebooks = without_rendered(find_notebooks(use_toc=not args.all_notebooks))
         logger.info(f"Found {len(notebooks)} notebooks")
 
+        changed = None
+        if args.changed_since:
+            try:
+                changed = changed_since(args.changed_since)
+            except ValueError as e:
+                logger.error(f"--changed-since: {e}")
+                sys.exit(1)
+
+        output_store = None
+        if args.output_store or args.rehydrate or args.dehydrate:
+            output_store = OutputStore(args.output_store_dir, threshold=args.output_store_threshold)
+            # Committed notebooks must not reference blobs that only exist here
+            reason = unpublished_reason(output_store.store_dir)
+            if reason and (args.output_store or args.dehydrate):
+                logger.error(f"Refusing to dehydrate notebooks: {reason}, so their outputs would not be published")
+                sys.exit(1)
+
+        # Move outputs in or out of the store only
+        if args.rehydrate or args.dehydrate:
+            missing = []
+            for nb in notebooks:
+                if args.rehydrate:
+                    try:
+                        stats = output_store.rehydrate_file(nb)
+                    except MissingBlob as e:
+                        missing.append(f"{nb.relative_to(Path.cwd())}: {e}")
+                        continue
+                    if stats["restored"]:
+                        logger.info(f"Rehydrated {stats['restored']} outputs: {nb.relative_to(Path.cwd())}")
+                else:
+                    stats = output_store.dehydrate_file(nb)
+                    if stats["moved"]:
+                        logger.info(
+                            f"Stored {stats['moved']} outputs ({stats['bytes_moved'] / 2**20:.1f} MB): "
+                            f"{nb.relative_to(Path.cwd())}"
+                        )
+            for problem in missing:
+                logger.error(f"Outputs missing from the store: {problem}")
+            if args.dehydrate:
+                prune_output_store(output_store, logger)
+            sys.exit(1 if missing else 0)
+
         # Check notebooks for errors only
         if args.check_notebooks:
             logger.info("-" * 70)
             logger.info("Checking notebooks for errors")
             logger.info("-" * 70)
 
-            clean, with_errors, error_notebooks = check_all_notebooks(notebooks, logger)
+            budgets = None
+            if args.audit_outputs or args.output_budget:
+                try:
+                    budgets = OutputBudgets.parse(args.output_budget or [])
+                except ValueError as e:
+                    logger.error(str(e))
+                    sys.exit(1)
+
+            with telemetry.phase("check") as phase:
+                clean, with_errors, error_notebooks = check_all_notebooks(
+                    notebooks,
+                    logger,
+                    max_workers=args.max_workers,
+                    index=ScanIndex(),
+                    budgets=budgets,
+                    audit_report=Path(args.audit_report) if budgets else None
+                )
+                phase.update(success=with_errors == 0, clean=clean, with_errors=with_errors)
 
             logger.info("-" * 70)
             logger.info(f"Check complete: {clean} clean, {with_errors} with errors")
@@ -398,19 +1301,149 @@ if __name__ == "__main__":
                 logger.info("All notebooks are clean!")
                 sys.exit(0)
 
+        # Build while notebooks execute; the output store needs the notebooks rehydrated for the whole build
+        builder = None
+        if args.pipeline and args.build and not args.skip_regeneration:
+            if output_store is not None:
+                logger.warning("Ignoring --pipeline with --output-store")
+            else:
+                builder = PipelinedBuilder(rebuild=args.build_all, log=logger)
+
         # Execute notebooks (unless skipped)
         if not args.skip_regeneration:
             logger.info("-" * 70)
             logger.info("Executing notebooks")
             logger.info("-" * 70)
 
-            successful, failed, failures = execute_all_notebooks(
-                notebooks,
-                max_workers=args.max_workers,
-                timeout=args.notebook_timeout,
-                logger=logger
+            data_as_of = args.data_as_of
+            if data_as_of == "today":
+                data_as_of = f"{datetime.now():%Y-%m-%d}"
+            cache = ExecutionCache(data_as_of=data_as_of)
+
+            to_execute = select_notebooks(
+                matrix_notebooks if matrix_notebooks is not None else notebooks,
+                cache=cache,
+                only=args.only,
+                force=args.force,
+                logger=logger,
+                changed=changed,
             )
 
+            extra_arguments = []
+            if args.data_cache:
+                os.environ[data_cache.ENV_DIR] = str(Path(args.data_cache_dir).resolve())
+                os.environ[data_cache.ENV_TTL] = str(args.data_cache_ttl)
+                if args.data_cache_as_of:
+                    os.environ[data_cache.ENV_AS_OF] = args.data_cache_as_of
+                data_cache.reset_stats(args.data_cache_dir)
+                extra_arguments.append("--ext=tulip_mania_next.data_cache")
+                logger.info(f"Data cache enabled at {args.data_cache_dir}")
+
+            memoize = None
+            if args.memoize and not (args.force or args.profile):
+                # With a pinned data date the cached cells stay valid; otherwise they expire
+                data_dates = (cache.data_as_of or "", args.data_cache_as_of or "")
+                memoize = {
+                    "seed": f"{cache.kernel_name}:{cache.env_hash}:{':'.join(data_dates)}",
+                    "checkpoint_seconds": args.checkpoint_seconds,
+                    "max_age": None if any(data_dates) else args.memoize_max_age,
+                }
+
+            kernel_pool = None
+            if args.kernel_pool:
+                kernel_pool = {
+                    "prelude": args.prelude,
+                    "max_uses": args.kernel_max_uses,
+                    "max_rss_mb": args.kernel_max_rss_mb,
+                }
+
+            memory = None
+            if args.notebook_max_rss_mb or args.memory_admission:
+                memory = {"limit_mb": args.notebook_max_rss_mb}
+
+            admission = None
+            if args.memory_admission:
+                admission = MemoryAdmission(reserve_mb=args.memory_reserve_mb)
+
+            if args.engine == "async":
+                unsupported = [
+                    flag for flag, value in (
+                        ("--kernel-pool", kernel_pool),
+                        ("--profile", args.profile),
+                        ("--memoize", memoize),
+                        ("--memory-admission/--notebook-max-rss-mb", memory),
+                    ) if value
+                ]
+                if unsupported:
+                    logger.warning(f"Ignoring {', '.join(unsupported)} with --engine async")
+                kernel_pool = memoize = memory = admission = None
+                args.profile = False
+
+            if builder is not None:
+                builder.start()
+
+            # Every outcome is journaled as it happens, so an interrupted or failed run can be resumed
+            if args.resume:
+                journal = RunJournal.resume(to_execute)
+                if journal.resumed:
+                    remaining = journal.remaining(to_execute)
+                    logger.info(
+                        f"Resuming run {journal.run_id}: skipping {len(to_execute) - len(remaining)} "
+                        f"notebooks it already completed"
+                    )
+                    to_execute = remaining
+                else:
+                    logger.info(f"The last run succeeded, nothing to resume; starting run {journal.run_id}")
+            else:
+                journal = RunJournal.start(to_execute)
+            retry = None
+            if args.retries > 0:
+                retry = RetryPolicy(
+                    retries=args.retries,
+                    patterns=args.retry_pattern or DEFAULT_RETRY_PATTERNS,
+                    backoff=args.retry_backoff,
+                )
+
+            with telemetry.phase("execute") as phase:
+                try:
+                    successful, failed, failures = execute_all_notebooks(
+                        to_execute,
+                        max_workers=args.max_workers,
+                        timeout=args.notebook_timeout,
+                        logger=logger,
+                        cache=cache,
+                        kernel_pool=kernel_pool,
+                        history=DurationHistory(),
+                        profile_path=PROFILE_PATH if args.profile else None,
+                        extra_arguments=extra_arguments,
+                        output_store=output_store,
+                        memoize=memoize,
+                        memory=memory,
+                        admission=admission,
+                        engine=args.engine,
+                        deadline=args.notebook_deadline,
+                        on_result=builder.notebook_finished if builder else None,
+                        journal=journal,
+                        retry=retry,
+                        telemetry=telemetry
+                    )
+                except BaseException:
+                    journal.close()
+                    raise
+                journal.close(successful, failed)
+                phase.update(success=failed == 0, successful=successful, failed=failed)
+
+            if args.data_cache:
+                cache_stats = data_cache.collect_stats(args.data_cache_dir)
+                calls = cache_stats["hits"] + cache_stats["misses"]
+                hit_rate = cache_stats["hits"] / calls if calls else 0.0
+                logger.info(
+                    f"Data cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                    f"({hit_rate:.0%} hit rate), {cache_stats['uncacheable']} uncacheable, "
+                    f"{cache_stats['bytes_read'] / 2**20:.1f} MB read, "
+                    f"{cache_stats['bytes_written'] / 2**20:.1f} MB written"
+                )
+
             logger.info("-" * 70)
             logger.info(f"Execution complete: {successful} successful, {failed} failed")
             logger.info("-" * 70)
@@ -434,7 +1467,11 @@ if __name__ == "__main__":
             rebuild = args.build_all
             logger.info(f"Rebuild all pages: {rebuild}")
 
-            build_success = build_book(rebuild=rebuild)
+            with telemetry.phase("build") as phase:
+                build_success = build_book(
+                    rebuild=rebuild, output_store=output_store, notebooks=notebooks, logger=logger, builder=builder
+                )
+                phase["success"] = build_success
             logger.info(f"Build completed: {build_success}")
 
             if not build_success:
@@ -451,3 +1488,11 @@ if __name__ == "__main__":
     except Exception:
         logger.exception("Unexpected error occurred")
         sys.exit(1)
+
+    finally:
+        if args.metrics and telemetry.phases:
+            try:
+                prom_path, summary_path = telemetry.write(args.metrics_dir)
+                logger.info(f"Metrics written to {prom_path} and {summary_path}")
+            except OSError as e:
+                logger.warning(f"Could not write metrics: {e}")
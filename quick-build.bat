@@ -19,8 +19,12 @@ if errorlevel 1 goto error
 REM Step 2: Build the book
 echo.
 echo Step 2/5: Building Jupyter Book...
+REM Notebooks executed with --output-store keep large outputs in a sidecar store
+if exist _output_store poetry run python main.py --rehydrate
 poetry run jupyter book build --html --all
-if errorlevel 1 goto error
+set BUILD_ERROR=%errorlevel%
+if exist _output_store poetry run python main.py --dehydrate
+if not "%BUILD_ERROR%"=="0" goto error
 
 REM Step 3: Add changed files
 echo.
@@ -20,7 +20,16 @@ git pull origin "$BRANCH"
 # Step 2: Build the book
 echo ""
 echo "Step 2/5: Building Jupyter Book..."
+# Notebooks executed with --output-store keep large outputs in a sidecar store
+if [ -d _output_store ]; then
+  poetry run python main.py --rehydrate
+  trap 'poetry run python main.py --dehydrate' EXIT
+fi
 poetry run jupyter book build --html --all
+if [ -d _output_store ]; then
+  poetry run python main.py --dehydrate
+  trap - EXIT
+fi
 
 # Step 3: Add changed files
 echo ""
@@ -0,0 +1,37 @@
+from pathlib import Path
+
+import nbformat
+import pytest
+
+
+def make_notebook(cells, path=None):
+    """
+    A notebook of code cells, written to ``path`` when given.
+
+    Args:
+        cells: Source of each cell, or (source, tags) tuples
+        path: File to write the notebook to
+    """
+    nb = nbformat.v4.new_notebook()
+    for cell in cells:
+        source, tags = (cell, []) if isinstance(cell, str) else cell
+        code = nbformat.v4.new_code_cell(source)
+        code.metadata["tags"] = list(tags)
+        nb.cells.append(code)
+    if path is not None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            nbformat.write(nb, f)
+    return nb
+
+
+@pytest.fixture
+def notebook_factory(tmp_path):
+    """Write notebooks under a temp directory: ``notebook_factory("a.ipynb", ["x = 1"])``."""
+
+    def factory(name, cells):
+        path = tmp_path / name
+        make_notebook(cells, path)
+        return path
+
+    return factory
@@ -0,0 +1,30 @@
+import threading
+import time
+
+import pytest
+
+from tulip_mania_next.async_engine import run_notebooks
+
+pytest.importorskip("ipykernel")
+
+
+def test_callbacks_run_off_the_event_loop_one_at_a_time(notebook_factory):
+    notebooks = [notebook_factory(f"nb{i}.ipynb", [f"x = {i}"]) for i in range(3)]
+    calls = []
+    active = []
+
+    def on_attempt(path, success, error_msg, stats):
+        active.append(path)
+        # A slow journal write must not overlap another callback
+        time.sleep(0.2)
+        calls.append((threading.current_thread().name, len(active)))
+        active.remove(path)
+
+    results = run_notebooks(
+        notebooks, concurrency=3, timeout=60, on_attempt=on_attempt, on_result=lambda *result: None,
+        progress_interval=None,
+    )
+
+    assert sorted(path for path, success, _, _ in results if success) == notebooks
+    assert [count for _, count in calls] == [1, 1, 1]
+    assert all(name.startswith("notebook-results") for name, _ in calls)
@@ -0,0 +1,37 @@
+import time
+
+from tulip_mania_next.cell_cache import CellCache, cell_chain
+from conftest import make_notebook
+
+
+def _cached(tmp_path, checkpoints):
+    chain = cell_chain(make_notebook(["data = pull()", "plot(data)", "table(data)"]))
+    cache = CellCache("nb.ipynb", cache_dir=tmp_path)
+    outputs = {h: {"outputs": [], "execution_count": i + 1} for i, h in enumerate(chain)}
+    cache.save(chain, outputs, {chain[i]: meta for i, meta in checkpoints.items()})
+    for i in checkpoints:
+        cache.checkpoint_path(chain[i]).write_bytes(b"")
+    return cache, chain
+
+
+def test_chain_depends_on_code_above_and_seed():
+    first = cell_chain(make_notebook(["a = 1", "b = 2"]))
+    assert cell_chain(make_notebook(["a = 1", "b = 3"]))[0] == first[0]
+    assert cell_chain(make_notebook(["a = 0", "b = 2"]))[1] != first[1]
+    assert cell_chain(make_notebook(["a = 1", "b = 2"]), seed="2025-01-02") != first
+
+
+def test_resumes_after_the_latest_checkpoint_in_the_unchanged_prefix(tmp_path):
+    cache, chain = _cached(tmp_path, {0: {"saved_at": time.time()}, 1: {"saved_at": time.time()}})
+    assert cache.resume_point(chain) == 1
+
+    edited = cell_chain(make_notebook(["data = pull()", "plot(data, log=True)", "table(data)"]))
+    assert cache.resume_point(edited) == 0
+
+
+def test_stale_checkpoints_are_not_resumed_from(tmp_path):
+    cache, chain = _cached(tmp_path, {0: {"saved_at": time.time() - 7_200}, 1: {}})
+
+    assert cache.resume_point(chain) == 1
+    assert cache.resume_point(chain, max_age=3_600) == -1
+    assert cache.resume_point(chain, max_age=10_800) == 0
@@ -0,0 +1,48 @@
+import pytest
+
+from tulip_mania_next import columns_framework
+from tulip_mania_next.columns_framework import columns, configure
+
+
+@pytest.fixture(autouse=True)
+def default_options():
+    columns_framework.reset_options()
+    columns_framework.reset_page()
+    yield
+    columns_framework.reset_options()
+    columns_framework.reset_page()
+
+
+def _layout():
+    cols = columns([2, 1])
+    cols[0].header("Left")
+    cols[1].table([[1, 2.5]], headers=["a", "b"])
+    return cols
+
+
+def test_to_html_is_self_contained_by_default():
+    cols = _layout()
+    html = cols.to_html()
+
+    assert f"#{cols.container.container_id} {{" in html and f'id="{cols.container.container_id}"' in html
+    assert "<h2" in html and "<table" in html
+    assert cols.container.required_assets() == []
+
+
+def test_shared_assets_are_emitted_once_per_page():
+    configure(shared_assets=True)
+    first, second = _layout(), _layout()
+
+    assert first.container.required_assets() == ["columns.css", "table.css"]
+    assert ".tmn-columns" in first.to_html()
+    assert ".tmn-columns" not in second.to_html()
+    assert ".tmn-columns" not in _layout().to_html(assets=False)
+
+
+def test_save_writes_a_standalone_page(tmp_path):
+    configure(shared_assets=True)
+    _layout().save(tmp_path / "page.html", title="Report")
+
+    page = (tmp_path / "page.html").read_text(encoding="utf-8")
+    assert page.startswith("<!DOCTYPE html>") and "<title>Report</title>" in page
+    assert ".tmn-columns" in page and "<link" not in page
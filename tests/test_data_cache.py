@@ -0,0 +1,124 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from tulip_mania_next import data_cache
+from tulip_mania_next.data_cache import DataCache, Uncacheable
+
+
+class StubClient:
+    """Local stand-in for a tulip data client, counting real fetches."""
+
+    fetches = 0
+
+    def __init__(self, endpoint="https://data.example/api", user="build"):
+        self.endpoint = endpoint
+        self.user = user
+        self._session = object()
+
+    def get_series(self, ticker, start=None):
+        StubClient.fetches += 1
+        return pd.DataFrame({"value": [1.0, 2.0]}, index=pd.to_datetime(["2025-01-01", "2025-01-02"]))
+
+    @classmethod
+    def catalog(cls, name):
+        StubClient.fetches += 1
+        return [name, "a", "b"]
+
+    @staticmethod
+    def lookup(code):
+        StubClient.fetches += 1
+        return {"code": code}
+
+
+class KeyedClient(StubClient):
+    def __init__(self, account):
+        super().__init__(endpoint=object())
+        self._account = account
+
+    def __cache_key__(self):
+        return self._account
+
+
+TARGETS = [f"{__name__}:StubClient.{name}" for name in ("get_series", "catalog", "lookup")]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    StubClient.fetches = 0
+    cache = DataCache(tmp_path / "cache")
+    assert data_cache.install(cache, TARGETS) == TARGETS
+    yield cache
+    data_cache.uninstall()
+
+
+def test_repeated_calls_are_served_from_the_cache(cache):
+    first = StubClient().get_series("GDP", start="2020-01-01")
+    second = StubClient().get_series("GDP", start="2020-01-01")
+
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+    assert StubClient.fetches == 1
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    StubClient().get_series("CPI")
+    assert StubClient.fetches == 2
+
+
+def test_differently_configured_clients_do_not_share_entries(cache):
+    StubClient(endpoint="https://prod.example").get_series("GDP")
+    StubClient(endpoint="https://uat.example").get_series("GDP")
+    StubClient(user="analyst").get_series("GDP")
+    assert StubClient.fetches == 3
+
+    StubClient(endpoint="https://prod.example").get_series("GDP")
+    assert StubClient.fetches == 3
+
+
+def test_cache_key_hook_identifies_the_instance(cache):
+    KeyedClient("desk-a").get_series("GDP")
+    KeyedClient("desk-a").get_series("GDP")
+    KeyedClient("desk-b").get_series("GDP")
+    assert StubClient.fetches == 2
+
+
+def test_class_and_static_methods(cache):
+    assert StubClient.catalog("fx") == StubClient().catalog("fx") == ["fx", "a", "b"]
+    assert StubClient.lookup("US") == StubClient.lookup("US") == {"code": "US"}
+    assert StubClient.fetches == 2
+
+
+def test_unstable_arguments_bypass_the_cache(cache):
+    StubClient().get_series(object())
+    StubClient().get_series(object())
+    assert StubClient.fetches == 2
+    assert cache.stats["uncacheable"] == 2
+
+
+def test_entries_are_shared_across_cache_instances_and_expire(tmp_path):
+    writer = DataCache(tmp_path)
+    key = writer.key("t", ("a",), {})
+    writer.put(key, {"x": 1})
+
+    assert DataCache(tmp_path).get(key) == (True, {"x": 1})
+    assert DataCache(tmp_path).key("t", ("a",), {}) == key
+    assert DataCache(tmp_path, as_of="2025-01-31").key("t", ("a",), {}) != key
+
+    old = time.time() - 120
+    for path in (tmp_path / "objects").rglob("*.pkl"):
+        os.utime(path, (old, old))
+    assert DataCache(tmp_path, ttl=60).get(key) == (False, None)
+    assert DataCache(tmp_path, ttl=60, as_of="2025-01-31").get(key) == (True, {"x": 1})
+
+
+def test_uninstall_restores_the_methods(tmp_path):
+    original = StubClient.__dict__["catalog"]
+    data_cache.install(DataCache(tmp_path), TARGETS)
+    data_cache.uninstall()
+    assert StubClient.__dict__["catalog"] is original
+
+
+def test_canonical_rejects_default_reprs():
+    with pytest.raises(Uncacheable):
+        data_cache._canonical(object())
@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tulip_mania_next.decimation import (
+    decimate_axes_lines,
+    decimate_figure,
+    decimate_indices,
+    is_monotonic,
+    lttb_indices,
+    minmax_indices,
+)
+
+
+def test_lttb_keeps_threshold_points_including_ends():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 100)
+    indices = lttb_indices(x, y, 500)
+
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(x) - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_keeps_a_spike():
+    x = np.arange(5_000, dtype=float)
+    y = np.zeros_like(x)
+    y[2_345] = 100.0
+    assert 2_345 in lttb_indices(x, y, 100)
+
+
+def test_lttb_returns_everything_under_the_threshold():
+    x = np.arange(50, dtype=float)
+    assert np.array_equal(lttb_indices(x, x, 100), np.arange(50))
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    rng = np.random.default_rng(0)
+    y = rng.standard_normal(1_000)
+    indices = minmax_indices(y, 100)
+
+    assert len(indices) <= 100
+    for bucket in np.split(np.arange(1_000), 50):
+        assert bucket[np.argmin(y[bucket])] in indices
+        assert bucket[np.argmax(y[bucket])] in indices
+
+
+def test_decimate_indices_keeps_extrema_and_gap_starts():
+    y = np.cos(np.arange(20_000) / 50.0)
+    y[7_000:7_100] = np.nan
+    y[12_000] = 5.0
+    indices = decimate_indices(None, y, 1_000)
+
+    assert {0, len(y) - 1, 7_000, 12_000} <= set(indices.tolist())
+
+
+def test_decimate_indices_rejects_unknown_method():
+    with pytest.raises(ValueError):
+        decimate_indices(None, np.arange(5_000.0), 100, method="every-other")
+
+
+def _long_trace(**trace):
+    x = np.arange(10_000, dtype=float)
+    return {"type": "scatter", "x": x, "y": np.sin(x / 50), **trace}
+
+
+def _points(fig_dict):
+    return [len(trace["y"]) for trace in fig_dict["data"]]
+
+
+def test_decimate_figure_reduces_plain_lines():
+    fig_dict = {"data": [_long_trace(mode="lines", text=[str(i) for i in range(10_000)]), _long_trace()]}
+    stats = decimate_figure(fig_dict, threshold=500)
+
+    assert _points(fig_dict) == [len(fig_dict["data"][0]["x"])] * 2
+    assert all(points <= 510 for points in _points(fig_dict))
+    assert len(fig_dict["data"][0]["text"]) == len(fig_dict["data"][0]["y"])
+    assert stats["traces_decimated"] == 2
+
+
+@pytest.mark.parametrize("trace", [
+    {"mode": "markers"},
+    {"mode": "lines+markers"},
+    {"stackgroup": "one"},
+    {"fill": "tonexty"},
+    {"type": "bar"},
+])
+def test_decimate_figure_skips_points_that_are_drawn_or_stacked(trace):
+    fig_dict = {"data": [_long_trace(**trace)]}
+    assert decimate_figure(fig_dict, threshold=500)["traces_decimated"] == 0
+    assert _points(fig_dict) == [10_000]
+
+
+def test_decimate_figure_skips_the_base_of_a_fill_to_next():
+    fig_dict = {"data": [_long_trace(), _long_trace(fill="tonexty")]}
+    decimate_figure(fig_dict, threshold=500)
+    assert _points(fig_dict) == [10_000, 10_000]
+
+
+def test_decimate_figure_skips_non_monotonic_x():
+    rng = np.random.default_rng(0)
+    fig_dict = {"data": [_long_trace(x=rng.standard_normal(10_000))]}
+    decimate_figure(fig_dict, threshold=500)
+    assert _points(fig_dict) == [10_000]
+
+
+def test_decimate_figure_handles_dates_and_typed_arrays():
+    go = pytest.importorskip("plotly.graph_objects")
+    dates = pd.date_range("2000-01-01", periods=10_000, freq="D")
+    fig_dict = go.Figure(go.Scatter(x=dates, y=np.cos(np.arange(10_000) / 20))).to_plotly_json()
+    assert decimate_figure(fig_dict, threshold=500)["traces_decimated"] == 1
+
+
+@pytest.mark.parametrize("x, expected", [
+    (np.arange(5), True),
+    (np.arange(5)[::-1], True),
+    (np.array([0, 1, 1, 2]), True),
+    (np.array([0, 2, 1]), False),
+    (np.array([0, np.nan, 2]), False),
+    (np.array(["2020-01-01", "2020-01-02"], dtype="datetime64[ns]"), True),
+    (np.array(["a", 1], dtype=object), False),
+])
+def test_is_monotonic(x, expected):
+    assert is_monotonic(x) is expected
+
+
+def test_matplotlib_scatter_lines_are_left_alone():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    x = np.arange(10_000, dtype=float)
+    figure, ax = plt.subplots()
+    ax.plot(x, np.sin(x / 50))
+    ax.plot(x, np.cos(x / 50), "o")
+    stats, restore = decimate_axes_lines(figure, threshold=500)
+
+    line, markers = ax.get_lines()
+    assert stats["traces_decimated"] == 1
+    assert len(line.get_xdata()) < 600 and len(markers.get_xdata()) == 10_000
+    restore()
+    assert len(line.get_xdata()) == 10_000
+    plt.close(figure)
@@ -0,0 +1,90 @@
+import pytest
+
+from tulip_mania_next import discovery
+from tulip_mania_next.discovery import matches, toc_notebooks, walk_notebooks
+
+pytest.importorskip("yaml")
+
+
+@pytest.fixture
+def book(tmp_path):
+    for name in (
+        "intro.ipynb",
+        "notebooks/Countries/ctry_canada.ipynb",
+        "notebooks/Countries/ctry_japan.ipynb",
+        "notebooks/Countries/generated/ctry_canada.ipynb",
+        "notebooks/Markets/Bonds/curve.ipynb",
+        "notebooks/Markets/Bonds/deep/spreads.ipynb",
+        "notebooks/Markets/notes.md",
+        "_build/html/copy.ipynb",
+    ):
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("{}")
+    (tmp_path / "myst.yml").write_text("version: 1\nextends:\n  - toc.yml\n")
+    (tmp_path / "toc.yml").write_text(
+        "project:\n"
+        "  toc:\n"
+        "    - file: intro.ipynb\n"
+        "    - title: Countries\n"
+        "      children:\n"
+        "        - pattern: notebooks/Countries/*.ipynb\n"
+        "    - pattern: notebooks/Markets/**/*.ipynb\n"
+    )
+    return tmp_path
+
+
+def _relative(paths, root):
+    return [path.relative_to(root.resolve()).as_posix() for path in paths]
+
+
+def test_toc_resolution_in_toc_order(book):
+    found = toc_notebooks(book)
+    assert _relative(found, book) == [
+        "intro.ipynb",
+        "notebooks/Countries/ctry_canada.ipynb",
+        "notebooks/Countries/ctry_japan.ipynb",
+        "notebooks/Markets/Bonds/curve.ipynb",
+        "notebooks/Markets/Bonds/deep/spreads.ipynb",
+    ]
+
+
+def test_manifest_is_reused_until_a_directory_changes(book, monkeypatch):
+    first = toc_notebooks(book)
+    monkeypatch.setattr(discovery, "_resolve", lambda *args: pytest.fail("manifest not reused"))
+    assert toc_notebooks(book) == first
+
+    monkeypatch.undo()
+    (book / "notebooks/Countries/ctry_brazil.ipynb").write_text("{}")
+    assert "notebooks/Countries/ctry_brazil.ipynb" in _relative(toc_notebooks(book), book)
+
+
+def test_listed_files_created_later_are_found(book):
+    with open(book / "toc.yml", "a") as f:
+        f.write("    - file: notebooks/Rates/outlook.ipynb\n    - file: notebooks/Markets/later.ipynb\n")
+    toc_notebooks(book)
+
+    (book / "notebooks/Markets/later.ipynb").write_text("{}")
+    assert "notebooks/Markets/later.ipynb" in _relative(toc_notebooks(book), book)
+
+    (book / "notebooks/Rates").mkdir()
+    (book / "notebooks/Rates/outlook.ipynb").write_text("{}")
+    assert "notebooks/Rates/outlook.ipynb" in _relative(toc_notebooks(book), book)
+
+
+def test_no_toc_returns_none(tmp_path):
+    assert toc_notebooks(tmp_path) is None
+
+
+def test_walk_prunes_build_output(book):
+    found = _relative(walk_notebooks(book.resolve()), book)
+    assert "_build/html/copy.ipynb" not in found
+    assert "notebooks/Countries/generated/ctry_canada.ipynb" in found
+
+
+def test_matches_substrings_and_globs(book):
+    path = book / "notebooks/Markets/Bonds/deep/spreads.ipynb"
+    assert matches(path, "Bonds", book)
+    assert matches(path, "Markets/Bonds/**", book)
+    assert matches(path, "deep/*.ipynb", book)
+    assert not matches(path, "Markets/*.ipynb", book)
+    assert not matches(path, "Countries", book)
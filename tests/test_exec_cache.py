@@ -0,0 +1,47 @@
+import nbformat
+
+from tulip_mania_next.exec_cache import ExecutionCache, notebook_fingerprint
+
+
+def test_fingerprint_ignores_outputs_and_markdown(notebook_factory):
+    path = notebook_factory("nb.ipynb", ["x = 1", "print(x)"])
+    before = notebook_fingerprint(path)
+
+    nb = nbformat.read(path, as_version=4)
+    nb.cells[1].outputs = [nbformat.v4.new_output("stream", name="stdout", text="1\n")]
+    nb.cells.append(nbformat.v4.new_markdown_cell("# Notes"))
+    nbformat.write(nb, path)
+
+    assert notebook_fingerprint(path) == before
+
+
+def test_fingerprint_changes_with_code_kernel_env_and_data_date(notebook_factory):
+    path = notebook_factory("nb.ipynb", ["x = 1"])
+    other = notebook_factory("other.ipynb", ["x = 2"])
+    base = notebook_fingerprint(path)
+
+    assert notebook_fingerprint(other) != base
+    assert notebook_fingerprint(path, kernel_name="ir") != base
+    assert notebook_fingerprint(path, env_hash="abc") != base
+    assert notebook_fingerprint(path, data_as_of="2025-01-31") != base
+
+
+def test_fingerprint_does_not_merge_cell_boundaries(notebook_factory):
+    one = notebook_factory("one.ipynb", ["ab"])
+    two = notebook_factory("two.ipynb", ["a", "b"])
+    assert notebook_fingerprint(one) != notebook_fingerprint(two)
+
+
+def test_cache_is_fresh_only_after_a_clean_run(tmp_path, notebook_factory):
+    path = notebook_factory("nb.ipynb", ["x = 1"])
+    cache = ExecutionCache(tmp_path / "cache", project_root=tmp_path)
+    assert not cache.is_fresh(path)
+
+    cache.record(path, success=False)
+    assert not cache.is_fresh(path)
+
+    cache.record(path, success=True)
+    assert ExecutionCache(tmp_path / "cache", project_root=tmp_path).is_fresh(path)
+
+    notebook_factory("nb.ipynb", ["x = 2"])
+    assert not cache.is_fresh(path)
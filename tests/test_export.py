@@ -0,0 +1,84 @@
+import re
+from pathlib import Path
+
+import pytest
+
+from tulip_mania_next import columns_framework
+from tulip_mania_next.country_pages import summary
+from tulip_mania_next.export import ASSET_SUBDIR, PageSpec, export_pages, main, write_assets
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CANADA = {"ctry_name": "Canada", "ctry_iso2": "CA", "ccy": "CAD"}
+
+
+@pytest.fixture(autouse=True)
+def default_options():
+    columns_framework.reset_options()
+    yield
+    columns_framework.reset_options()
+
+
+def failing(**kwargs):
+    raise RuntimeError("no data")
+
+
+def test_write_assets_names_files_by_content(tmp_path):
+    files = write_assets(tmp_path)
+
+    assert set(files) == {"columns.css", "table.css", "table.js", "lazy.js"}
+    assert re.fullmatch(r"columns\.[0-9a-f]{8}\.css", files["columns.css"])
+    assert (tmp_path / files["table.js"]).read_text(encoding="utf-8") == columns_framework.TABLE_JS
+
+    written = {name: (tmp_path / name).stat().st_mtime_ns for name in files.values()}
+    assert write_assets(tmp_path) == files
+    assert {name: (tmp_path / name).stat().st_mtime_ns for name in files.values()} == written
+
+
+def test_pages_link_shared_assets_and_report_failures(tmp_path):
+    specs = [
+        PageSpec("canada", summary, CANADA, "Canada"),
+        PageSpec("nested/japan", summary, {"ctry_name": "Japan", "ctry_iso2": "JP"}),
+        PageSpec("broken", failing),
+    ]
+    results = export_pages(specs, tmp_path, max_workers=1)
+
+    assert [result["name"] for result in results] == ["canada", "nested/japan", "broken"]
+    assert "RuntimeError: no data" in results[2]["error"]
+    assert not (tmp_path / "broken.html").exists()
+
+    css = write_assets(tmp_path / ASSET_SUBDIR)["columns.css"]
+    canada = (tmp_path / "canada.html").read_text(encoding="utf-8")
+    japan = (tmp_path / "nested" / "japan.html").read_text(encoding="utf-8")
+    assert f'href="assets/{css}"' in canada and "<title>Canada</title>" in canada
+    assert f'href="../assets/{css}"' in japan and "<title>nested/japan</title>" in japan
+    assert ".tmn-columns {" not in canada
+
+    # Building in this process leaves the caller's options alone
+    assert columns_framework.OPTIONS["shared_assets"] is False
+
+
+def test_worker_pool_builds_the_same_pages(tmp_path):
+    specs = [PageSpec(key, summary, {"ctry_name": key.title(), "ctry_iso2": key[:2]}) for key in ("canada", "japan")]
+    results = export_pages(specs, tmp_path, max_workers=2)
+
+    assert [result["name"] for result in results] == ["canada", "japan"]
+    assert all("error" not in result and result["bytes"] > 0 for result in results)
+
+
+def test_cli_exports_the_country_matrix(tmp_path, capsys):
+    status = main([
+        "tulip_mania_next.country_pages:summary",
+        "--matrix", str(ROOT / "notebooks" / "Countries" / "matrix.toml"),
+        "--title", "{ctry_name} ({ccy})",
+        "--output", str(tmp_path),
+        "--workers", "1",
+    ])
+
+    assert status == 0
+    assert "<title>United Kingdom (GBP)</title>" in (tmp_path / "uk.html").read_text(encoding="utf-8")
+    assert "0 failed" in capsys.readouterr().out
+
+
+def test_cli_rejects_unknown_builders(tmp_path):
+    assert main(["reports.countries:summary", "--output", str(tmp_path)]) == 2
@@ -0,0 +1,69 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tulip_mania_next.figure_encoding import decode_array, encode_array, encode_figure, is_typed_array
+
+go = pytest.importorskip("plotly.graph_objects")
+
+
+def _encoded(figure, threshold=1000):
+    fig_dict, stats = encode_figure(figure.to_plotly_json(), threshold=threshold)
+    return fig_dict, stats
+
+
+def test_object_dtype_numbers_stay_numbers():
+    figure = go.Figure(go.Scatter(x=list(range(1500)), y=pd.Series(range(1500), dtype=object)))
+    fig_dict, stats = _encoded(figure)
+
+    y = fig_dict["data"][0]["y"]
+    assert is_typed_array(y)
+    assert np.array_equal(decode_array(y), np.arange(1500))
+    assert fig_dict["layout"].get("yaxis", {}).get("type") != "date"
+    assert stats["arrays_encoded"] == 2
+
+
+def test_object_dtype_floats_from_a_transposed_frame():
+    frame = pd.DataFrame({"label": ["a", "b"], **{f"c{i}": [float(i), i / 2] for i in range(1200)}}).T
+    values = frame.iloc[1:, 0]
+    assert values.dtype == object
+
+    fig_dict, _ = _encoded(go.Figure(go.Scatter(y=values)))
+    assert np.allclose(decode_array(fig_dict["data"][0]["y"]), np.arange(1200, dtype=float))
+    assert "type" not in fig_dict["layout"].get("yaxis", {})
+
+
+def test_datetimes_become_epoch_ms_on_a_date_axis():
+    dates = pd.date_range("2020-01-01", periods=1500, freq="D")
+    for x in (dates, list(dates.to_pydatetime()), np.array(list(dates.date), dtype=object)):
+        fig_dict, _ = _encoded(go.Figure(go.Scatter(x=x, y=np.arange(1500.0))))
+        encoded = decode_array(fig_dict["data"][0]["x"])
+        assert encoded[0] == dates[0].timestamp() * 1000
+        assert fig_dict["layout"]["xaxis"]["type"] == "date"
+
+
+def test_text_and_short_arrays_are_left_alone():
+    labels = [f"point {i}" for i in range(1500)]
+    fig_dict, stats = _encoded(go.Figure(go.Scatter(y=list(range(10)), text=labels)))
+    assert fig_dict["data"][0]["text"] == labels or list(fig_dict["data"][0]["text"]) == labels
+    assert stats["arrays_encoded"] == 0
+
+
+@pytest.mark.parametrize("values, dtype", [
+    (np.arange(200), "u1"),
+    (np.arange(-5, 300), "i2"),
+    (np.array([0.5, 1.25]), "f4"),
+    (np.array([0.1, 0.2]), "f8"),
+])
+def test_encode_array_picks_the_smallest_lossless_dtype(values, dtype):
+    spec = encode_array(values)
+    assert spec["dtype"] == dtype
+    assert np.array_equal(decode_array(spec), values)
+
+
+def test_nat_encodes_as_nan():
+    values = np.array([datetime.datetime(2020, 1, 1), None], dtype="datetime64[ns]")
+    decoded = decode_array(encode_array(values))
+    assert np.isnan(decoded[1])
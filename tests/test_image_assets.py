@@ -0,0 +1,84 @@
+import pytest
+
+from tulip_mania_next import image_assets
+from tulip_mania_next.image_assets import asset_url, prune_assets, publish_assets, rebase_asset_urls
+
+
+def test_asset_url_does_not_bake_in_the_base_url(monkeypatch):
+    monkeypatch.delenv(image_assets.ENV_URL, raising=False)
+    monkeypatch.setenv("BASE_URL", "/tulip-mania-next")
+    assert asset_url("abc.webp") == "/_static/figures/abc.webp"
+
+    monkeypatch.setenv(image_assets.ENV_URL, "https://cdn.example/figs/")
+    assert asset_url("abc.webp") == "https://cdn.example/figs/abc.webp"
+
+
+def test_rebase_prefixes_root_references_once(tmp_path):
+    page = tmp_path / "countries" / "canada.json"
+    page.parent.mkdir()
+    page.write_text(
+        '{"html": "<img src=\\"/_static/figures/a.webp\\"><img src=\\"/tulip-mania-next/_static/figures/b.webp\\">"}'
+    )
+    (tmp_path / "index.html").write_text("<img src='/_static/figures/c.png'> see docs/_static/figures/")
+    (tmp_path / "app.js").write_text("'/_static/figures/'")
+
+    assert rebase_asset_urls(tmp_path, "/tulip-mania-next/") == 2
+    assert page.read_text().count('"/tulip-mania-next/_static/figures/') == 2
+    assert "'/tulip-mania-next/_static/figures/c.png'" in (tmp_path / "index.html").read_text()
+    assert "docs/_static/figures/" in (tmp_path / "index.html").read_text()
+    assert (tmp_path / "app.js").read_text() == "'/_static/figures/'"
+
+    assert rebase_asset_urls(tmp_path, "/tulip-mania-next") == 0
+    assert rebase_asset_urls(tmp_path, "") == 0
+
+
+def test_publish_copies_files_and_rebases(tmp_path, monkeypatch):
+    source = tmp_path / "figures"
+    source.mkdir()
+    (source / "a.webp").write_bytes(b"image")
+    (source / ".a.webp.1.tmp").write_bytes(b"partial")
+    site = tmp_path / "site"
+    site.mkdir()
+    (site / "page.html").write_text('<img src="/_static/figures/a.webp">')
+    monkeypatch.setenv("BASE_URL", "/repo")
+
+    assert publish_assets(site, source) == 1
+    assert publish_assets(site, source) == 0
+    assert (site / "_static" / "figures" / "a.webp").read_bytes() == b"image"
+    assert (site / "page.html").read_text() == '<img src="/repo/_static/figures/a.webp">'
+
+
+def test_save_figure_is_content_addressed(tmp_path, monkeypatch):
+    matplotlib = pytest.importorskip("matplotlib")
+    pytest.importorskip("PIL")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    monkeypatch.setenv(image_assets.ENV_DIR, str(tmp_path))
+    monkeypatch.delenv(image_assets.ENV_URL, raising=False)
+    figure, ax = plt.subplots()
+    ax.plot([1, 2, 3])
+
+    url, stats = image_assets.save_figure(figure, image_format="png")
+    again, stats_again = image_assets.save_figure(figure, image_format="png")
+    plt.close(figure)
+
+    assert url == again == f"/_static/figures/{stats['asset']}"
+    assert not stats["asset_reused"] and stats_again["asset_reused"]
+    assert (tmp_path / stats["asset"]).exists()
+
+
+def test_prune_deletes_only_unreferenced_figures(tmp_path):
+    figures = tmp_path / "figures"
+    figures.mkdir()
+    kept, stored, dropped = (f"{c * 20}.webp" for c in "abc")
+    for name in (kept, stored, dropped, ".gitkeep"):
+        (figures / name).write_bytes(b"RIFF")
+    notebook = tmp_path / "nb.ipynb"
+    notebook.write_text(f'{{"outputs": "<img src=\\"/_static/figures/{kept}\\">"}}')
+    (tmp_path / "store" / "ab").mkdir(parents=True)
+    (tmp_path / "store" / "ab" / "key.json").write_text(f'"<img src=\\"/_static/figures/{stored}\\">"')
+
+    stats = prune_assets([notebook, tmp_path / "store", tmp_path / "missing.ipynb"], figures)
+    assert stats == {"deleted": 1, "bytes_deleted": 4}
+    assert sorted(p.name for p in figures.iterdir()) == sorted([".gitkeep", kept, stored])
@@ -0,0 +1,76 @@
+import nbformat
+import pytest
+
+import main
+from tulip_mania_next import kernel_pool
+from tulip_mania_next.kernel_pool import KernelPool
+
+pytest.importorskip("ipykernel")
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = KernelPool(prelude="tulip_mania_next.columns_framework", size=1, startup_timeout=60)
+    pool.start()
+    monkeypatch.setattr(kernel_pool, "_WORKER_POOL", pool)
+    yield pool
+    pool.shutdown()
+
+
+def _stdout(path):
+    nb = nbformat.read(path, as_version=4)
+    return "".join(o.get("text", "") for cell in nb.cells for o in cell.outputs if o.output_type == "stream")
+
+
+def test_notebooks_in_sequence_do_not_share_rendering_state(pool, notebook_factory):
+    first = notebook_factory("first.ipynb", [
+        "from tulip_mania_next import columns_framework as cf\n"
+        "cf.configure(shared_assets=True, lazy=True, decimate=True)\n"
+        "cols = cf.columns(2)\n"
+        "cols[0].table([[1, 2]], headers=['a', 'b'])\n"
+        "html = cols.to_html()\n"
+        "x = 1",
+    ])
+    second = notebook_factory("second.ipynb", [
+        "from tulip_mania_next import columns_framework as cf\n"
+        "print(cf.OPTIONS['shared_assets'], cf.OPTIONS['lazy'], cf.OPTIONS['decimate'], sorted(cf._PAGE_ASSETS))\n"
+        "print('x' in globals())",
+    ])
+
+    kernel = pool._idle[0]
+    for path in (first, second):
+        _, success, error, _ = main.execute_notebook(path, timeout=60)
+        assert success, error
+    assert kernel.uses == 2 and pool._idle == [kernel]
+
+    assert _stdout(second) == "False False False []\nFalse\n"
+
+
+def test_shell_settings_are_restored_between_notebooks(pool, notebook_factory):
+    first = notebook_factory("first.ipynb", [
+        "from IPython.core.interactiveshell import InteractiveShell\n"
+        "InteractiveShell.ast_node_interactivity = 'all'\n"
+        "get_ipython().ast_node_interactivity = 'all'\n"
+        "get_ipython().display_formatter.formatters['text/latex'].enabled = False",
+    ])
+    second = notebook_factory("second.ipynb", [
+        "shell = get_ipython()\n"
+        "print(shell.ast_node_interactivity, shell.display_formatter.formatters['text/latex'].enabled)",
+    ])
+
+    kernel = pool._idle[0]
+    for path in (first, second):
+        _, success, error, _ = main.execute_notebook(path, timeout=60)
+        assert success, error
+    assert pool._idle == [kernel]
+    assert _stdout(second) == "last_expr True\n"
+
+
+def test_kernel_with_new_display_printers_is_recycled(pool, notebook_factory):
+    path = notebook_factory("printers.ipynb", [
+        "get_ipython().display_formatter.formatters['text/plain'].for_type(complex, lambda o, p, c: p.text('z'))",
+    ])
+    kernel = pool._idle[0]
+    _, success, error, _ = main.execute_notebook(path, timeout=60)
+    assert success, error
+    assert kernel not in pool._idle
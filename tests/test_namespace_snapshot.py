@@ -0,0 +1,11 @@
+from types import SimpleNamespace
+
+from tulip_mania_next.namespace_snapshot import _user_names
+
+
+def test_underscored_user_names_are_kept_and_ipython_history_is_not():
+    history = ["_", "__", "___", "_i", "_ii", "_iii", "_i3", "_3", "_oh", "_ih", "_dh", "__name__", "__builtins__"]
+    user = ["_cache", "_df2", "__private", "_idx", "data"]
+    shell = SimpleNamespace(user_ns={name: 1 for name in history + user + ["In", "hidden"]}, user_ns_hidden={"hidden": 1})
+
+    assert sorted(_user_names(shell)) == sorted(user)
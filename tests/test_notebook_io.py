@@ -0,0 +1,54 @@
+import os
+
+import nbformat
+
+from tulip_mania_next.notebook_io import normalized_hash, serialize, write_notebook
+from conftest import make_notebook
+
+
+def _executed(html_id: str, count: int):
+    nb = make_notebook(["fig"])
+    # A re-executed notebook keeps its cell ids
+    nb.cells[0].id = "fig-cell"
+    nb.cells[0].execution_count = count
+    nb.cells[0].metadata["execution"] = {"iopub.execute_input": f"2025-01-0{count}T00:00:00Z"}
+    nb.cells[0].outputs = [nbformat.v4.new_output(
+        "display_data", data={"text/html": f'<div id="{html_id}"></div><script>draw("{html_id}")</script>'}
+    )]
+    return nb
+
+
+def test_hash_ignores_counts_timing_and_random_ids():
+    first = serialize(_executed("columns-0123abcd", 1))
+    second = serialize(_executed("columns-89abcdef", 2))
+    assert first != second
+    assert normalized_hash(first) == normalized_hash(second)
+
+
+def test_hash_sees_real_output_changes():
+    nb = _executed("columns-0123abcd", 1)
+    changed = _executed("columns-0123abcd", 1)
+    changed.cells[0].outputs[0].data["text/html"] += "<p>new</p>"
+    assert normalized_hash(serialize(nb)) != normalized_hash(serialize(changed))
+
+
+def test_serialize_matches_nbformat(tmp_path):
+    nb = _executed("columns-0123abcd", 1)
+    path = tmp_path / "nb.ipynb"
+    nbformat.write(nb, path)
+    assert path.read_text(encoding="utf-8") == serialize(nb)
+
+
+def test_write_notebook_leaves_unchanged_files_alone(tmp_path):
+    path = tmp_path / "nb.ipynb"
+    assert write_notebook(_executed("columns-0123abcd", 1), path)
+    os.utime(path, ns=(1, 1))
+
+    assert not write_notebook(_executed("columns-89abcdef", 2), path)
+    assert path.stat().st_mtime_ns == 1
+
+    changed = _executed("columns-0123abcd", 1)
+    changed.cells[0].outputs = []
+    assert write_notebook(changed, path)
+    assert nbformat.read(path, as_version=4).cells[0].outputs == []
+    assert [p.name for p in tmp_path.iterdir()] == ["nb.ipynb"]
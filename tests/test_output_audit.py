@@ -0,0 +1,55 @@
+import json
+
+import pytest
+
+from tulip_mania_next.output_audit import Budget, OutputBudgets, audit_notebook_outputs
+
+
+def test_parse_overrides_defaults():
+    budgets = OutputBudgets.parse(["page=2048:4096", "cell=:512"])
+
+    assert budgets.page == Budget(warn_kb=2048, fail_kb=4096)
+    assert budgets.cell == Budget(warn_kb=None, fail_kb=512)
+    assert budgets.notebook == OutputBudgets().notebook
+
+
+@pytest.mark.parametrize("spec", ["page", "site=10", "page=", "page=lots", "cell=1:x"])
+def test_parse_rejects_malformed_specs(spec):
+    with pytest.raises(ValueError):
+        OutputBudgets.parse([spec])
+
+
+def test_budget_levels():
+    budget = Budget(warn_kb=1, fail_kb=2)
+    assert budget.level(1024) is None
+    assert budget.level(1025) == "warn"
+    assert budget.level(2049) == "fail"
+
+
+def test_audit_counts_displayed_mime_and_skips_removed_cells(tmp_path):
+    html = "<div>" + "x" * 5_000 + "</div>"
+    cells = [
+        {
+            "cell_type": "code", "id": "a", "metadata": {}, "source": "", "execution_count": 1,
+            "outputs": [{
+                "output_type": "display_data", "metadata": {},
+                "data": {"text/html": html, "text/plain": "<div>"},
+            }],
+        },
+        {
+            "cell_type": "code", "id": "b", "metadata": {"tags": ["remove-output"]}, "source": "",
+            "execution_count": 2,
+            "outputs": [{"output_type": "stream", "name": "stdout", "text": "y" * 3_000}],
+        },
+    ]
+    path = tmp_path / "nb.ipynb"
+    path.write_text(json.dumps({"cells": cells, "metadata": {}, "nbformat": 4, "nbformat_minor": 5}))
+
+    audit = audit_notebook_outputs(path)
+
+    assert audit["page_bytes"] == len(html)
+    assert audit["by_mime"] == {"text/html": len(html), "text/plain": 5, "stream/stdout": 3_000}
+    assert [cell["cell"] for cell in audit["cells"]] == [1, 2]
+
+    violations = OutputBudgets.parse(["cell=4:", "page=:1"]).evaluate(audit)
+    assert [(v.level, v.scope) for v in violations] == [("fail", "page"), ("warn", "cell")]
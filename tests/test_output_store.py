@@ -0,0 +1,96 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from tulip_mania_next.output_store import METADATA_KEY, MissingBlob, OutputStore, unpublished_reason
+from conftest import make_notebook
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _with_output(path, html):
+    nb = make_notebook(["fig"])
+    nb.cells[0].outputs = [nbformat.v4.new_output("display_data", data={"text/html": html})]
+    nbformat.write(nb, path)
+    return path
+
+
+def test_round_trip_restores_outputs(tmp_path):
+    store = OutputStore(tmp_path / "store", threshold=100)
+    path = _with_output(tmp_path / "nb.ipynb", "<div>" + "x" * 1_000 + "</div>")
+    original = path.read_text(encoding="utf-8")
+
+    assert store.dehydrate_file(path)["moved"] == 1
+    output = nbformat.read(path, as_version=4).cells[0].outputs[0]
+    assert "text/html" not in output.data and METADATA_KEY in output.metadata
+
+    assert store.rehydrate_file(path)["restored"] == 1
+    assert path.read_text(encoding="utf-8") == original
+
+
+def test_rehydrating_a_missing_blob_raises_and_leaves_the_notebook(tmp_path):
+    path = _with_output(tmp_path / "nb.ipynb", "y" * 1_000)
+    OutputStore(tmp_path / "store", threshold=100).dehydrate_file(path)
+    dehydrated = path.read_text(encoding="utf-8")
+
+    with pytest.raises(MissingBlob):
+        OutputStore(tmp_path / "elsewhere").rehydrate_file(path)
+    assert path.read_text(encoding="utf-8") == dehydrated
+
+
+def _git_repo(path):
+    subprocess.run(["git", "init", "-q", str(path)], check=True)
+    (path / ".gitignore").write_text("/_build/\n")
+    return path
+
+
+def test_unpublished_reason(tmp_path, monkeypatch):
+    repo = _git_repo(tmp_path / "repo")
+    monkeypatch.chdir(repo)
+
+    assert unpublished_reason(repo / "_output_store") is None
+    assert "ignored" in unpublished_reason(repo / "_build" / ".output_store")
+    assert "outside" in unpublished_reason(tmp_path / "store")
+
+
+def test_deploy_rehydration_fails_on_missing_outputs(tmp_path):
+    _with_output(tmp_path / "ok.ipynb", "z" * 1_000)
+    broken = _with_output(tmp_path / "broken.ipynb", "w" * 1_000)
+    store = OutputStore(tmp_path / "_output_store", threshold=100)
+    store.dehydrate_file(tmp_path / "ok.ipynb")
+    OutputStore(tmp_path / "lost", threshold=100).dehydrate_file(broken)
+
+    result = subprocess.run(
+        [sys.executable, "-m", "tulip_mania_next.output_store", "rehydrate"],
+        cwd=tmp_path, capture_output=True, text=True, env={"PYTHONPATH": str(ROOT)},
+    )
+    assert result.returncode == 1
+    assert "broken.ipynb" in result.stderr
+    ok = nbformat.read(tmp_path / "ok.ipynb", as_version=4).cells[0].outputs[0]
+    assert ok.data["text/html"] == "z" * 1_000
+
+
+def test_blobs_are_uncompressed_json(tmp_path):
+    store = OutputStore(tmp_path / "store")
+    key = store.put("<div>plot</div>")
+    assert (tmp_path / "store" / key[:2] / f"{key}.json").read_text(encoding="utf-8") == '"<div>plot</div>"'
+    assert store.get(key) == "<div>plot</div>"
+
+
+def test_prune_deletes_only_unreferenced_blobs(tmp_path):
+    store = OutputStore(tmp_path / "store", threshold=100)
+    kept = _with_output(tmp_path / "kept.ipynb", "k" * 1_000)
+    dropped = _with_output(tmp_path / "dropped.ipynb", "d" * 1_000)
+    store.dehydrate_file(kept)
+    store.dehydrate_file(dropped)
+    # The output changed and the notebook no longer references its blob
+    _with_output(dropped, "small")
+
+    stats = store.prune([kept, dropped])
+    assert stats["deleted"] == 1
+    [key] = nbformat.read(kept, as_version=4).cells[0].outputs[0].metadata[METADATA_KEY]["refs"].values()
+    assert [p.name for p in (tmp_path / "store").glob("*/*")] == [f"{key}.json"]
+    assert store.rehydrate_file(kept)["restored"] == 1
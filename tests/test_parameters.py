@@ -0,0 +1,108 @@
+import shutil
+import subprocess
+from pathlib import Path
+
+import nbformat
+import pytest
+
+from tulip_mania_next.discovery import toc_notebooks
+from tulip_mania_next.parameters import (
+    DEFAULT_MATRIX,
+    INJECTED_TAG,
+    MatrixRun,
+    load_matrix,
+    materialize,
+    parameterize,
+    without_rendered,
+)
+from conftest import make_notebook
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _template():
+    return make_notebook(["import x", ('ctry = "US"', ["parameters"]), "print(ctry)"])
+
+
+def test_injects_after_the_parameters_cell():
+    nb = parameterize(_template(), {"ctry": "CA", "n": 3}, key="canada")
+
+    injected = nb.cells[2]
+    assert INJECTED_TAG in injected.metadata["tags"]
+    assert injected.source == "# Parameters\nctry = 'CA'\nn = 3\n"
+    assert nb.cells[1].source == 'ctry = "US"'
+    assert nb.metadata["tulip_parameters"] == {"key": "canada", "parameters": {"ctry": "CA", "n": 3}}
+
+
+def test_injects_at_the_top_without_parameters_cell():
+    nb = parameterize(make_notebook(["print(1)"]), {"a": 1})
+    assert INJECTED_TAG in nb.cells[0].metadata["tags"]
+
+
+def test_reparameterizing_replaces_the_injected_cell():
+    once = parameterize(_template(), {"ctry": "CA"})
+    twice = parameterize(once, {"ctry": "JP"})
+
+    injected = [c for c in twice.cells if INJECTED_TAG in c.metadata["tags"]]
+    assert len(injected) == 1 and "JP" in injected[0].source
+
+
+def test_load_matrix_resolves_paths(tmp_path):
+    (tmp_path / "matrix.toml").write_text(
+        '[[matrix]]\ntemplate = "tpl.ipynb"\noutput = "out/{key}_{iso}.ipynb"\n'
+        '[matrix.runs.canada]\niso = "CA"\n'
+    )
+    [run] = load_matrix(tmp_path / "matrix.toml")
+
+    assert run.key == "canada"
+    assert run.template == (tmp_path / "tpl.ipynb").resolve()
+    assert run.output == (tmp_path / "out" / "canada_CA.ipynb").resolve()
+    assert run.parameters == {"iso": "CA"}
+
+
+def test_materialize_keeps_outputs_while_code_is_unchanged(tmp_path):
+    template = tmp_path / "tpl.ipynb"
+    nbformat.write(_template(), template)
+    run = MatrixRun("canada", template, tmp_path / "out.ipynb", {"ctry": "CA"})
+
+    assert materialize(run)
+    executed = nbformat.read(run.output, as_version=4)
+    executed.cells[-1].outputs = [nbformat.v4.new_output("stream", name="stdout", text="CA\n")]
+    nbformat.write(executed, run.output)
+
+    assert not materialize(run)
+    assert nbformat.read(run.output, as_version=4).cells[-1].outputs[0].text == "CA\n"
+
+    run.parameters = {"ctry": "JP"}
+    assert materialize(run)
+
+
+@pytest.fixture
+def rendered():
+    return [run.output for run in load_matrix(ROOT / DEFAULT_MATRIX)]
+
+
+def test_rendered_pages_are_ignored_by_git(rendered):
+    for output in rendered:
+        result = subprocess.run(["git", "check-ignore", "-q", str(output)], cwd=ROOT)
+        assert result.returncode == 0, f"{output} would be committed"
+
+
+def test_rendered_pages_are_not_published(rendered, tmp_path):
+    pytest.importorskip("yaml")
+    # The project's TOC over a tree holding the rendered pages
+    for name in ("myst.yml", "toc.yml"):
+        shutil.copy(ROOT / name, tmp_path / name)
+    rendered = [tmp_path / output.relative_to(ROOT) for output in rendered]
+    for output in [*rendered, tmp_path / "notebooks" / "Countries" / "ctry_canada.ipynb"]:
+        make_notebook(["x = 1"], output)
+
+    published = toc_notebooks(tmp_path, manifest_path=tmp_path / "toc_manifest.json")
+    assert tmp_path / "notebooks" / "Countries" / "ctry_canada.ipynb" in published
+    assert not set(rendered) & set(published)
+
+
+def test_rendered_pages_are_left_out_of_other_runs(rendered, tmp_path):
+    published = [ROOT / "notebooks" / "Countries" / "ctry_canada.ipynb"]
+    assert without_rendered([*published, *rendered], ROOT / DEFAULT_MATRIX) == published
+    assert without_rendered(rendered, tmp_path / "missing.toml") == rendered
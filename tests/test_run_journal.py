@@ -0,0 +1,87 @@
+import pytest
+from nbclient.exceptions import CellTimeoutError
+
+from tulip_mania_next.run_journal import RetryPolicy, RunJournal, error_summary
+from conftest import make_notebook
+
+
+@pytest.fixture
+def notebooks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return [make_notebook(["x = 1"], tmp_path / name) and tmp_path / name for name in ("a.ipynb", "b.ipynb")]
+
+
+def test_resume_skips_completed_notebooks_of_an_interrupted_run(notebooks, tmp_path):
+    journal = RunJournal.start(notebooks, tmp_path / "journal.jsonl")
+    journal.record(notebooks[0], True)
+    journal.record(notebooks[1], False, "boom")
+    journal.close()
+
+    resumed = RunJournal.resume(notebooks, tmp_path / "journal.jsonl")
+    assert resumed.resumed and resumed.run_id == journal.run_id
+    assert resumed.remaining(notebooks) == [notebooks[1]]
+    resumed.close()
+
+
+def test_resume_reruns_notebooks_edited_since(notebooks, tmp_path):
+    journal = RunJournal.start(notebooks, tmp_path / "journal.jsonl")
+    journal.record(notebooks[0], True)
+    journal.close()
+    make_notebook(["x = 2"], notebooks[0])
+
+    resumed = RunJournal.resume(notebooks, tmp_path / "journal.jsonl")
+    assert resumed.remaining(notebooks) == notebooks
+    resumed.close()
+
+
+def test_resume_after_a_run_that_ended_with_failures_redoes_only_them(notebooks, tmp_path):
+    journal = RunJournal.start(notebooks, tmp_path / "journal.jsonl")
+    journal.record(notebooks[0], True)
+    journal.record(notebooks[1], False, "KeyError: 'ctry'")
+    journal.close(successful=1, failed=1)
+
+    resumed = RunJournal.resume(notebooks, tmp_path / "journal.jsonl")
+    assert resumed.resumed and resumed.run_id == journal.run_id
+    assert resumed.remaining(notebooks) == [notebooks[1]]
+    resumed.record(notebooks[1], True)
+    resumed.close(successful=1, failed=0)
+
+    again = RunJournal.resume(notebooks, tmp_path / "journal.jsonl")
+    assert not again.resumed
+    again.close()
+
+
+def test_resume_after_a_successful_run_starts_a_new_one(notebooks, tmp_path):
+    journal = RunJournal.start(notebooks, tmp_path / "journal.jsonl")
+    for nb in notebooks:
+        journal.record(nb, True)
+    journal.close(successful=2, failed=0)
+
+    resumed = RunJournal.resume(notebooks, tmp_path / "journal.jsonl")
+    assert not resumed.resumed
+    assert resumed.run_id != journal.run_id
+    assert resumed.remaining(notebooks) == notebooks
+    resumed.close()
+
+
+def test_retries_transient_errors_only():
+    policy = RetryPolicy(retries=2)
+    assert policy.should_retry("Cell execution error: ... ReadTimeout: HTTPSConnectionPool read timed out", 1)
+    assert policy.should_retry("HTTPError: 503 Server Error: Service Unavailable", 2)
+    assert not policy.should_retry("HTTPError: 503 Server Error: Service Unavailable", 3)
+    assert not policy.should_retry("KeyError: 'ctry'", 1)
+
+
+def test_cell_timeouts_are_not_retried():
+    error = CellTimeoutError.error_from_timeout_and_cell("Cell execution timed out", 1800, None)
+    assert not RetryPolicy(retries=2).should_retry(f"Unexpected error: {error}", 1)
+    assert not RetryPolicy(retries=2).should_retry("Cancelled after the 3600s notebook deadline", 1)
+
+
+def test_delay_grows_up_to_the_maximum():
+    policy = RetryPolicy(backoff=30, factor=2, max_backoff=100)
+    assert [policy.delay(attempt) for attempt in (1, 2, 3)] == [30, 60, 100]
+
+
+def test_error_summary_is_the_last_line_without_colors():
+    assert error_summary("Traceback\n\x1b[0;31mKeyError\x1b[0m: 'x'\n") == "KeyError: 'x'"
@@ -0,0 +1,101 @@
+import json
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tulip_mania_next.tables import render_table
+
+
+def _rows(html):
+    return [re.findall(r"<td[^>]*>(.*?)</td>", row) for row in re.findall(r"<tr>(.*?)</tr>", html) if "<td" in row]
+
+
+def _headers(html):
+    return re.findall(r"<th(?: [^>]*)?>(.*?)</th>", html)
+
+
+def test_short_headers_keep_every_column():
+    html, _ = render_table([[1, 2, 3], [4, 5, 6]], headers=["a", "b"])
+    assert _headers(html) == ["a", "b"]
+    assert _rows(html) == [["1", "2", "3"], ["4", "5", "6"]]
+
+
+def test_short_headers_keep_every_frame_column():
+    frame = pd.DataFrame({"a": [1.5], "b": [2.5], "c": [3.5]})
+    html, _ = render_table(frame, headers=["first"], formats={"*": ".2f"})
+    assert _rows(html) == [["1.50", "2.50", "3.50"]]
+
+
+def test_ragged_rows_are_padded():
+    html, _ = render_table([[1, 2, 3], [4]])
+    assert _rows(html) == [["1", "2", "3"], ["4", "", ""]]
+
+
+def test_formats_spec_string_callable_and_default():
+    frame = pd.DataFrame({
+        "amount": [1234.5, np.nan, -0.25],
+        "share": [0.125, 0.5, None],
+        "count": [1000, 20, 3],
+        "name": ["x", None, "z"],
+    })
+    html, _ = render_table(
+        frame,
+        formats={"amount": ",.2f", "share": "{:.1%}", "name": str.upper, "*": ",d"},
+        na_rep="-",
+    )
+    assert _rows(html) == [
+        ["1,234.50", "12.5%", "1,000", "X"],
+        ["-", "50.0%", "20", "-"],
+        ["-0.25", "-", "3", "Z"],
+    ]
+
+
+def test_formatters_get_python_scalars_and_timestamps():
+    seen = []
+
+    def record(value):
+        seen.append(type(value))
+        return "ok"
+
+    frame = pd.DataFrame({"n": [1, 2], "when": pd.to_datetime(["2025-01-01", None])})
+    render_table(frame, formats={"n": record, "when": record})
+    assert seen == [int, int, pd.Timestamp]
+
+
+def test_datetimes_default_to_dates_when_all_midnight():
+    dates = pd.DataFrame({"d": pd.to_datetime(["2024-01-31", None])})
+    times = pd.DataFrame({"t": pd.to_datetime(["2024-01-31 10:30", "2024-02-01 00:00"])})
+
+    html, _ = render_table(dates, na_rep="-")
+    assert _rows(html) == [["2024-01-31"], ["-"]]
+    html, _ = render_table(times)
+    assert _rows(html) == [["2024-01-31 10:30:00"], ["2024-02-01 00:00:00"]]
+
+
+def test_numeric_columns_are_right_aligned():
+    html, _ = render_table(pd.DataFrame({"label": ["a"], "value": [1.0]}))
+    assert '<th class="num">value</th>' in html and '<td class="num">1.0</td>' in html
+
+
+def test_long_tables_are_paged_as_json():
+    frame = pd.DataFrame({"i": range(600), "s": ["</script>"] * 600})
+    html, assets = render_table(frame, max_rows=500, page_size=25)
+    assert assets == ["table.css", "table.js"]
+    # Only the payload and the loader close a script element
+    assert html.count("</script>") == 2
+
+    payload = json.loads(re.search(r'application/json">(.*?)</script>', html).group(1).replace("<\\/", "</"))
+    assert payload["headers"] == ["i", "s"]
+    assert payload["numeric"] == [True, False]
+    assert payload["page_size"] == 25
+    assert len(payload["rows"]) == 600 and payload["rows"][-1] == ["599", "</script>"]
+
+
+@pytest.mark.parametrize("fmt", [".3f", ",.0f", "{:+.2e}", "{:.1%}"])
+def test_vectorized_formatting_matches_format(fmt):
+    values = np.random.default_rng(0).standard_normal(1_000) * 1e4
+    html, _ = render_table(pd.DataFrame({"v": values}), formats={"v": fmt}, max_rows=10_000)
+    expected = [fmt.format(v) if "{" in fmt else format(v, fmt) for v in values.tolist()]
+    assert [row[0] for row in _rows(html)] == expected
@@ -0,0 +1,274 @@
+"""
+Single-process asyncio engine for notebook execution.
+
+Instead of one worker process per notebook, a single event loop drives up to
+``concurrency`` kernels through nbclient's async API. Only the kernels are
+separate processes; there is no pickling of notebooks or results and no
+per-worker ZMQ context. Each notebook can be cancelled on its own deadline,
+results are handed over as soon as a notebook finishes, and interrupting the
+build cancels every running notebook and shuts its kernel down.
+
+``run_notebooks`` runs the event loop in a helper thread: nbclient points
+SIGINT at the kernel of whichever notebook started last when its loop runs in
+the main thread, so Ctrl-C would only stop that one. Off the main thread it
+installs no handlers, and the main thread turns Ctrl-C into cancelling all.
+The result callbacks (journal fsyncs, manifest writes, telemetry) run one at
+a time on another helper thread, and the kernel watchdogs are joined off the
+loop, so neither stalls the messages of the other running notebooks.
+
+Warm kernel pools, profiling, memoization and memory caps are features of
+the process engine and are not available here; each kernel's peak memory is
+still recorded.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from tulip_mania_next.memory import KernelWatchdog, kernel_pid
+from tulip_mania_next.notebook_io import write_notebook
+from tulip_mania_next.output_store import OutputStore
+
+logger = logging.getLogger(__name__)
+
+Result = Tuple[Path, bool, str, dict]
+
+
+def _read(notebook_path: Path):
+    import nbformat
+
+    with open(notebook_path, "r", encoding="utf-8") as f:
+        original = f.read()
+    return nbformat.reads(original, as_version=4), original
+
+
+def _write(nb, notebook_path: Path, original: str, output_store: Optional[OutputStore], stats: dict) -> None:
+    if output_store is not None:
+        stats["output_store"] = output_store.dehydrate(nb)
+    stats["written"] = write_notebook(nb, notebook_path, original)
+    stats["bytes_written"] = os.path.getsize(notebook_path) if stats["written"] else 0
+
+
+async def _run(
+    notebook_path: Path,
+    timeout: int,
+    deadline: Optional[float],
+    extra_arguments: Optional[List[str]],
+    output_store: Optional[OutputStore],
+    stats: dict,
+) -> Tuple[bool, str]:
+    from nbclient import NotebookClient
+    from nbclient.exceptions import CellExecutionError
+
+    try:
+        nb, original = await asyncio.to_thread(_read, notebook_path)
+        client = NotebookClient(
+            nb,
+            timeout=timeout,
+            kernel_name="python3",
+            extra_arguments=list(extra_arguments or []),
+            allow_errors=False,
+        )
+        start = time.perf_counter()
+        watchers = contextlib.ExitStack()
+        watchdogs = []
+
+        def kernel_ready(notebook):
+            stats["kernel_start"] = time.perf_counter() - start
+            pid = kernel_pid(client.km)
+            if pid is not None:
+                watchdogs.append(watchers.enter_context(KernelWatchdog(pid)))
+
+        client.on_notebook_start = kernel_ready
+        try:
+            # Cancelling async_execute shuts the kernel down on the way out
+            try:
+                await asyncio.wait_for(client.async_execute(), deadline)
+            finally:
+                # Stopping a watchdog joins its thread
+                await asyncio.to_thread(watchers.close)
+        except CellExecutionError as e:
+            return False, f"Cell execution error: {str(e)}"
+        except Exception:
+            # The cancellation surfaces as TimeoutError or as the dead kernel it leaves behind
+            if deadline is not None and time.perf_counter() - start >= deadline:
+                return False, f"Cancelled after the {deadline:.0f}s notebook deadline"
+            raise
+        finally:
+            if watchdogs:
+                stats["peak_rss_mb"] = watchdogs[0].peak_mb
+
+        # Serializing a large notebook would stall every other kernel's messages
+        await asyncio.to_thread(_write, nb, notebook_path, original, output_store, stats)
+        return True, ""
+    except Exception as e:
+        return False, f"Unexpected error: {str(e)}"
+
+
+async def _execute_one(
+    notebook_path: Path,
+    semaphore: asyncio.Semaphore,
+    running: Dict[Path, float],
+    timeout: int,
+    deadline: Optional[float],
+    extra_arguments: Optional[List[str]],
+    output_store: Optional[OutputStore],
+    on_attempt: Optional[Callable[[Path, bool, str, dict], Optional[float]]],
+    callbacks: ThreadPoolExecutor,
+) -> Result:
+    while True:
+        async with semaphore:
+            stats = {"started_at": time.time()}
+            start = time.perf_counter()
+            running[notebook_path] = start
+            try:
+                success, error_msg = await _run(
+                    notebook_path, timeout, deadline, extra_arguments, output_store, stats
+                )
+            finally:
+                del running[notebook_path]
+            stats["elapsed"] = time.perf_counter() - start
+
+        delay = None
+        if on_attempt is not None:
+            delay = await asyncio.get_running_loop().run_in_executor(
+                callbacks, on_attempt, notebook_path, success, error_msg, stats
+            )
+        if delay is None:
+            return notebook_path, success, error_msg, stats
+        # Back off without holding a kernel slot
+        await asyncio.sleep(delay)
+
+
+async def _report_progress(
+    total: int,
+    results: List[Result],
+    running: Dict[Path, float],
+    interval: float,
+    log: logging.Logger,
+) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        now = time.perf_counter()
+        active = ", ".join(
+            f"{path.name} ({now - start:.0f}s)"
+            for path, start in sorted(running.items(), key=lambda item: item[1])
+        )
+        log.info(f"Progress: {len(results)}/{total} done, running: {active or 'none'}")
+
+
+async def execute_notebooks(
+    notebooks: List[Path],
+    concurrency: int,
+    timeout: int = 600,
+    deadline: Optional[float] = None,
+    extra_arguments: Optional[List[str]] = None,
+    output_store: Optional[OutputStore] = None,
+    on_result: Optional[Callable[[Path, bool, str, dict], None]] = None,
+    on_attempt: Optional[Callable[[Path, bool, str, dict], Optional[float]]] = None,
+    progress_interval: Optional[float] = 30.0,
+    log: Optional[logging.Logger] = None,
+) -> List[Result]:
+    """
+    Execute notebooks in place, at most ``concurrency`` at a time.
+
+    Notebooks start in the given order.
+
+    Args:
+        notebooks: Notebook paths
+        concurrency: Maximum number of kernels running at once
+        timeout: Timeout per cell in seconds
+        deadline: Cancel a notebook still running after this many seconds (None: no limit)
+        extra_arguments: Extra command line arguments for every kernel
+        output_store: When given, large outputs are moved to this store before writing
+        on_result: Called with each result as soon as its notebook finishes
+        on_attempt: Called with the result of every attempt first; returning a
+            number of seconds executes the notebook again after that delay.
+            Both callbacks run one at a time on a helper thread, off the loop
+        progress_interval: Seconds between progress reports (None: no reports)
+        log: Logger for progress reports (default: this module's)
+
+    Returns:
+        List of (notebook_path, success, error_message, stats) in completion
+        order, as returned by ``main.execute_notebook``
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    running: Dict[Path, float] = {}
+    results: List[Result] = []
+    # A single thread keeps the callbacks serialized, as they share the build's state
+    callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notebook-results")
+    loop = asyncio.get_running_loop()
+
+    tasks = [
+        asyncio.create_task(
+            _execute_one(
+                nb, semaphore, running, timeout, deadline, extra_arguments, output_store, on_attempt, callbacks
+            )
+        )
+        for nb in notebooks
+    ]
+    reporter = None
+    if progress_interval:
+        reporter = asyncio.create_task(
+            _report_progress(len(tasks), results, running, progress_interval, log or logger)
+        )
+
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            results.append(result)
+            if on_result is not None:
+                await loop.run_in_executor(callbacks, on_result, *result)
+    finally:
+        if reporter is not None:
+            reporter.cancel()
+        # Only does anything when interrupted: stop the rest and wait for their kernels to shut down
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.to_thread(callbacks.shutdown)
+
+    return results
+
+
+def run_notebooks(notebooks: List[Path], concurrency: int, **options) -> List[Result]:
+    """
+    Blocking wrapper of ``execute_notebooks``; Ctrl-C cancels every notebook.
+
+    ``on_result`` and ``on_attempt`` are called from a helper thread, one at a time.
+
+    Raises:
+        KeyboardInterrupt: Once every kernel is shut down after an interrupt
+    """
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(execute_notebooks(notebooks, concurrency, **options))
+    outcome: dict = {}
+
+    def run() -> None:
+        try:
+            outcome["results"] = loop.run_until_complete(task)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            loop.close()
+
+    thread = threading.Thread(target=run, name="notebook-engine")
+    thread.start()
+    try:
+        # A timed join lets the main thread receive KeyboardInterrupt
+        while thread.is_alive():
+            thread.join(0.5)
+    except KeyboardInterrupt:
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join()
+        raise
+
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["results"]
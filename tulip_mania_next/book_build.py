@@ -0,0 +1,148 @@
+"""
+Running the book build, optionally pipelined with notebook execution.
+
+``run_book_build`` streams the output of ``jupyter book build`` line by line
+into the log instead of buffering it until the build ends.
+
+``PipelinedBuilder`` starts building as soon as notebook execution starts.
+The first build renders the markdown pages, the theme and the static assets
+and caches every page; from then on a new incremental build is started
+whenever notebooks have finished since the previous one began, so only the
+changed notebooks are rendered again. After the last notebook, one final
+incremental build picks up whatever the running build missed. An intermediate
+build that fails (e.g. on a notebook being written at that moment) is only
+logged; the final build decides the outcome.
+"""
+
+import logging
+import re
+import subprocess
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+BUILD_COMMAND = ("jupyter", "book", "build", "--html")
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+
+def run_book_build(rebuild: bool = False, log: Optional[logging.Logger] = None, label: str = "") -> bool:
+    """
+    Run ``jupyter book build --html``, logging its output as it arrives.
+
+    Args:
+        rebuild: Rebuild every page (``--all``) instead of only changed ones
+        log: Logger for the build output (default: this module's)
+        label: Prefix of every logged line, e.g. to tell pipelined builds apart
+
+    Returns:
+        True if the build succeeded
+    """
+    log = log or logger
+    cmd: List[str] = list(BUILD_COMMAND)
+    if rebuild:
+        cmd.append("--all")
+
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            bufsize=1,
+        )
+    except OSError as e:
+        log.error(f"Error building book: {e}")
+        return False
+
+    for line in process.stdout:
+        line = _ANSI.sub("", line).rstrip()
+        if line:
+            log.info(f"{label}{line}")
+    returncode = process.wait()
+    if returncode:
+        log.error(f"{label}Error building book: {' '.join(cmd)} exited with status {returncode}")
+    return returncode == 0
+
+
+class PipelinedBuilder:
+    """
+    Builds the book in a background thread while notebooks execute.
+
+    Call ``start`` before executing, ``notebook_finished`` after each notebook
+    is written and ``finish`` once all are done.
+
+    Args:
+        rebuild: Make the first build render every page
+        log: Logger for build output and progress
+    """
+
+    def __init__(self, rebuild: bool = False, log: Optional[logging.Logger] = None):
+        self.rebuild = rebuild
+        self.log = log or logger
+        self.builds = 0
+        self._last_success = False
+        self._pending: List[Path] = []
+        self._done = False
+        self._changed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="book-builder", daemon=True)
+
+    def start(self) -> None:
+        """Start the first build right away."""
+        self._thread.start()
+
+    def notebook_finished(self, notebook_path: Path, success: bool = True) -> None:
+        """Queue an executed notebook for the next incremental build (failed ones are not written)."""
+        if not success:
+            return
+        with self._changed:
+            self._pending.append(notebook_path)
+            self._changed.notify()
+
+    def _run(self) -> None:
+        rebuild = self.rebuild
+        while True:
+            with self._changed:
+                while not self._pending and not self._done and self.builds > 0:
+                    self._changed.wait()
+                if self._done:
+                    return
+                batch, self._pending = self._pending, []
+
+            self.builds += 1
+            what = f"{len(batch)} new notebooks" if batch else "pages, theme and assets"
+            self.log.info(f"Pipelined build {self.builds} started ({what})")
+            success = run_book_build(rebuild=rebuild, log=self.log, label=f"[build {self.builds}] ")
+            if not success:
+                self.log.warning(f"Pipelined build {self.builds} failed; the final build will retry")
+            self._last_success = success
+            rebuild = False
+
+    def finish(self) -> bool:
+        """
+        Wait for the running build, then build once more with every notebook.
+
+        The final build is skipped when the last pipelined build succeeded and
+        no notebook finished after it started.
+
+        Returns:
+            True if the final build succeeded
+        """
+        with self._changed:
+            self._done = True
+            self._changed.notify()
+        self._thread.join()
+
+        if self.builds and self._last_success and not self._pending:
+            self.log.info(f"Pipelined build {self.builds} already includes every notebook")
+            return True
+
+        # A build that never started cannot have rendered every page yet
+        rebuild = self.rebuild and self.builds == 0
+        self.log.info(f"Final build started (after {self.builds} pipelined builds)")
+        self.builds += 1
+        return run_book_build(rebuild=rebuild, log=self.log, label="[final] ")
@@ -0,0 +1,257 @@
+"""
+Cell-level memoized re-execution of notebooks.
+
+Every code cell is identified by a hash chain over the sources of the code
+cells up to and including it (seeded with the kernel, lockfile and data date),
+so a cell's hash changes when it or any code cell above it changes; markdown
+edits change nothing. After each run the outputs of every code cell are kept
+under its chain hash, and the user namespace is checkpointed after cells that
+took at least ``checkpoint_seconds`` (typically the data pulls). Unless the
+data date is pinned in the seed, a checkpoint expires after ``max_age``
+seconds, since the data it holds goes stale even when no code changed.
+
+On the next run, the notebook resumes from the latest checkpoint within the
+unchanged prefix: the cells up to it get their cached outputs back, the
+namespace is restored in the kernel and only the following cells run. Cells
+tagged ``replay`` and cells using IPython magics (``%``) in the skipped prefix
+are run again first, since their effect (options, backends, extensions) is not
+part of the namespace. Without a usable checkpoint, e.g. because the namespace
+held unpicklable objects, the notebook runs in full.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from tulip_mania_next.exec_cache import CACHE_DIR, atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT = "__import__('tulip_mania_next.namespace_snapshot', fromlist=['_'])"
+
+REPLAY_TAG = "replay"
+
+
+def _source(cell) -> str:
+    source = cell.get("source", "")
+    return "".join(source) if isinstance(source, list) else source
+
+
+def cell_chain(nb, seed: str = "") -> List[str]:
+    """
+    Chain hash of every code cell of a notebook, in order.
+
+    Args:
+        nb: The notebook
+        seed: Anything else results depend on (kernel, lockfile hash, data date)
+    """
+    chain = []
+    previous = hashlib.sha256(seed.encode("utf-8")).hexdigest()
+    for cell in nb.cells:
+        if cell.cell_type != "code":
+            continue
+        previous = hashlib.sha256(f"{previous}\0{_source(cell)}".encode("utf-8")).hexdigest()
+        chain.append(previous)
+    return chain
+
+
+def _needs_replay(cell) -> bool:
+    if REPLAY_TAG in cell.get("metadata", {}).get("tags", []):
+        return True
+    return any(line.lstrip().startswith("%") for line in _source(cell).splitlines())
+
+
+class CellCache:
+    """
+    Cached cell outputs and namespace checkpoints of one notebook.
+
+    Args:
+        notebook_key: Stable name of the notebook (path relative to the project root)
+        cache_dir: Root of the build cache
+    """
+
+    def __init__(self, notebook_key: str, cache_dir: Union[str, Path] = CACHE_DIR):
+        digest = hashlib.sha256(notebook_key.encode("utf-8")).hexdigest()[:16]
+        self.dir = (Path(cache_dir) / "cells" / digest).resolve()
+        self.manifest_path = self.dir / "manifest.json"
+        self.outputs_path = self.dir / "outputs.json.gz"
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {"chain": [], "checkpoints": {}}
+        self._outputs: Optional[Dict[str, dict]] = None
+
+    @property
+    def outputs(self) -> Dict[str, dict]:
+        """Cached ``{"outputs", "execution_count"}`` of every cell, by chain hash."""
+        if self._outputs is None:
+            try:
+                with open(self.outputs_path, "rb") as f:
+                    self._outputs = json.loads(gzip.decompress(f.read()))
+            except (OSError, ValueError):
+                self._outputs = {}
+        return self._outputs
+
+    def checkpoint_path(self, chain_hash: str) -> Path:
+        return self.dir / f"{chain_hash}.pkl"
+
+    def resume_point(self, chain: List[str], max_age: Optional[float] = None) -> int:
+        """
+        Index of the code cell to resume after, or -1 for a full run.
+
+        That is the last cell of the unchanged prefix with a namespace
+        checkpoint, no older than ``max_age`` seconds when given, whose file
+        and cached outputs (for it and every cell above) still exist.
+        """
+        previous = self.manifest.get("chain", [])
+        prefix = 0
+        while prefix < min(len(chain), len(previous)) and chain[prefix] == previous[prefix]:
+            prefix += 1
+
+        checkpoints = self.manifest.get("checkpoints", {})
+        for index in range(prefix - 1, -1, -1):
+            if chain[index] not in checkpoints:
+                continue
+            if max_age is not None and time.time() - checkpoints[chain[index]].get("saved_at", 0) > max_age:
+                continue
+            if not self.checkpoint_path(chain[index]).exists():
+                continue
+            if all(h in self.outputs for h in chain[: index + 1]):
+                return index
+        return -1
+
+    def save(self, chain: List[str], outputs: Dict[str, dict], checkpoints: Dict[str, dict]) -> None:
+        """Replace the cache with the given run, pruning stale checkpoint files."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for path in self.dir.glob("*.pkl"):
+            if path.stem not in checkpoints:
+                path.unlink(missing_ok=True)
+
+        tmp_path = self.outputs_path.with_name(f".{self.outputs_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(gzip.compress(json.dumps(outputs).encode("utf-8"), compresslevel=1, mtime=0))
+        os.replace(tmp_path, self.outputs_path)
+
+        self.manifest = {"chain": chain, "checkpoints": checkpoints}
+        atomic_write_json(self.manifest_path, self.manifest)
+        self._outputs = outputs
+
+
+def execute_memoized(
+    client,
+    kernel,
+    cell_cache: CellCache,
+    seed: str = "",
+    checkpoint_seconds: float = 5.0,
+    max_age: Optional[float] = None,
+) -> dict:
+    """
+    Execute ``client.nb`` on ``kernel``, resuming after the unchanged prefix.
+
+    Args:
+        client: ``NotebookClient`` whose ``kc`` controls ``kernel``
+        kernel: ``PooledKernel`` (or any object with ``execute_silent``)
+        cell_cache: Cache of this notebook
+        seed: See ``cell_chain``
+        checkpoint_seconds: Checkpoint the namespace after cells at least this slow
+        max_age: Seconds after which a checkpoint is no longer resumed from
+            (None: never, for a seed with a pinned data date)
+
+    Returns:
+        Stats: cells reused and executed, checkpoints written, and the
+        variables that prevented a checkpoint, if any
+
+    Raises:
+        CellExecutionError: As ``NotebookClient.execute``; the cells that ran
+            before the failure are cached
+    """
+    nb = client.nb
+    chain = cell_chain(nb, seed)
+    code_cells = [(index, cell) for index, cell in enumerate(nb.cells) if cell.cell_type == "code"]
+
+    stats = {"cells_reused": 0, "cells_executed": 0, "checkpoints": 0, "unpicklable": []}
+    outputs: Dict[str, dict] = {}
+    checkpoints: Dict[str, dict] = {}
+
+    cell_cache.dir.mkdir(parents=True, exist_ok=True)
+    client.reset_execution_trackers()
+    with client.setup_kernel():
+        info = client.wait_for_reply(client.kc.kernel_info())
+        if info is not None and "language_info" in info["content"]:
+            nb.metadata["language_info"] = info["content"]["language_info"]
+
+        resume = cell_cache.resume_point(chain, max_age)
+        if resume >= 0:
+            try:
+                for _, cell in code_cells[: resume + 1]:
+                    if _needs_replay(cell):
+                        kernel.execute_silent(_source(cell))
+                restored = kernel.execute_silent(
+                    "",
+                    user_expressions={
+                        "ns": f"{SNAPSHOT}.load_namespace({str(cell_cache.checkpoint_path(chain[resume]))!r})"
+                    },
+                )["ns"]
+            except Exception as e:
+                # Fall back to a full run in a clean namespace
+                logger.warning(f"Could not restore checkpoint, running in full: {e}")
+                kernel.execute_silent("get_ipython().run_line_magic('reset', '-f')")
+                resume = -1
+            else:
+                for position, (_, cell) in enumerate(code_cells[: resume + 1]):
+                    cached = cell_cache.outputs[chain[position]]
+                    cell.outputs = [_as_node(output) for output in cached["outputs"]]
+                    cell.execution_count = cached["execution_count"]
+                    outputs[chain[position]] = cached
+                checkpoints[chain[resume]] = cell_cache.manifest["checkpoints"][chain[resume]]
+                client.code_cells_executed = restored["execution_count"] - 1
+                stats["cells_reused"] = resume + 1
+
+        executed_chain = chain[: resume + 1]
+        try:
+            for position in range(resume + 1, len(code_cells)):
+                index, cell = code_cells[position]
+                start = time.perf_counter()
+                client.execute_cell(cell, index, execution_count=client.code_cells_executed + 1)
+                elapsed = time.perf_counter() - start
+                stats["cells_executed"] += 1
+
+                outputs[chain[position]] = {
+                    "outputs": cell.outputs,
+                    "execution_count": cell.execution_count,
+                }
+                executed_chain.append(chain[position])
+
+                if elapsed >= checkpoint_seconds and position < len(code_cells) - 1:
+                    result = kernel.execute_silent(
+                        "",
+                        user_expressions={
+                            "ns": f"{SNAPSHOT}.save_namespace({str(cell_cache.checkpoint_path(chain[position]))!r})"
+                        },
+                    )["ns"]
+                    if "unpicklable" in result:
+                        stats["unpicklable"] = result["unpicklable"]
+                    else:
+                        checkpoints[chain[position]] = {
+                            "seconds": round(elapsed, 1),
+                            "bytes": result["bytes"],
+                            "saved_at": time.time(),
+                        }
+                        stats["checkpoints"] += 1
+            client.set_widgets_metadata()
+        finally:
+            cell_cache.save(executed_chain, outputs, checkpoints)
+
+    return stats
+
+
+def _as_node(output: dict):
+    import nbformat
+
+    return nbformat.from_dict(output)
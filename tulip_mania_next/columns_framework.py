@@ -1,9 +1,204 @@
-from IPython.display import display, HTML
 import uuid
 from typing import Union, List, Optional
 import base64
 from io import BytesIO
 
+from tulip_mania_next import kernel_probe
+from tulip_mania_next.hydration import HYDRATE_JS, html_placeholder, plotly_placeholder
+from tulip_mania_next.tables import TABLE_CSS, TABLE_JS, render_table
+
+# Rendering options shared by every column layout; change them with configure()
+OPTIONS = {
+    # Emit one class-based stylesheet and one Plotly include per page instead
+    # of a full <style> block and a Plotly <script> with every layout
+    "shared_assets": False,
+    # Encode large numeric/datetime trace arrays of Plotly figures as base64
+    # typed arrays instead of decimal JSON text
+    "binary_arrays": True,
+    # Minimum trace array length worth encoding
+    "binary_threshold": 1000,
+    # Store float arrays as float32 even when it loses precision
+    "float32": False,
+    # Measure the JSON size of each figure before encoding (costs an extra serialization)
+    "encoding_report": False,
+    # Reduce long line series to a point budget before rendering (see decimation.py)
+    "decimate": False,
+    # Points kept per series when decimating
+    "point_budget": 1500,
+    # Decimation algorithm: "lttb" or "minmax"
+    "decimation_method": "lttb",
+    # Tables with more rows are sent as JSON and paged in the browser
+    "table_max_rows": 500,
+    # Rows per page of a paged table
+    "table_page_size": 50,
+    # Emit figures as placeholders drawn when they scroll into view
+    "lazy": False,
+    # Write Matplotlib figures to content-addressed files (see image_assets.py)
+    # and reference them by URL instead of inlining base64 data URIs
+    "image_assets": False,
+    # File format of image assets: "webp", "png" or "svg"
+    "image_format": "webp",
+    # Lossy WebP quality of image assets (None: lossless)
+    "image_quality": None,
+}
+
+# Values restored between notebooks sharing a pooled kernel
+DEFAULT_OPTIONS = dict(OPTIONS)
+
+SHARED_CSS = """
+.tmn-columns {
+    display: flex;
+    gap: var(--tmn-gap, 20px);
+    align-items: flex-start;
+    width: 100%;
+    margin: 10px 0;
+}
+.tmn-columns.tmn-align-center { align-items: center; }
+.tmn-columns.tmn-align-bottom { align-items: flex-end; }
+.tmn-columns > .column {
+    padding: 10px;
+    min-width: 0; /* Prevent flex items from overflowing */
+}
+.tmn-columns.tmn-bordered > .column {
+    border: 1px solid #e0e0e0;
+    border-radius: 4px;
+}
+
+/* Ensure images and figures within columns are responsive */
+.tmn-columns img {
+    max-width: 100%;
+    height: auto;
+}
+.tmn-columns .plotly-graph-div {
+    width: 100% !important;
+}
+
+/* Medium-large screens (1024px - 1399px) - Stack if 3+ columns */
+@media (min-width: 1024px) and (max-width: 1399px) {
+    .tmn-columns { gap: calc(var(--tmn-gap, 20px) * 0.75); }
+    .tmn-columns.tmn-stack-3 { flex-direction: column; }
+    .tmn-columns.tmn-stack-3 > .column { flex: 1 1 100% !important; }
+}
+
+/* Small screens (768px - 1023px) - Stack if 2+ columns */
+@media (min-width: 768px) and (max-width: 1023px) {
+    .tmn-columns {
+        flex-direction: column;
+        gap: calc(var(--tmn-gap, 20px) * 0.5);
+    }
+    .tmn-columns > .column { flex: 1 1 100% !important; }
+}
+
+/* Mobile (<768px) - Always stack */
+@media (max-width: 767px) {
+    .tmn-columns {
+        flex-direction: column;
+        gap: 1rem;
+    }
+    .tmn-columns > .column {
+        flex: 1 1 100% !important;
+        padding: 8px;
+    }
+}
+"""
+
+
+def _plotly_cdn_url() -> str:
+    """URL of the plotly.js bundle matching the installed plotly version."""
+    from plotly.offline import get_plotlyjs_version
+
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+
+# Page-level assets: key -> (kind, content factory). Kinds are "style" (CSS
+# text), "script" (JS text) and "script_src" (URL of an external script).
+ASSETS = {
+    "columns.css": ("style", lambda: SHARED_CSS),
+    "plotly.js": ("script_src", _plotly_cdn_url),
+    "table.css": ("style", lambda: TABLE_CSS),
+    "table.js": ("script", lambda: TABLE_JS),
+    "lazy.js": ("script", lambda: HYDRATE_JS),
+}
+
+# Assets already emitted on the current page (notebook)
+_PAGE_ASSETS = set()
+
+
+def configure(**options):
+    """
+    Change rendering options for every subsequent layout.
+
+    Parameters:
+    -----------
+    shared_assets : bool
+        Emit one class-based stylesheet and one Plotly include per page
+    binary_arrays : bool
+        Encode large Plotly trace arrays as base64 typed arrays
+    binary_threshold : int
+        Minimum trace array length worth encoding
+    float32 : bool
+        Store float arrays as float32 even when it loses precision
+    encoding_report : bool
+        Also measure each figure's JSON size before encoding
+    decimate : bool
+        Reduce long Plotly line traces and Matplotlib lines to ``point_budget`` points
+        (marker clouds, stacked traces and non-monotonic x are left alone)
+    point_budget : int
+        Points kept per series when decimating
+    decimation_method : str
+        "lttb" (shape preserving) or "minmax" (keeps every bucket's extremes)
+    table_max_rows : int
+        Tables with more rows are paged in the browser
+    table_page_size : int
+        Rows per page of a paged table
+    lazy : bool
+        Draw Plotly and Matplotlib figures only when they scroll into view
+    image_assets : bool
+        Write Matplotlib figures to content-addressed files referenced by URL
+        (and close them afterwards)
+    image_format : str
+        File format of image assets: "webp", "png" or "svg"
+    image_quality : int or None
+        Lossy WebP quality of image assets (None: lossless)
+    """
+    unknown = set(options) - set(OPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown rendering options: {sorted(unknown)}")
+    OPTIONS.update(options)
+
+
+@kernel_probe.on_reset
+def reset_options():
+    """Restore every rendering option to its default, e.g. when a new notebook starts."""
+    OPTIONS.clear()
+    OPTIONS.update(DEFAULT_OPTIONS)
+
+
+@kernel_probe.on_reset
+def reset_page():
+    """Forget which page assets were emitted, e.g. when a new notebook starts."""
+    _PAGE_ASSETS.clear()
+
+
+def asset_tag(key: str) -> str:
+    """HTML tag embedding a page asset."""
+    kind, content = ASSETS[key]
+    if kind == "style":
+        return f"<style>{content()}</style>"
+    if kind == "script":
+        return f"<script>{content()}</script>"
+    return f'<script charset="utf-8" src="{content()}"></script>'
+
+
+def page_assets(keys) -> str:
+    """HTML for the given assets, skipping those already emitted on this page."""
+    html = ""
+    for key in keys:
+        if key not in _PAGE_ASSETS:
+            _PAGE_ASSETS.add(key)
+            html += asset_tag(key)
+    return html
+
 
 class Column:
     """
@@ -15,6 +210,8 @@ class Column:
         self.column_id = column_id
         self.width_ratio = width_ratio
         self.content = []
+        self.assets = []  # page assets (see ASSETS) required by the content
+        self.figure_stats = []  # size and decimation statistics of each figure added
 
     def write(self, content: str, tag: str = "p", **kwargs):
         """Add text content to the column."""
@@ -66,12 +263,37 @@ class Column:
             raise ValueError("Figure must be either a Plotly or Matplotlib figure")
 
     def plotly(
-        self, figure, config: Optional[dict] = None, include_plotlyjs: str = "cdn"
+        self,
+        figure,
+        config: Optional[dict] = None,
+        include_plotlyjs: Optional[str] = None,
+        lazy: Optional[bool] = None,
     ):
-        """Add a Plotly figure to the column with responsive behaviour."""
+        """
+        Add a Plotly figure to the column with responsive behaviour.
+
+        By default plotly.js is included from the CDN with every figure, or once
+        per page when the ``shared_assets`` option is on. With ``lazy`` (default:
+        the ``lazy`` option) the figure is only drawn when it scrolls into view.
+        """
         if figure is None:
             return
 
+        if lazy is None:
+            lazy = OPTIONS["lazy"]
+        if lazy and include_plotlyjs in (None, "cdn"):
+            include_plotlyjs = False
+            lazy_prefix = self._asset_html("plotly.js") + self._asset_html("lazy.js")
+        elif lazy:
+            lazy_prefix = self._asset_html("lazy.js")
+
+        if include_plotlyjs is None:
+            if OPTIONS["shared_assets"]:
+                include_plotlyjs = False
+                self._require("plotly.js")
+            else:
+                include_plotlyjs = "cdn"
+
         default_config = {
             "responsive": True,
             "displayModeBar": True,
@@ -89,43 +311,165 @@ class Column:
                 height=None,
             )
 
-        html = figure.to_html(
-            include_plotlyjs=include_plotlyjs, full_html=False, config=merged_config
-        )
+        if lazy:
+            html, stats = self._plotly_lazy_html(figure, include_plotlyjs, merged_config)
+            html = lazy_prefix + html
+        else:
+            html, stats = self._plotly_html(figure, include_plotlyjs, merged_config)
+        self.figure_stats.append(stats)
         responsive_html = f'<div style="width: 100%; min-height: 400px; overflow: hidden;">{html}</div>'
         self.content.append(responsive_html)
 
+    def _plotly_html(self, figure, include_plotlyjs, config: dict):
+        """
+        HTML of a Plotly figure, decimated and with large arrays binary-encoded
+        when enabled.
+
+        Returns:
+        --------
+        tuple of (html, stats) where stats reports the dropped points, the
+        encoded arrays and the HTML size (and the JSON size before encoding
+        with ``encoding_report``)
+        """
+        stats = {}
+        fig_dict = self._prepare_figure(figure, stats)
+
+        if fig_dict is not None:
+            import plotly.io as pio
+
+            if OPTIONS["encoding_report"]:
+                stats["json_bytes_after"] = len(pio.to_json(fig_dict, validate=False))
+            html = pio.to_html(
+                fig_dict,
+                include_plotlyjs=include_plotlyjs,
+                full_html=False,
+                config=config,
+                validate=False,
+            )
+        else:
+            html = figure.to_html(
+                include_plotlyjs=include_plotlyjs, full_html=False, config=config
+            )
+
+        stats["html_bytes"] = len(html)
+        return html, stats
+
+    def _plotly_lazy_html(self, figure, include_plotlyjs, config: dict):
+        """Placeholder of a Plotly figure drawn on demand, and its stats."""
+        import plotly.io as pio
+
+        stats = {}
+        fig_dict = self._prepare_figure(figure, stats)
+        figure_json = pio.to_json(fig_dict if fig_dict is not None else figure, validate=False)
+        if OPTIONS["encoding_report"]:
+            stats["json_bytes_after"] = len(figure_json)
+
+        html = plotly_placeholder(figure_json, config)
+        if include_plotlyjs is True:
+            from plotly.offline import get_plotlyjs
+
+            html = f"<script>{get_plotlyjs()}</script>" + html
+        stats["html_bytes"] = len(html)
+        return html, stats
+
+    def _prepare_figure(self, figure, stats: dict):
+        """
+        Decimate and binary-encode a Plotly figure when enabled, adding to ``stats``.
+
+        Returns:
+        --------
+        The transformed figure dict, or None when the figure is used unchanged
+        """
+        fig_dict = None
+        if OPTIONS["decimate"] and hasattr(figure, "to_plotly_json"):
+            from tulip_mania_next.decimation import decimate_figure
+
+            fig_dict = figure.to_plotly_json()
+            decimation_stats = decimate_figure(
+                fig_dict,
+                threshold=OPTIONS["point_budget"],
+                method=OPTIONS["decimation_method"],
+            )
+            stats.update(decimation_stats)
+            if not decimation_stats["points_dropped"]:
+                fig_dict = None
+
+        if OPTIONS["binary_arrays"] and hasattr(figure, "to_plotly_json"):
+            from tulip_mania_next.figure_encoding import encode_figure, plotlyjs_supports_typed_arrays
+
+            if plotlyjs_supports_typed_arrays():
+                if OPTIONS["encoding_report"]:
+                    stats["json_bytes_before"] = len(figure.to_json())
+                encoded, encoding_stats = encode_figure(
+                    fig_dict if fig_dict is not None else figure.to_plotly_json(),
+                    threshold=OPTIONS["binary_threshold"],
+                    allow_float32=OPTIONS["float32"],
+                )
+                stats.update(encoding_stats)
+                if encoding_stats["arrays_encoded"]:
+                    fig_dict = encoded
+
+        return fig_dict
+
     def matplotlib(
         self,
         figure,
-        format: str = "png",
+        format: Optional[str] = None,
         dpi: int = 150,
         bbox_inches: str = "tight",
+        lazy: Optional[bool] = None,
         **kwargs,
     ):
         """
         Add a Matplotlib figure to the column as an embedded image.
 
+        With the ``image_assets`` option the image is written to a
+        content-addressed file and referenced by URL, and the figure is closed.
+
         Parameters:
         -----------
         figure : matplotlib.figure.Figure
             The matplotlib figure to display
-        format : str, default 'png'
-            Image format ('png', 'jpg', 'svg')
+        format : str, optional
+            Image format ('png', 'jpg', 'svg'; 'webp' for image assets).
+            Defaults to 'png', or the ``image_format`` option for image assets
         dpi : int, default 100
             Dots per inch for the image
         bbox_inches : str, default 'tight'
             Bounding box setting for the figure
+        lazy : bool, optional
+            Only draw the image when it scrolls into view (default: the ``lazy`` option)
         **kwargs : Additional arguments passed to savefig
         """
         if figure is None:
             return
 
+        restore = None
+        if OPTIONS["decimate"]:
+            from tulip_mania_next.decimation import decimate_axes_lines
+
+            stats, restore = decimate_axes_lines(
+                figure,
+                threshold=OPTIONS["point_budget"],
+                method=OPTIONS["decimation_method"],
+            )
+            self.figure_stats.append(stats)
+
+        if OPTIONS["image_assets"]:
+            self._matplotlib_asset(figure, format, dpi, bbox_inches, lazy, restore, **kwargs)
+            return
+        format = format or "png"
+
         # Save figure to BytesIO buffer
         buffer = BytesIO()
-        figure.savefig(
-            buffer, format=format, dpi=dpi, bbox_inches=bbox_inches, **kwargs
-        )
+        try:
+            figure.savefig(
+                buffer, format=format, dpi=dpi, bbox_inches=bbox_inches, **kwargs
+            )
+        finally:
+            # The caller's figure keeps its full data
+            if restore is not None:
+                restore()
         buffer.seek(0)
 
         # Encode to base64
@@ -139,28 +483,94 @@ class Column:
             mime_type = "image/jpeg" if format in ["jpg", "jpeg"] else f"image/{format}"
             html = f'<img src="data:{mime_type};base64,{image_data}" style="width: 100%; height: auto; display: block; margin: 0 auto;">'
 
+        if OPTIONS["lazy"] if lazy is None else lazy:
+            html = self._asset_html("lazy.js") + html_placeholder(html)
         self.content.append(html)
         buffer.close()
 
-    def table(self, data: List[List], headers: Optional[List] = None):
-        """Add a simple HTML table to the column."""
-        html = '<table style="width: 100%; border-collapse: collapse;">'
+    def _matplotlib_asset(self, figure, format, dpi, bbox_inches, lazy, restore, **kwargs):
+        """Add a Matplotlib figure as a content-addressed image file, then close it."""
+        import sys
+
+        from tulip_mania_next.image_assets import save_figure
+
+        if format not in ("webp", "png", "svg"):
+            format = OPTIONS["image_format"]
+        try:
+            url, stats = save_figure(
+                figure,
+                image_format=format,
+                dpi=dpi,
+                bbox_inches=bbox_inches,
+                quality=OPTIONS["image_quality"],
+                **kwargs,
+            )
+        finally:
+            if restore is not None:
+                restore()
+            # Keep pyplot's figure registry from growing over long notebooks
+            if "matplotlib.pyplot" in sys.modules:
+                sys.modules["matplotlib.pyplot"].close(figure)
+        self.figure_stats.append(stats)
+
+        # Browsers defer off-screen files natively, so no placeholder is needed for lazy
+        loading = ' loading="lazy"' if (OPTIONS["lazy"] if lazy is None else lazy) else ""
+        self.content.append(
+            f'<img src="{url}"{loading} style="width: 100%; height: auto; display: block; margin: 0 auto;">'
+        )
 
-        if headers:
-            html += "<thead><tr>"
-            for header in headers:
-                html += f'<th style="border: 1px solid #ddd; padding: 8px; background-color: #f2f2f2;">{header}</th>'
-            html += "</tr></thead>"
+    def table(
+        self,
+        data,
+        headers: Optional[List] = None,
+        formats: Optional[dict] = None,
+        index: bool = False,
+        na_rep: str = "",
+    ):
+        """
+        Add a table to the column.
 
-        html += "<tbody>"
-        for row in data:
-            html += "<tr>"
-            for cell in row:
-                html += f'<td style="border: 1px solid #ddd; padding: 8px;">{cell}</td>'
-            html += "</tr>"
-        html += "</tbody></table>"
+        Parameters:
+        -----------
+        data : pandas.DataFrame or list of rows
+            The table content
+        headers : list, optional
+            Column headers (defaults to the DataFrame's columns)
+        formats : dict, optional
+            Format spec (",.2f"), format string ("{:.1%}") or callable per
+            column header; the key "*" applies to every other numeric column
+        index : bool, default False
+            Include the DataFrame index
+        na_rep : str, default ""
+            Text of missing values
+
+        Tables longer than the ``table_max_rows`` option are paged in the browser.
+        """
+        html, assets = render_table(
+            data,
+            headers=headers,
+            formats=formats,
+            index=index,
+            na_rep=na_rep,
+            max_rows=OPTIONS["table_max_rows"],
+            page_size=OPTIONS["table_page_size"],
+        )
+        self.content.append("".join(self._asset_html(asset) for asset in assets) + html)
 
-        self.content.append(html)
+    def _require(self, asset: str):
+        """Declare a page asset needed by the column's content."""
+        if asset not in self.assets:
+            self.assets.append(asset)
+
+    def _asset_html(self, asset: str) -> str:
+        """
+        Make a page asset available to the content: declared once per page in
+        ``shared_assets`` mode, otherwise inlined (the returned tag).
+        """
+        if OPTIONS["shared_assets"]:
+            self._require(asset)
+            return ""
+        return asset_tag(asset)
 
     def _get_html(self) -> str:
         """Get the HTML representation of the column."""
@@ -187,6 +597,48 @@ class ColumnsContainer:
 
     def render(self):
         """Render the columns as HTML in Jupyter notebook."""
+        # Imported here so that layouts can be built and exported without IPython
+        from IPython.display import display, HTML
+
+        display(HTML(self.to_html()))
+
+    def save(self, path, title: str = ""):
+        """
+        Write the columns as a standalone HTML page with its assets inlined.
+
+        Parameters:
+        -----------
+        path : str or Path
+            The HTML file to write
+        title : str, optional
+            Title of the page
+        """
+        from tulip_mania_next.export import save_page
+
+        save_page(self, path, title=title)
+
+    def required_assets(self) -> List[str]:
+        """Page assets (see ASSETS) the HTML relies on; none unless ``shared_assets`` is on."""
+        if not OPTIONS["shared_assets"]:
+            return []
+        assets = ["columns.css"]
+        for col in self.columns:
+            assets.extend(asset for asset in col.assets if asset not in assets)
+        return assets
+
+    def to_html(self, assets: bool = True) -> str:
+        """
+        HTML of the columns, as ``render`` displays it.
+
+        Parameters:
+        -----------
+        assets : bool, default True
+            In ``shared_assets`` mode, prefix the page assets not yet emitted on
+            this page; False leaves them to the caller (see ``required_assets``)
+        """
+        if OPTIONS["shared_assets"]:
+            return self._shared_html(assets)
+
         # Calculate flex values based on width ratios
         total_ratio = sum(col.width_ratio for col in self.columns)
         num_columns = len(self.columns)
@@ -275,8 +727,29 @@ class ColumnsContainer:
 
         html += "</div>"
 
-        # Display in Jupyter
-        display(HTML(css + html))
+        return css + html
+
+    def _shared_html(self, assets: bool = True) -> str:
+        """HTML referencing the shared stylesheet, preceded by any page assets not yet emitted."""
+        total_ratio = sum(col.width_ratio for col in self.columns)
+
+        classes = ["tmn-columns"]
+        if self.vertical_alignment in ("center", "bottom"):
+            classes.append(f"tmn-align-{self.vertical_alignment}")
+        if self.border:
+            classes.append("tmn-bordered")
+        if len(self.columns) >= 3:
+            classes.append("tmn-stack-3")
+        style = f' style="--tmn-gap: {self.gap};"' if self.gap != "20px" else ""
+
+        parts = [page_assets(self.required_assets()) if assets else "", f'<div id="{self.container_id}" class="{" ".join(classes)}"{style}>']
+        for col in self.columns:
+            flex_value = col.width_ratio / total_ratio
+            parts.append(f'<div class="column" style="flex: {flex_value} 1 0;">')
+            parts.append(col._get_html())
+            parts.append("</div>")
+        parts.append("</div>")
+        return "".join(parts)
 
     def _get_alignment(self) -> str:
         """Convert alignment parameter to CSS align-items value."""
@@ -369,6 +842,14 @@ def columns(
             """Render the columns."""
             self.container.render()
 
+        def to_html(self, assets: bool = True) -> str:
+            """HTML of the columns (see ColumnsContainer.to_html)."""
+            return self.container.to_html(assets)
+
+        def save(self, path, title: str = ""):
+            """Write the columns as a standalone HTML page (see ColumnsContainer.save)."""
+            self.container.save(path, title=title)
+
         def __enter__(self):
             """Context manager support."""
             return self
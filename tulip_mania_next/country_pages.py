@@ -0,0 +1,56 @@
+"""
+Country summary pages for ``tulip_mania_next.export``.
+
+``summary`` is an export builder: called with the parameters of one run of
+``notebooks/Countries/matrix.toml``, it returns the layout of that country's
+summary page, listing how the country is identified in each data source the
+country notebooks pull from. It only needs the run's parameters, so the whole
+matrix exports without data access::
+
+    python -m tulip_mania_next.export tulip_mania_next.country_pages:summary \\
+        --matrix notebooks/Countries/matrix.toml --title "{ctry_name}"
+"""
+
+import html
+
+from tulip_mania_next.columns_framework import columns
+
+
+def summary(
+    ctry_name: str,
+    ctry_iso2: str,
+    ctry_iso3: str = "",
+    ccy: str = "",
+    goldman_ctry_id: str = "",
+    bloomberg_ctry_prefix: str = "",
+    haver_ctry_suffix: str = "",
+):
+    """
+    Summary page of one country.
+
+    Args:
+        ctry_name: Name of the country
+        ctry_iso2: ISO 3166 alpha-2 code
+        ctry_iso3: ISO 3166 alpha-3 code
+        ccy: ISO 4217 currency code
+        goldman_ctry_id: Country id of the Goldman Sachs data
+        bloomberg_ctry_prefix: Prefix of the country's Bloomberg tickers
+        haver_ctry_suffix: Haver database of the country's series
+
+    Returns:
+        The page's columns
+    """
+    codes = [["ISO alpha-2", ctry_iso2], ["ISO alpha-3", ctry_iso3], ["Currency", ccy]]
+    sources = [
+        ["Goldman Sachs", goldman_ctry_id],
+        ["Bloomberg", bloomberg_ctry_prefix],
+        ["Haver", haver_ctry_suffix],
+    ]
+
+    cols = columns(2)
+    left, right = cols
+    left.header(html.escape(ctry_name))
+    left.table([row for row in codes if row[1]], headers=["Code", "Value"])
+    right.header("Data sources", level=3)
+    right.table([row for row in sources if row[1]], headers=["Source", "Identifier"])
+    return cols
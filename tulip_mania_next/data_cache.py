@@ -0,0 +1,354 @@
+"""
+Build-scoped cache for tulip data-client calls.
+
+Results of the wrapped client methods are stored as content-addressed files,
+keyed by a hash of the call (client method, the identity of the client
+instance, arguments and as-of date):
+DataFrames as Parquet when pyarrow is available, anything else as pickle.
+The file system is the index: entries are written to a temp file and moved into
+place with ``os.replace``, so concurrent kernels never see partial entries and
+need no lock. Each process keeps its own hit/miss counters in ``stats/``.
+
+Build kernels load this module as an IPython extension (``--ext``) and install
+the cache when ``TULIP_DATA_CACHE_DIR`` is set.
+"""
+
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ENV_DIR = "TULIP_DATA_CACHE_DIR"
+ENV_TTL = "TULIP_DATA_CACHE_TTL"
+ENV_AS_OF = "TULIP_DATA_CACHE_AS_OF"
+
+DEFAULT_CACHE_DIR = Path("_build") / ".data_cache"
+
+# "module:Class.method" targets wrapped by default
+DEFAULT_TARGETS = (
+    "tulip.data.bloomberg:BloombergClient.bdh",
+    "tulip.data.bloomberg:BloombergClient.bdp",
+    "tulip.data.bloomberg:BloombergClient.get_series",
+    "tulip.data.bloomberg:BloombergClient.create_collection",
+    "tulip.data.bloomberg:BloombergClient.get_collected_item",
+    "tulip.data.bloomberg:BloombergClient.get_govt_yields",
+    "tulip.data.haver:HaverClient.get_series",
+    "tulip.data.haver:HaverClient.create_collection",
+    "tulip.data.gs:GSClient.get_eco_forecast",
+    "tulip.data.gs:GSClient.get_CAI_series",
+)
+
+
+class Uncacheable(ValueError):
+    """Raised when a call's arguments have no stable representation."""
+
+
+def _canonical(value):
+    """Convert call arguments to a JSON-serializable form with a stable representation."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_canonical(v) for v in value), key=repr)
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    text = repr(value)
+    if " at 0x" in text:
+        raise Uncacheable(f"No stable representation for {type(value).__name__}")
+    return f"{type(value).__qualname__}:{text}"
+
+
+class DataCache:
+    """
+    Content-addressed store for data-client results.
+
+    Args:
+        cache_dir: Directory shared by every worker and kernel of the build
+        ttl: Seconds after which an entry is fetched again (None: never expires)
+        as_of: Freeze the cache at a data date; the date is part of every key
+            and entries never expire
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR,
+        ttl: Optional[float] = None,
+        as_of: Optional[str] = None,
+    ):
+        self.cache_dir = Path(cache_dir).resolve()
+        self.ttl = ttl
+        self.as_of = as_of
+        self.stats = {"hits": 0, "misses": 0, "uncacheable": 0, "bytes_read": 0, "bytes_written": 0}
+
+    def key(self, target: str, args: tuple, kwargs: dict) -> str:
+        """Hash of a call; raises ``Uncacheable`` for unstable arguments."""
+        payload = json.dumps(
+            [target, _canonical(args), _canonical(kwargs), self.as_of],
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_paths(self, key: str) -> List[Path]:
+        folder = self.cache_dir / "objects" / key[:2]
+        return [folder / f"{key}.parquet", folder / f"{key}.pkl"]
+
+    def _is_expired(self, path: Path) -> bool:
+        if self.as_of is not None or self.ttl is None:
+            return False
+        return time.time() - path.stat().st_mtime > self.ttl
+
+    def get(self, key: str):
+        """
+        Load an entry.
+
+        Returns:
+            Tuple of (found, value)
+        """
+        for path in self._entry_paths(key):
+            try:
+                if self._is_expired(path):
+                    continue
+                if path.suffix == ".parquet":
+                    import pandas as pd
+
+                    value = pd.read_parquet(path)
+                else:
+                    with open(path, "rb") as f:
+                        value = pickle.load(f)
+                self.stats["bytes_read"] += path.stat().st_size
+                return True, value
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.debug(f"Ignoring unreadable cache entry {path}: {e}")
+        return False, None
+
+    def put(self, key: str, value) -> None:
+        """Store an entry atomically."""
+        parquet_path, pickle_path = self._entry_paths(key)
+        parquet_path.parent.mkdir(parents=True, exist_ok=True)
+
+        written = None
+        if type(value).__name__ == "DataFrame" and type(value).__module__.startswith("pandas"):
+            tmp_path = parquet_path.with_name(f".{key}.{os.getpid()}.parquet.tmp")
+            try:
+                value.to_parquet(tmp_path)
+                os.replace(tmp_path, parquet_path)
+                written = parquet_path
+            except Exception:
+                # No pyarrow, or columns Parquet cannot represent
+                tmp_path.unlink(missing_ok=True)
+
+        if written is None:
+            tmp_path = pickle_path.with_name(f".{key}.{os.getpid()}.pkl.tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, pickle_path)
+            except Exception:
+                tmp_path.unlink(missing_ok=True)
+                raise
+            written = pickle_path
+
+        self.stats["bytes_written"] += written.stat().st_size
+
+    def call(self, target: str, fetch: Callable, args: tuple, kwargs: dict):
+        """
+        Return the cached result of a call, running ``fetch()`` on a miss.
+
+        Args:
+            target: Name of the wrapped method
+            fetch: Zero-argument callable performing the real call
+            args: Positional arguments identifying the call
+            kwargs: Keyword arguments identifying the call
+        """
+        try:
+            key = self.key(target, args, kwargs)
+        except Uncacheable:
+            self.stats["uncacheable"] += 1
+            return fetch()
+
+        found, value = self.get(key)
+        if found:
+            self.stats["hits"] += 1
+            self.save_stats()
+            return value
+
+        value = fetch()
+        self.stats["misses"] += 1
+        try:
+            self.put(key, value)
+        except Exception as e:
+            logger.debug(f"Could not cache {target}: {e}")
+        self.save_stats()
+        return value
+
+    def save_stats(self) -> None:
+        """Write this process's counters to ``stats/<pid>.json``."""
+        stats_dir = self.cache_dir / "stats"
+        stats_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = stats_dir / f".{os.getpid()}.json.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats, f)
+        os.replace(tmp_path, stats_dir / f"{os.getpid()}.json")
+
+
+_ORIGINALS: Dict[str, tuple] = {}
+_ACTIVE: Optional[DataCache] = None
+
+
+def _resolve(target: str):
+    module_name, _, attr_path = target.partition(":")
+    owner_name, _, method_name = attr_path.rpartition(".")
+    owner = importlib.import_module(module_name)
+    for part in owner_name.split("."):
+        owner = getattr(owner, part)
+    return owner, method_name
+
+
+def _identity(owner) -> object:
+    """
+    Stable identity of the class or instance a method is bound to.
+
+    An instance defining ``__cache_key__()`` is identified by its result;
+    otherwise by its class and those public attributes with a stable
+    representation (endpoints, user names, options), so clients configured
+    differently never share entries.
+    """
+    if isinstance(owner, type):
+        return f"{owner.__module__}.{owner.__qualname__}"
+    cls = type(owner)
+    name = f"{cls.__module__}.{cls.__qualname__}"
+    cache_key = getattr(owner, "__cache_key__", None)
+    if callable(cache_key):
+        return [name, _canonical(cache_key())]
+
+    config = {}
+    for attr, value in sorted(getattr(owner, "__dict__", {}).items()):
+        if attr.startswith("_"):
+            continue
+        try:
+            config[attr] = _canonical(value)
+        except Uncacheable:
+            # Sessions, connections and the like
+            continue
+    return [name, config]
+
+
+def _cached(target: str, func: Callable, bound: bool) -> Callable:
+    """Wrap ``func``; bound calls are keyed on the identity of their class or instance."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _ACTIVE is None:
+            return func(*args, **kwargs)
+        if bound:
+            try:
+                key_args = (_identity(args[0]), *args[1:])
+            except Uncacheable:
+                _ACTIVE.stats["uncacheable"] += 1
+                return func(*args, **kwargs)
+        else:
+            key_args = args
+        return _ACTIVE.call(target, lambda: func(*args, **kwargs), key_args, kwargs)
+
+    return wrapper
+
+
+def install(cache: DataCache, targets: Iterable[str] = DEFAULT_TARGETS) -> List[str]:
+    """
+    Wrap the target methods so their results go through ``cache``.
+
+    Static, class and plain methods are all supported; targets that cannot be
+    imported are skipped.
+
+    Returns:
+        The targets that were wrapped
+    """
+    global _ACTIVE
+    uninstall()
+    _ACTIVE = cache
+    installed = []
+
+    for target in targets:
+        try:
+            owner, name = _resolve(target)
+        except (ImportError, AttributeError) as e:
+            logger.debug(f"Skipping data cache target {target}: {e}")
+            continue
+
+        raw = inspect.getattr_static(owner, name)
+        if isinstance(raw, staticmethod):
+            setattr(owner, name, staticmethod(_cached(target, raw.__func__, bound=False)))
+        elif isinstance(raw, classmethod):
+            setattr(owner, name, classmethod(_cached(target, raw.__func__, bound=True)))
+        else:
+            setattr(owner, name, _cached(target, raw, bound=True))
+
+        _ORIGINALS[target] = (owner, name, raw)
+        installed.append(target)
+
+    return installed
+
+
+def uninstall() -> None:
+    """Restore every wrapped method."""
+    global _ACTIVE
+    while _ORIGINALS:
+        _, (owner, name, raw) = _ORIGINALS.popitem()
+        setattr(owner, name, raw)
+    _ACTIVE = None
+
+
+def install_from_env(targets: Iterable[str] = DEFAULT_TARGETS) -> Optional[DataCache]:
+    """Install the cache configured through ``TULIP_DATA_CACHE_*`` variables, if any."""
+    cache_dir = os.environ.get(ENV_DIR)
+    if not cache_dir:
+        return None
+    ttl = os.environ.get(ENV_TTL)
+    cache = DataCache(
+        cache_dir,
+        ttl=float(ttl) if ttl else None,
+        as_of=os.environ.get(ENV_AS_OF) or None,
+    )
+    install(cache, targets)
+    return cache
+
+
+def load_ipython_extension(ipython) -> None:
+    """IPython extension entry point used by build kernels."""
+    install_from_env()
+
+
+def reset_stats(cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR) -> None:
+    """Remove the per-process counters of a previous run."""
+    stats_dir = Path(cache_dir) / "stats"
+    if stats_dir.exists():
+        for path in stats_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+def collect_stats(cache_dir: Union[str, Path] = DEFAULT_CACHE_DIR) -> dict:
+    """Sum the counters written by every process of the run."""
+    totals = {"hits": 0, "misses": 0, "uncacheable": 0, "bytes_read": 0, "bytes_written": 0}
+    for path in (Path(cache_dir) / "stats").glob("*.json"):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name in totals:
+            totals[name] += stats.get(name, 0)
+    return totals
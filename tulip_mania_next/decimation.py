@@ -0,0 +1,313 @@
+"""
+Visually lossless decimation of long time series.
+
+A chart is at most ~1500 px wide, so drawing tens of thousands of daily points
+only costs serialization and rendering time. These functions choose which
+points to keep: Largest-Triangle-Three-Buckets (LTTB) or the min and max of each
+bucket. Both always keep the first and last points, the global extrema and the
+start of every NaN gap.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+def _as_numeric_x(x: Optional[np.ndarray], n: int) -> np.ndarray:
+    """Numeric x coordinates for area computations (positions when x is not numeric)."""
+    if x is None:
+        return np.arange(n, dtype=np.float64)
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    if x.dtype.kind in "iuf":
+        return x.astype(np.float64)
+    return np.arange(n, dtype=np.float64)
+
+
+def _bucket_edges(start: int, stop: int, buckets: int) -> np.ndarray:
+    return np.linspace(start, stop, buckets + 1).astype(np.int64)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices selected by Largest-Triangle-Three-Buckets.
+
+    Args:
+        x: Numeric x coordinates (finite, increasing)
+        y: Finite y values
+        threshold: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted indices into x/y
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = _bucket_edges(1, n - 1, threshold - 2)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    # Averages of every bucket (and of the last point) serve as the third vertex
+    next_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / np.diff(edges), x[-1])
+    next_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / np.diff(edges), y[-1])
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        cx, cy = next_x[bucket + 1], next_y[bucket + 1]
+        areas = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def minmax_indices(y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the minimum and maximum of each bucket.
+
+    Args:
+        y: Finite y values
+        threshold: Number of points to keep (two per bucket)
+
+    Returns:
+        Sorted indices into y
+    """
+    n = len(y)
+    buckets = max(1, threshold // 2)
+    if threshold >= n:
+        return np.arange(n)
+
+    # Pad to equal-size buckets so argmin/argmax run on a single 2-D view
+    size = -(-n // buckets)
+    padded_low = np.full(buckets * size, np.inf)
+    padded_high = np.full(buckets * size, -np.inf)
+    padded_low[:n] = y
+    padded_high[:n] = y
+    offsets = np.arange(buckets) * size
+    lows = offsets + padded_low.reshape(buckets, size).argmin(axis=1)
+    highs = offsets + padded_high.reshape(buckets, size).argmax(axis=1)
+    indices = np.concatenate([lows, highs])
+    return np.unique(indices[indices < n])
+
+
+def decimate_indices(
+    x: Optional[np.ndarray],
+    y: np.ndarray,
+    threshold: int,
+    method: str = "lttb",
+) -> np.ndarray:
+    """
+    Indices of the points to keep from a series.
+
+    Args:
+        x: X coordinates (numeric, datetime64 or anything else for positional)
+        y: Y values
+        threshold: Point budget
+        method: "lttb" or "minmax"
+
+    Returns:
+        Sorted indices, always including the first and last points, the global
+        extrema and the first point of every NaN gap
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n <= threshold:
+        return np.arange(n)
+
+    finite = np.isfinite(y)
+    positions = np.flatnonzero(finite)
+    if len(positions) == 0:
+        return np.array([0, n - 1])
+
+    fx = _as_numeric_x(x, n)[positions]
+    fy = y[positions]
+    if method == "minmax":
+        keep = positions[minmax_indices(fy, threshold)]
+    elif method == "lttb":
+        keep = positions[lttb_indices(fx, fy, threshold)]
+    else:
+        raise ValueError(f"Unknown decimation method: {method}")
+
+    gap_starts = np.flatnonzero(~finite & np.concatenate([[True], finite[:-1]]))
+    extrema = positions[[int(np.argmin(fy)), int(np.argmax(fy))]]
+    return np.unique(np.concatenate([[0, n - 1], keep, extrema, gap_starts]))
+
+
+def decimate_xy(
+    x: Optional[np.ndarray],
+    y: np.ndarray,
+    threshold: int,
+    method: str = "lttb",
+) -> Tuple[Optional[np.ndarray], np.ndarray, np.ndarray]:
+    """
+    Decimate a series.
+
+    Returns:
+        Tuple of (x, y, kept indices)
+    """
+    indices = decimate_indices(x, y, threshold, method)
+    y = np.asarray(y)[indices]
+    if x is not None:
+        x = np.asarray(x)[indices]
+    return x, y, indices
+
+
+# Trace types whose points can be dropped without changing the chart's meaning
+DECIMATED_TRACE_TYPES = {"scatter", "scattergl"}
+
+# Fills drawn against the previous trace, which must keep the same points
+_FILL_TO_NEXT = {"tonext", "tonextx", "tonexty"}
+
+# Matplotlib's spellings of "no line style" and "no marker"
+_NO_STYLE = ("None", "none", "", " ", None)
+
+
+def is_monotonic(x) -> bool:
+    """Whether x coordinates never change direction (required to bucket a line)."""
+    x = np.asarray(x)
+    if x.dtype.kind == "M":
+        if np.isnat(x).any():
+            return False
+        x = x.astype("datetime64[ns]").astype(np.int64)
+    try:
+        rising = x[1:] >= x[:-1]
+        falling = x[1:] <= x[:-1]
+    except TypeError:
+        return False
+    return bool(np.all(rising) or np.all(falling))
+
+
+def _is_line_trace(trace: dict, next_trace: Optional[dict]) -> bool:
+    """
+    Whether a trace is drawn as a plain line that decimation leaves visually intact.
+
+    Marker and text modes show every point; stacked traces and fills to the
+    next trace are combined point by point with their neighbours.
+    """
+    if trace.get("type", "scatter") not in DECIMATED_TRACE_TYPES:
+        return False
+    # plotly.js draws long traces without an explicit mode as lines
+    if trace.get("mode", "lines") != "lines":
+        return False
+    if trace.get("stackgroup") or trace.get("fill") in _FILL_TO_NEXT:
+        return False
+    return not (next_trace and next_trace.get("fill") in _FILL_TO_NEXT)
+
+
+def _per_point_arrays(container: dict, top_level: bool = True):
+    """Yield (parent dict, key) for every array of a trace other than x and y."""
+    from tulip_mania_next.figure_encoding import is_typed_array
+
+    for key, value in container.items():
+        if top_level and key in ("x", "y"):
+            continue
+        if is_typed_array(value):
+            yield container, key
+        elif isinstance(value, dict):
+            yield from _per_point_arrays(value, top_level=False)
+        elif isinstance(value, (list, tuple, np.ndarray)):
+            yield container, key
+
+
+def decimate_figure(fig_dict: dict, threshold: int = 1500, method: str = "lttb") -> dict:
+    """
+    Decimate every long line trace of a figure dict in place.
+
+    Only scatter traces drawn as plain lines (mode ``lines``) over monotonic
+    x are decimated; marker clouds, text, stacked traces and fills to the
+    next trace keep all their points.
+
+    Args:
+        fig_dict: Figure as returned by ``figure.to_plotly_json()``
+        threshold: Point budget per trace
+        method: "lttb" or "minmax"
+
+    Returns:
+        Stats with the number of points before and after and the points dropped
+    """
+    from tulip_mania_next.figure_encoding import decode_array, is_typed_array
+
+    stats = {"points_before": 0, "points_after": 0, "points_dropped": 0, "traces_decimated": 0}
+
+    traces = fig_dict.get("data", [])
+    for index, trace in enumerate(traces):
+        if "y" not in trace or not _is_line_trace(trace, traces[index + 1] if index + 1 < len(traces) else None):
+            continue
+
+        y = trace["y"]
+        y = decode_array(y) if is_typed_array(y) else y
+        x = trace.get("x")
+        x = decode_array(x) if is_typed_array(x) else x
+        try:
+            y = np.asarray(y, dtype=np.float64)
+        except (TypeError, ValueError):
+            continue
+        n = len(y)
+        stats["points_before"] += n
+        if n <= threshold or (x is not None and (len(x) != n or not is_monotonic(x))):
+            stats["points_after"] += n
+            continue
+
+        indices = decimate_indices(None if x is None else np.asarray(x), y, threshold, method)
+        # Per-point attributes (text, customdata, marker colors...) must stay aligned
+        for parent, key in list(_per_point_arrays(trace)):
+            value = parent[key]
+            if is_typed_array(value):
+                value = decode_array(value)
+                if len(value) == n:
+                    parent[key] = value[indices]
+            elif len(value) == n:
+                parent[key] = [value[i] for i in indices]
+        trace["y"] = y[indices]
+        if x is not None:
+            trace["x"] = np.asarray(x)[indices]
+
+        stats["points_after"] += len(indices)
+        stats["traces_decimated"] += 1
+
+    stats["points_dropped"] = stats["points_before"] - stats["points_after"]
+    return stats
+
+
+def decimate_axes_lines(figure, threshold: int = 1500, method: str = "lttb"):
+    """
+    Decimate every plain line (no markers) of a matplotlib figure with monotonic x in place.
+
+    Returns:
+        Tuple of (stats, restore) where calling ``restore()`` puts the original
+        data back
+    """
+    stats = {"points_before": 0, "points_after": 0, "points_dropped": 0, "traces_decimated": 0}
+    originals = []
+
+    for ax in figure.get_axes():
+        for line in ax.get_lines():
+            x, y = line.get_xdata(orig=True), line.get_ydata(orig=True)
+            try:
+                y_values = np.asarray(y, dtype=np.float64)
+            except (TypeError, ValueError):
+                continue
+            n = len(y_values)
+            stats["points_before"] += n
+            # Markers show every point
+            drawn_as_line = line.get_linestyle() not in _NO_STYLE and line.get_marker() in _NO_STYLE
+            if n <= threshold or len(x) != n or not drawn_as_line or not is_monotonic(x):
+                stats["points_after"] += n
+                continue
+            indices = decimate_indices(np.asarray(x), y_values, threshold, method)
+            originals.append((line, x, y))
+            line.set_data(np.asarray(x)[indices], np.asarray(y)[indices])
+            stats["points_after"] += len(indices)
+            stats["traces_decimated"] += 1
+
+    stats["points_dropped"] = stats["points_before"] - stats["points_after"]
+
+    def restore():
+        for line, x, y in originals:
+            line.set_data(x, y)
+
+    return stats, restore
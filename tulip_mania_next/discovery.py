@@ -0,0 +1,272 @@
+"""
+Notebook discovery driven by the book's table of contents.
+
+Only notebooks the site publishes are executed: the ``file:`` and ``pattern:``
+entries of the ``project.toc`` in ``myst.yml`` (or a file it ``extends``, like
+``toc.yml``) are resolved relative to that file. Patterns are globbed from
+their literal prefix, so only the directories they can match are listed.
+
+The resolved list is cached in ``_build/.exec_cache/toc_manifest.json``
+together with the modification times of the TOC files and of every directory
+a pattern listed; adding or removing a notebook changes its directory's mtime,
+so an unchanged cache is exact and startup does not touch the tree at all.
+
+Without a TOC (or without PyYAML to read it) ``walk_notebooks`` finds every
+notebook, pruning build output, VCS metadata, ``node_modules`` and virtual
+environments while walking instead of filtering paths afterwards.
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from tulip_mania_next.exec_cache import CACHE_DIR, atomic_write_json
+
+CONFIG_FILE = "myst.yml"
+MANIFEST_PATH = CACHE_DIR / "toc_manifest.json"
+
+# Directory names never descended into
+PRUNED_DIRS = {
+    "_build",
+    ".git",
+    ".ipynb_checkpoints",
+    "node_modules",
+    "__pycache__",
+    ".venv",
+    "venv",
+    ".tox",
+    ".nox",
+    "site-packages",
+}
+
+_GLOB_CHARS = re.compile(r"[*?\[]")
+
+
+def _stat_key(path: Path) -> List[int]:
+    stat = path.stat()
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def walk_notebooks(root: Path, pruned: Iterable[str] = PRUNED_DIRS) -> List[Path]:
+    """Every notebook under ``root``, skipping pruned directories and virtual environments."""
+    pruned = set(pruned)
+    notebooks = []
+    for folder, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            name for name in dirnames
+            if name not in pruned and not (Path(folder) / name / "pyvenv.cfg").exists()
+        )
+        notebooks.extend(Path(folder) / name for name in filenames if name.endswith(".ipynb"))
+    return sorted(notebooks)
+
+
+def _load_yaml(path: Path) -> dict:
+    import yaml
+
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def toc_files(root: Path) -> List[Path]:
+    """``myst.yml`` and the files it extends that exist, in order."""
+    config = root / CONFIG_FILE
+    if not config.exists():
+        return []
+    files = [config]
+    extends = _load_yaml(config).get("extends") or []
+    for entry in [extends] if isinstance(extends, str) else extends:
+        if isinstance(entry, str) and (config.parent / entry).exists():
+            files.append((config.parent / entry).resolve())
+    return files
+
+
+def _toc_entries(files: List[Path]) -> List[tuple]:
+    """``(base_dir, entry)`` of every TOC entry, depth first."""
+    found = []
+
+    def visit(entries, base: Path):
+        for entry in entries or []:
+            if not isinstance(entry, dict):
+                continue
+            found.append((base, entry))
+            visit(entry.get("children"), base)
+
+    for path in files:
+        toc = (_load_yaml(path).get("project") or {}).get("toc")
+        visit(toc, path.parent)
+    return found
+
+
+def _glob(base: Path, pattern: str, pruned: Set[str], listed: Dict[str, int]) -> List[Path]:
+    """Files matching ``pattern``, recording the mtime of every directory listed."""
+    parts = Path(pattern).parts
+    literal = 0
+    while literal < len(parts) - 1 and not _GLOB_CHARS.search(parts[literal]):
+        literal += 1
+    start = base.joinpath(*parts[:literal])
+    if not start.is_dir():
+        return []
+    regex = _pattern_regex("/".join(parts[literal:]))
+
+    matches = []
+    for folder, dirnames, filenames in os.walk(start):
+        folder_path = Path(folder)
+        listed[str(folder_path)] = folder_path.stat().st_mtime_ns
+        relative = folder_path.relative_to(start)
+        depth = len(relative.parts)
+        # Without ** a pattern only reaches as deep as it has components
+        if "**" not in parts[literal:] and depth >= len(parts) - literal - 1:
+            dirnames[:] = []
+        else:
+            dirnames[:] = [name for name in dirnames if name not in pruned]
+        for name in filenames:
+            candidate = (relative / name).as_posix()
+            if regex.fullmatch(candidate):
+                matches.append(folder_path / name)
+    return sorted(matches)
+
+
+def _pattern_regex(pattern: str) -> "re.Pattern":
+    """Regex of a glob where ``**`` spans directories and ``*``/``?`` do not."""
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            regex += "(?:.*/)?"
+            i += 3
+        elif pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex)
+
+
+def _resolve(root: Path, files: List[Path], pruned: Set[str]) -> dict:
+    notebooks: List[Path] = []
+    listed: Dict[str, int] = {}
+    for base, entry in _toc_entries(files):
+        if isinstance(entry.get("file"), str):
+            path = (base / entry["file"]).resolve()
+            # A listed notebook created later changes its folder's mtime
+            try:
+                listed[str(path.parent)] = path.parent.stat().st_mtime_ns
+            except OSError:
+                listed[str(path.parent)] = None
+            if path.suffix == ".ipynb" and path.exists():
+                notebooks.append(path)
+        if isinstance(entry.get("pattern"), str):
+            notebooks.extend(
+                path.resolve() for path in _glob(base, entry["pattern"], pruned, listed)
+                if path.suffix == ".ipynb"
+            )
+
+    unique = list(dict.fromkeys(notebooks))
+    return {
+        "root": str(root),
+        "files": {str(path): _stat_key(path) for path in files},
+        "dirs": listed,
+        "notebooks": [str(path) for path in unique],
+    }
+
+
+def _manifest_fresh(manifest: dict, root: Path) -> bool:
+    try:
+        if manifest.get("root") != str(root):
+            return False
+        for path, key in manifest["files"].items():
+            if _stat_key(Path(path)) != key:
+                return False
+        for path, mtime in manifest["dirs"].items():
+            if mtime is None:
+                # A folder that did not exist must still not exist
+                if Path(path).exists():
+                    return False
+            elif Path(path).stat().st_mtime_ns != mtime:
+                return False
+        return all(Path(path).exists() for path in manifest["notebooks"])
+    except (OSError, KeyError, TypeError):
+        return False
+
+
+def toc_notebooks(
+    root: Optional[Path] = None,
+    manifest_path: Union[str, Path] = MANIFEST_PATH,
+    pruned: Iterable[str] = PRUNED_DIRS,
+) -> Optional[List[Path]]:
+    """
+    Notebooks published by the table of contents, in TOC order.
+
+    Returns:
+        The notebooks, or None when there is no TOC or PyYAML is missing
+    """
+    import json
+
+    root = (root or Path.cwd()).resolve()
+    manifest_path = root / manifest_path
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if _manifest_fresh(manifest, root):
+            return [Path(path) for path in manifest["notebooks"]]
+    except (OSError, ValueError):
+        pass
+
+    try:
+        files = toc_files(root)
+    except ImportError:
+        return None
+    if not files or not _toc_entries(files):
+        return None
+
+    manifest = _resolve(root, files, set(pruned))
+    atomic_write_json(manifest_path, manifest)
+    return [Path(path) for path in manifest["notebooks"]]
+
+
+def matches(notebook_path: Path, pattern: str, root: Optional[Path] = None) -> bool:
+    """
+    Whether a notebook matches a selection pattern.
+
+    Plain patterns match as substrings of the path relative to the project
+    root (``Countries``). Glob patterns (``Markets/Bonds/**``) must match a
+    whole trailing part of that path, starting at a directory boundary.
+    """
+    relative = Path(notebook_path).resolve().relative_to((root or Path.cwd()).resolve()).as_posix()
+    if not _GLOB_CHARS.search(pattern):
+        return pattern in relative
+    return re.fullmatch(f"(?:.*/)?{_pattern_regex(pattern.strip('/')).pattern}", relative) is not None
+
+
+def changed_since(ref: str, root: Optional[Path] = None) -> Set[Path]:
+    """
+    Files changed since a git ref: committed, staged and unstaged changes and untracked files.
+
+    Raises:
+        ValueError: If git fails, e.g. on an unknown ref
+    """
+    root = (root or Path.cwd()).resolve()
+
+    def git(*args: str) -> List[str]:
+        try:
+            result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            stderr = getattr(e, "stderr", "") or str(e)
+            raise ValueError(f"git {' '.join(args)} failed: {stderr.strip()}") from None
+        return [line for line in result.stdout.splitlines() if line]
+
+    # Both list paths relative to the repository root
+    top = Path(git("rev-parse", "--show-toplevel")[0])
+    changed = git("diff", "--name-only", "--no-renames", ref, "--")
+    changed += git("ls-files", "--others", "--exclude-standard", "--full-name")
+    return {(top / line).resolve() for line in changed}
@@ -0,0 +1,167 @@
+"""
+Persistent execution manifest for the notebook build.
+
+Each executed notebook is recorded under a fingerprint built from its code-cell
+sources, the kernel it runs on, the project lockfile and an optional data-as-of
+date. On the next run, notebooks whose fingerprint matches a clean previous
+result can be skipped.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+CACHE_DIR = Path("_build") / ".exec_cache"
+LOCKFILES = ("poetry.lock", "pyproject.toml")
+
+
+def _hash_file(path: Path) -> str:
+    """Return the sha256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def environment_hash(project_root: Optional[Path] = None) -> str:
+    """
+    Hash the first lockfile found in the project root.
+
+    Args:
+        project_root: Directory holding the lockfile (default: current directory)
+
+    Returns:
+        sha256 hex digest, or an empty string if no lockfile exists
+    """
+    root = project_root or Path.cwd()
+    for name in LOCKFILES:
+        candidate = root / name
+        if candidate.exists():
+            return _hash_file(candidate)
+    return ""
+
+
+def atomic_write_json(path: Path, data) -> None:
+    """Write JSON to ``path`` through a temp file so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def notebook_fingerprint(
+    notebook_path: Path,
+    kernel_name: str = "python3",
+    env_hash: str = "",
+    data_as_of: Optional[str] = None,
+) -> str:
+    """
+    Compute the execution fingerprint of a notebook.
+
+    Only code-cell sources are hashed, so outputs and markdown edits do not
+    invalidate a previous run.
+
+    Args:
+        notebook_path: Path to the notebook
+        kernel_name: Kernel the notebook is executed with
+        env_hash: Hash of the project lockfile (see ``environment_hash``)
+        data_as_of: Optional data date; changing it forces re-execution
+
+    Returns:
+        sha256 hex digest
+    """
+    with open(notebook_path, "r", encoding="utf-8") as f:
+        nb = json.load(f)
+
+    digest = hashlib.sha256()
+    for part in (kernel_name, env_hash, data_as_of or ""):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+
+    for cell in nb.get("cells", []):
+        if cell.get("cell_type") != "code":
+            continue
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+        digest.update(source.encode("utf-8"))
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+class ExecutionCache:
+    """
+    Manifest of the last execution result of every notebook.
+
+    The manifest is a small JSON file keyed by the notebook path relative to the
+    project root. Only the parent build process writes to it.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path] = CACHE_DIR,
+        kernel_name: str = "python3",
+        data_as_of: Optional[str] = None,
+        project_root: Optional[Path] = None,
+    ):
+        self.project_root = project_root or Path.cwd()
+        self.cache_dir = Path(cache_dir)
+        self.manifest_path = self.cache_dir / "manifest.json"
+        self.kernel_name = kernel_name
+        self.data_as_of = data_as_of
+        self.env_hash = environment_hash(self.project_root)
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        """Load the manifest, treating a missing or corrupt file as empty."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _key(self, notebook_path: Path) -> str:
+        """Manifest key for a notebook (posix path relative to the project root)."""
+        try:
+            return Path(notebook_path).resolve().relative_to(self.project_root.resolve()).as_posix()
+        except ValueError:
+            return Path(notebook_path).resolve().as_posix()
+
+    def fingerprint(self, notebook_path: Path) -> str:
+        """Fingerprint of a notebook under this cache's kernel, lockfile and data date."""
+        return notebook_fingerprint(
+            notebook_path, self.kernel_name, self.env_hash, self.data_as_of
+        )
+
+    def is_fresh(self, notebook_path: Path) -> bool:
+        """Return True if the notebook's last run was clean and nothing relevant changed."""
+        entry = self.entries.get(self._key(notebook_path))
+        if not entry or not entry.get("success"):
+            return False
+        try:
+            return entry.get("fingerprint") == self.fingerprint(notebook_path)
+        except (OSError, ValueError):
+            return False
+
+    def record(self, notebook_path: Path, success: bool) -> None:
+        """Record the outcome of a notebook run and persist the manifest."""
+        try:
+            fingerprint = self.fingerprint(notebook_path)
+        except (OSError, ValueError):
+            fingerprint = ""
+        self.entries[self._key(notebook_path)] = {
+            "fingerprint": fingerprint,
+            "success": success,
+            "executed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        self.save()
+
+    def save(self) -> None:
+        """Persist the manifest atomically."""
+        atomic_write_json(self.manifest_path, self.entries)
@@ -0,0 +1,375 @@
+"""
+Headless export of column layouts to standalone HTML pages.
+
+Column layouts need no kernel: ``ColumnsContainer.to_html`` returns the HTML
+that ``render`` displays, and ``ColumnsContainer.save`` writes it as a page
+with its assets inlined.
+
+``export_pages`` builds many report pages in a process pool. A ``PageSpec``
+names a builder, a module-level function (so that it pickles) returning the
+page's layouts, and the keyword arguments to call it with. Workers build with
+the ``shared_assets`` option on, so layouts only reference the page assets
+they need. The column stylesheet and the table and lazy loading scripts are
+written once into ``assets/`` of the output directory under the hash of their
+content and linked from every page, so browsers fetch them once for the whole
+report and an updated asset gets a new URL; plotly.js comes from the CDN.
+
+A builder's process imports pandas and Plotly once and then builds page after
+page, at a fraction of the cost of starting a kernel and executing a notebook
+per page. Parameter sets can come from a matrix file like the one of the
+country pages, e.g. for the builder in ``country_pages``::
+
+    python -m tulip_mania_next.export tulip_mania_next.country_pages:summary \\
+        --matrix notebooks/Countries/matrix.toml --output _build/reports
+"""
+
+import hashlib
+import html
+import importlib
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from tulip_mania_next import columns_framework
+from tulip_mania_next.columns_framework import ASSETS, Column, ColumnsContainer, asset_tag
+from tulip_mania_next.image_assets import _write_atomic
+
+EXPORT_DIR = Path("_build") / "reports"
+ASSET_SUBDIR = "assets"
+
+PAGE_CSS = """
+body { margin: 0; font-family: system-ui, -apple-system, "Segoe UI", Roboto, sans-serif; }
+.tmn-page { max-width: 1400px; margin: 0 auto; padding: 16px; }
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>{page_css}</style>
+{head}
+</head>
+<body>
+<main class="tmn-page">
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+@dataclass
+class PageSpec:
+    """
+    One page of an export.
+
+    Args:
+        name: Page path relative to the output directory, without ``.html``
+        builder: Module-level function returning the page's layouts
+        kwargs: Keyword arguments of the builder
+        title: Title of the page (default: the name)
+    """
+
+    name: str
+    builder: Callable
+    kwargs: Dict[str, object] = field(default_factory=dict)
+    title: str = ""
+
+
+def layout_html(layout) -> Tuple[str, List[str]]:
+    """
+    HTML of a layout without page assets, and the assets it needs.
+
+    A layout is a ``ColumnsList`` (as returned by ``columns``), a
+    ``ColumnsContainer``, a single ``Column`` or an HTML string.
+    """
+    if isinstance(layout, str):
+        return layout, []
+    if isinstance(layout, Column):
+        layout = ColumnsContainer([layout])
+    container = getattr(layout, "container", layout)
+    if not isinstance(container, ColumnsContainer):
+        raise TypeError(f"Cannot export {type(layout).__name__}: expected a column layout or an HTML string")
+    return container.to_html(assets=False), container.required_assets()
+
+
+def _layouts(result) -> list:
+    """A builder's result as a list of layouts."""
+    if result is None:
+        return []
+    if isinstance(result, (str, Column, ColumnsContainer)) or hasattr(result, "container"):
+        return [result]
+    return list(result)
+
+
+def page_html(
+    layouts,
+    title: str = "",
+    asset_urls: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    A standalone HTML page of one or more layouts.
+
+    Args:
+        layouts: A layout or a list of layouts (see ``layout_html``)
+        title: Title of the page
+        asset_urls: URL per page asset written by ``write_assets``; assets
+            without one are inlined
+
+    Returns:
+        The page's HTML
+    """
+    asset_urls = asset_urls or {}
+    bodies = []
+    assets: List[str] = []
+    for layout in _layouts(layouts):
+        body, required = layout_html(layout)
+        bodies.append(body)
+        assets.extend(asset for asset in required if asset not in assets)
+
+    head = []
+    for key in assets:
+        kind = ASSETS[key][0]
+        url = asset_urls.get(key)
+        if url is None:
+            head.append(asset_tag(key))
+        elif kind == "style":
+            head.append(f'<link rel="stylesheet" href="{url}">')
+        else:
+            head.append(f'<script src="{url}"></script>')
+
+    return PAGE_TEMPLATE.format(
+        title=html.escape(title),
+        page_css=PAGE_CSS,
+        head="\n".join(head),
+        body="\n".join(bodies),
+    )
+
+
+def save_page(layouts, path: Union[str, Path], title: str = "") -> Path:
+    """Write layouts as a self-contained HTML page, with every page asset inlined."""
+    path = Path(path)
+    _write_atomic(path, page_html(layouts, title=title).encode("utf-8"))
+    return path
+
+
+def write_assets(directory: Union[str, Path]) -> Dict[str, str]:
+    """
+    Write the page assets to content-addressed files.
+
+    Files that already exist are not written again. External scripts (the
+    plotly.js CDN bundle) stay external and are not included.
+
+    Returns:
+        File name per asset key, e.g. ``columns.css`` -> ``columns.1a2b3c4d.css``
+    """
+    directory = Path(directory)
+    files = {}
+    for key, (kind, content) in ASSETS.items():
+        if kind == "script_src":
+            continue
+        data = content().encode("utf-8")
+        stem, _, suffix = key.rpartition(".")
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:8]}.{suffix}"
+        if not (directory / filename).exists():
+            _write_atomic(directory / filename, data)
+        files[key] = filename
+    return files
+
+
+def build_page(
+    spec: PageSpec,
+    output_dir: Union[str, Path],
+    asset_files: Dict[str, str],
+    options: Optional[dict] = None,
+) -> dict:
+    """
+    Build and write one page; runs in an export worker.
+
+    Args:
+        spec: The page
+        output_dir: Directory of the export
+        asset_files: File name per asset in ``output_dir/assets`` (see ``write_assets``)
+        options: Rendering options (see ``columns_framework.configure``)
+
+    Returns:
+        Result dict with the page's ``name``, ``path``, ``bytes``, ``elapsed``
+        seconds and, if the builder failed, the ``error`` traceback
+    """
+    start = time.perf_counter()
+    path = Path(output_dir) / f"{spec.name}.html"
+    result = {"name": spec.name, "path": str(path)}
+    try:
+        columns_framework.configure(**{**(options or {}), "shared_assets": True})
+        columns_framework.reset_page()
+        layouts = spec.builder(**spec.kwargs)
+
+        # Relative URLs keep the export relocatable, pages in subdirectories included
+        asset_dir = os.path.relpath(Path(output_dir) / ASSET_SUBDIR, path.parent)
+        asset_urls = {key: Path(asset_dir, filename).as_posix() for key, filename in asset_files.items()}
+        page = page_html(layouts, title=spec.title or spec.name, asset_urls=asset_urls).encode("utf-8")
+        _write_atomic(path, page)
+        result["bytes"] = len(page)
+    except Exception:
+        result["error"] = traceback.format_exc()
+    result["elapsed"] = time.perf_counter() - start
+    return result
+
+
+def export_pages(
+    specs: Iterable[PageSpec],
+    output_dir: Union[str, Path] = EXPORT_DIR,
+    max_workers: Optional[int] = None,
+    options: Optional[dict] = None,
+    on_result: Optional[Callable[[dict], None]] = None,
+) -> List[dict]:
+    """
+    Build pages in parallel into a directory sharing one set of asset files.
+
+    Args:
+        specs: The pages
+        output_dir: Directory the pages and ``assets/`` are written to
+        max_workers: Worker processes (default: CPU count); 1 builds in this process
+        options: Rendering options of the workers (``shared_assets`` is always on)
+        on_result: Called with each page's result as it completes
+
+    Returns:
+        The result of every page (see ``build_page``), in the order of ``specs``
+    """
+    specs = list(specs)
+    output_dir = Path(output_dir)
+    asset_files = write_assets(output_dir / ASSET_SUBDIR)
+
+    results: Dict[int, dict] = {}
+
+    def finished(index: int, result: dict) -> None:
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    if max_workers == 1 or len(specs) <= 1:
+        saved_options = dict(columns_framework.OPTIONS)
+        try:
+            for index, spec in enumerate(specs):
+                finished(index, build_page(spec, output_dir, asset_files, options))
+        finally:
+            columns_framework.OPTIONS.update(saved_options)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(build_page, spec, output_dir, asset_files, options): index
+                for index, spec in enumerate(specs)
+            }
+            for future in as_completed(futures):
+                finished(futures[future], future.result())
+
+    return [results[index] for index in range(len(specs))]
+
+
+def load_builder(reference: str) -> Callable:
+    """
+    The builder function named by ``module:function``.
+
+    Raises:
+        ValueError: If the reference is malformed or names no function
+    """
+    module_name, _, function_name = reference.partition(":")
+    if not module_name or not function_name:
+        raise ValueError(f"Invalid builder {reference!r}: expected module:function")
+    try:
+        builder = getattr(importlib.import_module(module_name), function_name)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load builder {reference!r}: {e}") from None
+    if not callable(builder):
+        raise ValueError(f"Builder {reference!r} is not callable")
+    return builder
+
+
+def _parse_param(spec: str) -> Tuple[str, object]:
+    """``KEY=VALUE`` with the value read as a Python literal, or else kept as a string."""
+    import ast
+
+    key, sep, value = spec.partition("=")
+    if not sep or not key:
+        raise ValueError(f"Invalid parameter {spec!r}: expected KEY=VALUE")
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(
+        prog="python -m tulip_mania_next.export",
+        description="Build standalone HTML report pages from column layouts, without Jupyter",
+    )
+    parser.add_argument("builder", help="Function returning a page's layouts, as module:function")
+    parser.add_argument(
+        "--matrix",
+        metavar="FILE",
+        help="Build one page per run of a parameter matrix, named after the run's key",
+    )
+    parser.add_argument(
+        "--param",
+        action="append",
+        default=[],
+        metavar="KEY=VALUE",
+        help="Keyword argument of the builder (every page with --matrix); repeatable",
+    )
+    parser.add_argument("--name", default="index", help="Page name without --matrix (default: index)")
+    parser.add_argument("--title", default="", help="Page title (with --matrix: a format string over the run's parameters)")
+    parser.add_argument(
+        "--output", default=str(EXPORT_DIR), help=f"Output directory (default: {EXPORT_DIR})"
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--lazy", action="store_true", help="Draw figures only when they scroll into view")
+    args = parser.parse_args(argv)
+
+    try:
+        builder = load_builder(args.builder)
+        params = dict(_parse_param(spec) for spec in args.param)
+        if args.matrix:
+            from tulip_mania_next.parameters import load_matrix
+
+            specs = [
+                PageSpec(
+                    run.key,
+                    builder,
+                    {**run.parameters, **params},
+                    args.title.format(key=run.key, **run.parameters) if args.title else run.key,
+                )
+                for run in load_matrix(args.matrix)
+            ]
+        else:
+            specs = [PageSpec(args.name, builder, params, args.title)]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+
+    def report(result: dict) -> None:
+        if "error" in result:
+            print(f"✗ {result['name']}:\n{result['error']}", file=sys.stderr)
+        else:
+            print(f"✓ {result['path']} ({result['bytes'] / 1024:.0f} KB, {result['elapsed']:.1f}s)")
+
+    results = export_pages(
+        specs, args.output, max_workers=args.workers, options={"lazy": args.lazy}, on_result=report
+    )
+    failed = sum("error" in result for result in results)
+    print(f"{len(results) - failed} page(s) written to {args.output}, {failed} failed, in {time.perf_counter() - start:.1f}s")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
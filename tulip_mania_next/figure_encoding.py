@@ -0,0 +1,183 @@
+"""
+Compact encoding of Plotly figure data.
+
+Large numeric and datetime arrays in a figure's traces are replaced by
+plotly.js typed-array specs (``{"dtype": ..., "bdata": <base64>}``), which are
+smaller than decimal JSON text and much faster to produce and parse. Datetimes
+become float milliseconds since the epoch on an axis explicitly typed ``date``.
+"""
+
+import base64
+import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+
+# plotly.js understands typed-array specs from this version on
+MIN_PLOTLYJS_VERSION = (2, 28)
+
+# Trace keys that are never data arrays
+_SKIP_KEYS = {"type", "name", "uid", "xaxis", "yaxis", "legendgroup", "mode", "hovertemplate"}
+
+_INT_DTYPES = (("i1", np.int8), ("i2", np.int16), ("i4", np.int32))
+_UINT_DTYPES = (("u1", np.uint8), ("u2", np.uint16), ("u4", np.uint32))
+
+
+def plotlyjs_supports_typed_arrays() -> bool:
+    """Whether the bundled plotly.js decodes typed-array specs."""
+    try:
+        from plotly.offline import get_plotlyjs_version
+
+        version = tuple(int(part) for part in get_plotlyjs_version().split(".")[:2])
+    except Exception:
+        return False
+    return version >= MIN_PLOTLYJS_VERSION
+
+
+def _as_array(values) -> Optional[np.ndarray]:
+    """Convert trace values to a numeric or datetime64 array, or None if not possible."""
+    if isinstance(values, np.ndarray):
+        array = values
+    elif isinstance(values, (list, tuple)):
+        if not values:
+            return None
+        first = values[0]
+        if isinstance(first, (datetime.date, np.datetime64)) or (
+            hasattr(first, "isoformat") and not isinstance(first, str)
+        ):
+            try:
+                array = np.asarray(values, dtype="datetime64[ns]")
+            except (TypeError, ValueError):
+                return None
+        elif isinstance(first, (bool, str)) or first is None:
+            return None
+        else:
+            try:
+                array = np.asarray(values, dtype=float)
+            except (TypeError, ValueError):
+                return None
+    else:
+        return None
+
+    if array.dtype.kind == "O":
+        if not array.size:
+            return None
+        first = array.flat[0]
+        # Strings such as hover text would otherwise parse as years
+        if isinstance(first, (bool, str)) or first is None:
+            return None
+        # Numbers in an object column (transposed or mixed frames) stay numbers:
+        # datetime64 would read them as nanoseconds since the epoch
+        dtype = "datetime64[ns]" if isinstance(first, (datetime.date, np.datetime64)) else float
+        try:
+            array = array.astype(dtype)
+        except (TypeError, ValueError):
+            return None
+    if array.dtype.kind not in "iufM" or array.ndim > 2:
+        return None
+    return array
+
+
+def decode_array(spec: dict) -> np.ndarray:
+    """Decode a typed-array spec (as produced here or by plotly itself) to a NumPy array."""
+    values = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=np.dtype(spec["dtype"]).newbyteorder("<"))
+    shape = spec.get("shape")
+    if shape:
+        values = values.reshape([int(part) for part in str(shape).split(",")])
+    return values
+
+
+def is_typed_array(value) -> bool:
+    """Whether a trace value is a typed-array spec."""
+    return isinstance(value, dict) and "bdata" in value and "dtype" in value
+
+
+def _smallest_int(array: np.ndarray) -> Tuple[str, np.ndarray]:
+    low, high = (array.min(), array.max()) if array.size else (0, 0)
+    candidates = _UINT_DTYPES if low >= 0 else _INT_DTYPES
+    for code, dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return code, array.astype(dtype)
+    return "f8", array.astype(np.float64)
+
+
+def encode_array(array: np.ndarray, allow_float32: bool = False) -> dict:
+    """
+    Encode a numeric or datetime64 array as a plotly.js typed-array spec.
+
+    Floats are stored as float32 when that is lossless, or always when
+    ``allow_float32`` is set; datetimes as float64 milliseconds since the epoch.
+    """
+    if array.dtype.kind == "M":
+        values = array.astype("datetime64[ns]").astype(np.int64).astype(np.float64) / 1e6
+        values[np.isnat(array)] = np.nan
+        code = "f8"
+    elif array.dtype.kind in "iu":
+        code, values = _smallest_int(array)
+    else:
+        values = array.astype(np.float64)
+        as_float32 = values.astype(np.float32)
+        if allow_float32 or np.array_equal(as_float32.astype(np.float64), values, equal_nan=True):
+            code, values = "f4", as_float32
+        else:
+            code = "f8"
+
+    values = np.ascontiguousarray(values, dtype=np.dtype(code).newbyteorder("<"))
+    spec = {"dtype": code, "bdata": base64.b64encode(values.tobytes()).decode("ascii")}
+    if values.ndim == 2:
+        spec["shape"] = f"{values.shape[0]}, {values.shape[1]}"
+    return spec
+
+
+def _encode_container(container: dict, threshold: int, allow_float32: bool, stats: dict, path: str = ""):
+    """Encode large arrays in a trace (or nested trace attribute) in place."""
+    date_keys = []
+    for key, value in list(container.items()):
+        if key in _SKIP_KEYS:
+            continue
+        if isinstance(value, dict):
+            _encode_container(value, threshold, allow_float32, stats, f"{path}{key}.")
+            continue
+        if not isinstance(value, (list, tuple, np.ndarray)) or len(value) < threshold:
+            continue
+        array = _as_array(value)
+        if array is None:
+            continue
+        container[key] = encode_array(array, allow_float32)
+        stats["arrays_encoded"] += 1
+        stats["points_encoded"] += int(array.size)
+        stats["binary_bytes"] += len(container[key]["bdata"])
+        if array.dtype.kind == "M":
+            date_keys.append(f"{path}{key}")
+    return date_keys
+
+
+def encode_figure(fig_dict: dict, threshold: int = 1000, allow_float32: bool = False) -> Tuple[dict, dict]:
+    """
+    Replace large trace arrays of a figure dict with typed-array specs, in place.
+
+    Args:
+        fig_dict: Figure as returned by ``figure.to_plotly_json()``
+        threshold: Minimum array length worth encoding
+        allow_float32: Store floats as float32 even when it loses precision
+
+    Returns:
+        Tuple of (fig_dict, stats)
+    """
+    stats = {"arrays_encoded": 0, "points_encoded": 0, "binary_bytes": 0}
+    layout = fig_dict.setdefault("layout", {})
+
+    for trace in fig_dict.get("data", []):
+        date_keys = _encode_container(trace, threshold, allow_float32, stats)
+        # Epoch milliseconds only read as dates on an axis typed "date"
+        for key in date_keys:
+            axis_letter = key[0]
+            if axis_letter not in ("x", "y"):
+                continue
+            axis_ref = trace.get(f"{axis_letter}axis", axis_letter)
+            axis_name = f"{axis_letter}axis{axis_ref[1:]}"
+            axis = layout.setdefault(axis_name, {})
+            axis.setdefault("type", "date")
+
+    return fig_dict, stats
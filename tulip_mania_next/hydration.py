@@ -0,0 +1,78 @@
+"""
+Deferred rendering of heavy column content.
+
+A lazy figure is emitted as a placeholder holding its payload in an inert
+``<script type="application/json">`` element. A small script draws it once it
+scrolls near the viewport (IntersectionObserver), so figures below the fold
+cost neither parsing nor drawing when the page loads.
+"""
+
+import json
+import uuid
+
+# Draws placeholders on demand; idempotent so it can be emitted more than once
+HYDRATE_JS = """
+window.tmnLazy = window.tmnLazy || (function () {
+    function draw(el) {
+        var payload = JSON.parse(el.querySelector("script[type='application/json']").textContent);
+        if (el.dataset.kind === "plotly") {
+            // plotly.js may still be loading
+            if (!window.Plotly) { setTimeout(function () { draw(el); }, 100); return; }
+            var target = document.createElement("div");
+            target.className = "plotly-graph-div";
+            el.appendChild(target);
+            Plotly.newPlot(target, payload.figure.data, payload.figure.layout || {}, payload.config);
+        } else {
+            el.insertAdjacentHTML("beforeend", payload.html);
+        }
+        el.style.minHeight = "";
+    }
+    var observer = "IntersectionObserver" in window ? new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                draw(entry.target);
+            }
+        });
+    }, {rootMargin: "300px 0px"}) : null;
+    return function (id) {
+        var el = document.getElementById(id);
+        if (!el || el.dataset.ready) return;
+        el.dataset.ready = "1";
+        if (observer) observer.observe(el); else draw(el);
+    };
+})();
+"""
+
+
+def placeholder(kind: str, payload_json: str, min_height: str = "400px") -> str:
+    """
+    HTML of a placeholder drawn on demand.
+
+    Args:
+        kind: "plotly" (payload has ``figure`` and ``config``) or "html"
+            (payload has ``html``)
+        payload_json: The payload, already serialized to JSON
+        min_height: Space reserved until the content is drawn
+
+    Returns:
+        The placeholder followed by the script registering it
+    """
+    element_id = f"tmn-lazy-{uuid.uuid4().hex[:8]}"
+    # "</" would end the script element early
+    payload_json = payload_json.replace("</", "<\\/")
+    return (
+        f'<div id="{element_id}" class="tmn-lazy" data-kind="{kind}" style="min-height: {min_height};">'
+        f'<script type="application/json">{payload_json}</script></div>'
+        f'<script>if (window.tmnLazy) tmnLazy("{element_id}");</script>'
+    )
+
+
+def plotly_placeholder(figure_json: str, config: dict) -> str:
+    """Placeholder of a Plotly figure serialized with ``plotly.io.to_json``."""
+    return placeholder("plotly", f'{{"figure":{figure_json},"config":{json.dumps(config)}}}')
+
+
+def html_placeholder(html: str, min_height: str = "200px") -> str:
+    """Placeholder of arbitrary HTML, such as an embedded image."""
+    return placeholder("html", json.dumps({"html": html}), min_height)
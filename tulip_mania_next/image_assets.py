@@ -0,0 +1,287 @@
+"""
+Content-addressed image files for rendered figures.
+
+Instead of inlining a figure as a base64 data URI, it is written once to the
+site's static directory under the hash of its pixels and referenced by URL, so
+notebooks stay small and browsers cache identical images across pages. The
+figure is still rendered on every call: the hash is taken over a fast,
+uncompressed PNG rendering, and only compressing it to WebP or an optimized
+PNG and writing the file are skipped when that hash is already on disk.
+Files no notebook references any more are removed by ``prune_assets``.
+
+``TULIP_ASSET_DIR`` overrides where files are written and ``TULIP_ASSET_URL``
+the URL they are served from; by default ``_static/figures`` in the project
+root, referenced as ``/_static/figures/<file>``.
+
+The site's base URL (``$BASE_URL``, e.g. ``/tulip-mania-next`` on GitHub
+Pages) is deliberately not written into the notebooks, as it depends on where
+the book is built for rather than where the notebook was executed:
+``publish_assets`` copies the files into the built site and prefixes the
+references in its pages with the base URL of that build.
+"""
+
+import hashlib
+import os
+import re
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Tuple
+
+ENV_DIR = "TULIP_ASSET_DIR"
+ENV_URL = "TULIP_ASSET_URL"
+
+ASSET_SUBDIR = Path("_static") / "figures"
+
+# Marks the project root, which holds the site's static directory
+_ROOT_MARKERS = ("myst.yml", "pyproject.toml")
+
+
+def project_root(start: Optional[Path] = None) -> Path:
+    """Nearest directory at or above ``start`` (default: cwd) holding the book config."""
+    start = (start or Path.cwd()).resolve()
+    for folder in (start, *start.parents):
+        if any((folder / marker).exists() for marker in _ROOT_MARKERS):
+            return folder
+    return start
+
+
+def asset_dir() -> Path:
+    """Directory figure files are written to."""
+    configured = os.environ.get(ENV_DIR)
+    return Path(configured) if configured else project_root() / ASSET_SUBDIR
+
+
+def asset_url(filename: str) -> str:
+    """URL a figure file is referenced by in notebook outputs (without the site's base URL)."""
+    base = os.environ.get(ENV_URL, "/" + ASSET_SUBDIR.as_posix())
+    return f"{base.rstrip('/')}/{filename}"
+
+
+# Root-relative references to figure files not already under a base URL
+_ROOT_REFERENCE = re.compile(rb"(?<![\w.~/-])/" + re.escape(ASSET_SUBDIR.as_posix().encode()) + rb"/")
+
+# Files of a built site that embed notebook outputs
+_SITE_SUFFIXES = (".html", ".json")
+
+
+def webp_supported() -> bool:
+    """Whether Pillow was built with WebP support."""
+    try:
+        from PIL import features
+
+        return bool(features.check("webp"))
+    except Exception:
+        return False
+
+
+def _compress(raw_png: bytes, image_format: str, quality: Optional[int]) -> bytes:
+    """Re-encode an uncompressed PNG as WebP (lossless unless ``quality``) or optimized PNG."""
+    from PIL import Image
+
+    out = BytesIO()
+    with Image.open(BytesIO(raw_png)) as image:
+        if image_format == "webp":
+            if quality is None:
+                image.save(out, format="WEBP", lossless=True, method=4)
+            else:
+                image.save(out, format="WEBP", quality=quality, method=4)
+        else:
+            image.save(out, format="PNG", optimize=True)
+    return out.getvalue()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def save_figure(
+    figure,
+    image_format: str = "webp",
+    dpi: int = 150,
+    bbox_inches: str = "tight",
+    quality: Optional[int] = None,
+    **kwargs,
+) -> Tuple[str, dict]:
+    """
+    Write a Matplotlib figure to a content-addressed file.
+
+    The figure is always rendered (to an uncompressed PNG, or to SVG) to
+    compute its hash; an existing file with that hash is reused instead of
+    being compressed and written again.
+
+    Args:
+        figure: The Matplotlib figure
+        image_format: "webp", "png" or "svg" (WebP falls back to PNG when
+            Pillow lacks WebP support)
+        dpi: Resolution of raster formats
+        bbox_inches: Bounding box setting passed to savefig
+        quality: Lossy WebP quality (None: lossless)
+        **kwargs: Additional arguments passed to savefig
+
+    Returns:
+        Tuple of (URL of the file, stats with the file name and size and
+        whether it already existed)
+    """
+    if image_format == "webp" and not webp_supported():
+        image_format = "png"
+
+    buffer = BytesIO()
+    if image_format == "svg":
+        import matplotlib
+
+        # SVG ids and dates are random unless fixed
+        kwargs.setdefault("metadata", {"Date": None})
+        with matplotlib.rc_context({"svg.hashsalt": "tulip-mania-next"}):
+            figure.savefig(buffer, format="svg", dpi=dpi, bbox_inches=bbox_inches, **kwargs)
+        rendered = buffer.getvalue()
+        key_extra = b"svg"
+    else:
+        # Uncompressed PNG: cheap to produce, carries the size, deterministic
+        kwargs.setdefault("metadata", {"Software": None})
+        kwargs.setdefault("pil_kwargs", {"compress_level": 0})
+        figure.savefig(buffer, format="png", dpi=dpi, bbox_inches=bbox_inches, **kwargs)
+        rendered = buffer.getvalue()
+        key_extra = f"{image_format}:{quality}".encode("ascii")
+
+    digest = hashlib.sha256(rendered + key_extra).hexdigest()[:20]
+    filename = f"{digest}.{image_format}"
+    path = asset_dir() / filename
+
+    existed = path.exists()
+    if not existed:
+        data = rendered if image_format == "svg" else _compress(rendered, image_format, quality)
+        _write_atomic(path, data)
+
+    stats = {"asset": filename, "asset_bytes": path.stat().st_size, "asset_reused": existed}
+    return asset_url(filename), stats
+
+
+def rebase_asset_urls(site_dir, base_url: str) -> int:
+    """
+    Prefix the root-relative figure references in a built site with its base URL.
+
+    References already under a base URL are left alone, so running it twice
+    changes nothing.
+
+    Returns:
+        The number of files rewritten
+    """
+    base = base_url.strip().rstrip("/")
+    if not base:
+        return 0
+    replacement = base.encode("utf-8") + b"/" + ASSET_SUBDIR.as_posix().encode() + b"/"
+
+    rewritten = 0
+    for folder, _, filenames in os.walk(site_dir):
+        for name in filenames:
+            if not name.endswith(_SITE_SUFFIXES):
+                continue
+            path = Path(folder) / name
+            data = path.read_bytes()
+            updated = _ROOT_REFERENCE.sub(lambda match: replacement, data)
+            if updated != data:
+                _write_atomic(path, updated)
+                rewritten += 1
+    return rewritten
+
+
+def publish_assets(site_dir, source_dir: Optional[Path] = None, base_url: Optional[str] = None) -> int:
+    """
+    Copy figure files into a built site; files already present are skipped.
+
+    The book build only copies files it finds referenced in Markdown, not in
+    HTML outputs, so this runs after it. References in the site's pages are
+    then prefixed with ``base_url`` (default: ``$BASE_URL``).
+
+    Returns:
+        The number of files copied
+    """
+    import shutil
+
+    if base_url is None:
+        base_url = os.environ.get("BASE_URL", "")
+    rebase_asset_urls(site_dir, base_url)
+
+    source_dir = Path(source_dir) if source_dir else asset_dir()
+    target_dir = Path(site_dir) / ASSET_SUBDIR
+    if not source_dir.is_dir():
+        return 0
+    target_dir.mkdir(parents=True, exist_ok=True)
+
+    copied = 0
+    for path in source_dir.iterdir():
+        if path.name.startswith(".") or (target_dir / path.name).exists():
+            continue
+        shutil.copy2(path, target_dir / path.name)
+        copied += 1
+    return copied
+
+
+# Names ``save_figure`` gives its files
+_ASSET_NAME = re.compile(rb"[0-9a-f]{20}\.(?:webp|png|svg)")
+
+
+def prune_assets(sources, directory: Optional[Path] = None) -> dict:
+    """
+    Delete the figure files none of ``sources`` references.
+
+    Args:
+        sources: Files whose contents reference figures (notebooks, stored
+            outputs); directories are read recursively
+        directory: Directory of the figure files (default: ``asset_dir()``)
+
+    Returns:
+        Stats with the number of files and bytes deleted
+    """
+    directory = Path(directory) if directory else asset_dir()
+    stats = {"deleted": 0, "bytes_deleted": 0}
+    if not directory.is_dir():
+        return stats
+
+    referenced = set()
+    for source in map(Path, sources):
+        files = (p for p in source.rglob("*") if p.is_file()) if source.is_dir() else [source]
+        for path in files:
+            try:
+                referenced.update(_ASSET_NAME.findall(path.read_bytes()))
+            except FileNotFoundError:
+                continue
+
+    for path in directory.iterdir():
+        if not _ASSET_NAME.fullmatch(path.name.encode()) or path.name.encode() in referenced:
+            continue
+        stats["bytes_deleted"] += path.stat().st_size
+        path.unlink()
+        stats["deleted"] += 1
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from tulip_mania_next.discovery import walk_notebooks
+    from tulip_mania_next.output_store import DEFAULT_STORE_DIR
+
+    parser = argparse.ArgumentParser(prog="python -m tulip_mania_next.image_assets")
+    parser.add_argument("site", nargs="?", default=str(Path("_build") / "html"), help="Built site (default: _build/html)")
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help=f"Delete the figure files no notebook or output in {DEFAULT_STORE_DIR} references instead of publishing",
+    )
+    args = parser.parse_args()
+
+    if args.prune:
+        stats = prune_assets([*walk_notebooks(Path.cwd()), DEFAULT_STORE_DIR])
+        print(f"Deleted {stats['deleted']} unreferenced figure assets ({stats['bytes_deleted'] / 2**20:.1f} MB)")
+    else:
+        # Used by the deploy workflow
+        print(f"Published {publish_assets(args.site)} figure assets to {args.site}")
@@ -0,0 +1,295 @@
+"""
+Pool of warm Jupyter kernels for notebook execution.
+
+Each build worker process keeps its own pool. Kernels are started ahead of time,
+import a prelude module once, and are reset between notebooks instead of being
+shut down. A kernel is recycled after a number of uses, when its memory grows
+too large, when a notebook imported modules outside the allowlist, or when it
+changed shell settings the reset cannot restore (display printers).
+"""
+
+import ast
+import atexit
+import logging
+import multiprocessing.util
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROBE = "__import__('tulip_mania_next.kernel_probe', fromlist=['_'])"
+
+# Top-level packages allowed to stay loaded between notebooks, on top of the
+# standard library and whatever the prelude imported.
+DEFAULT_MODULE_ALLOWLIST = (
+    "cython_runtime",
+    "IPython",
+    "ipykernel",
+    "jupyter_client",
+    "comm",
+    "traitlets",
+    "zmq",
+    "tornado",
+    "numpy",
+    "pandas",
+    "pyarrow",
+    "scipy",
+    "dateutil",
+    "pytz",
+    "tzdata",
+    "six",
+    "plotly",
+    "matplotlib",
+    "PIL",
+    "pycountry",
+    "tulip",
+    "tulip_mania_next",
+    "requests",
+    "urllib3",
+    "certifi",
+    "charset_normalizer",
+    "idna",
+    "yaml",
+    # Imported by the notebooks themselves
+    "inflection",
+    "dotenv",
+    "xbbg",
+    "blpapi",
+    "polars_bloomberg",
+    "polars",
+    "macrosynergy",
+    "seaborn",
+    "statsmodels",
+    "patsy",
+    "sklearn",
+    "joblib",
+    "threadpoolctl",
+    "pyfredapi",
+    "tulip_mania",
+)
+
+
+class KernelError(RuntimeError):
+    """Raised when a pooled kernel cannot be started or controlled."""
+
+
+class PooledKernel:
+    """A running kernel together with the client used to control it."""
+
+    def __init__(self, host):
+        self.host = host
+        self.uses = 0
+
+    @property
+    def km(self):
+        return self.host.km
+
+    @property
+    def kc(self):
+        return self.host.kc
+
+    def execute_silent(self, code: str, user_expressions: Optional[dict] = None) -> dict:
+        """
+        Run code silently in the kernel and return the evaluated user expressions.
+
+        Silent executions do not touch the execution count or the history and
+        do not trigger IPython's cell events.
+        """
+        msg_id = self.kc.execute(
+            code,
+            silent=True,
+            store_history=False,
+            user_expressions=user_expressions or {},
+            allow_stdin=False,
+        )
+        reply = self.host.wait_for_reply(msg_id)
+        if reply is None:
+            raise KernelError("No reply from kernel")
+
+        content = reply["content"]
+        if content.get("status") != "ok":
+            raise KernelError(f"{content.get('ename')}: {content.get('evalue')}")
+
+        results = {}
+        for name, result in content.get("user_expressions", {}).items():
+            if result.get("status") != "ok":
+                raise KernelError(f"{name}: {result.get('ename')}: {result.get('evalue')}")
+            results[name] = ast.literal_eval(result["data"]["text/plain"])
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the kernel and its channels."""
+        if self.host.km is None:
+            return
+        try:
+            # Shuts the kernel down and stops the client channels
+            self.host._cleanup_kernel()
+        except Exception as e:
+            logger.debug(f"Error shutting down kernel: {e}")
+
+
+def start_kernel(
+    kernel_name: str = "python3",
+    startup_timeout: int = 300,
+    extra_arguments: Optional[List[str]] = None,
+) -> PooledKernel:
+    """
+    Start a standalone kernel that can be controlled with silent executions.
+
+    The caller owns the kernel and must call ``shutdown`` on it.
+    """
+    import nbformat
+    from nbclient import NotebookClient
+
+    host = NotebookClient(
+        nbformat.v4.new_notebook(),
+        timeout=startup_timeout,
+        startup_timeout=startup_timeout,
+        kernel_name=kernel_name,
+        extra_arguments=list(extra_arguments or []),
+    )
+    host.km = host.create_kernel_manager()
+    host.start_new_kernel()
+    host.start_new_kernel_client()
+    return PooledKernel(host)
+
+
+class KernelPool:
+    """
+    Warm kernels for one worker process.
+
+    Args:
+        kernel_name: Kernel spec to start
+        prelude: Module imported in every kernel right after start (None to skip)
+        size: Number of kernels started ahead of time
+        max_uses: Recycle a kernel after this many notebooks
+        max_rss_mb: Recycle a kernel whose resident memory exceeds this (MB)
+        module_allowlist: Top-level packages allowed to stay loaded between notebooks
+        startup_timeout: Seconds to wait for a kernel (and its prelude) to start
+        extra_arguments: Extra command line arguments passed to the kernel
+    """
+
+    def __init__(
+        self,
+        kernel_name: str = "python3",
+        prelude: Optional[str] = "tulip_mania_next.prelude",
+        size: int = 1,
+        max_uses: int = 10,
+        max_rss_mb: Optional[float] = 4096,
+        module_allowlist: Iterable[str] = DEFAULT_MODULE_ALLOWLIST,
+        startup_timeout: int = 300,
+        extra_arguments: Optional[List[str]] = None,
+    ):
+        self.kernel_name = kernel_name
+        self.prelude = prelude
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.module_allowlist = list(module_allowlist)
+        self.startup_timeout = startup_timeout
+        self.extra_arguments = list(extra_arguments or [])
+        self._idle: List[PooledKernel] = []
+
+    def _start_kernel(self) -> PooledKernel:
+        """Start a kernel, import the prelude and snapshot its loaded modules."""
+        kernel = start_kernel(
+            kernel_name=self.kernel_name,
+            startup_timeout=self.startup_timeout,
+            extra_arguments=self.extra_arguments,
+        )
+        try:
+            if self.prelude:
+                kernel.execute_silent(f"import {self.prelude}")
+            kernel.execute_silent(f"{PROBE}.mark_baseline()")
+            kernel.execute_silent(f"{PROBE}.mark_shell_baseline()")
+            kernel.execute_silent(f"{PROBE}.reset_namespace()")
+        except Exception:
+            kernel.shutdown()
+            raise
+        return kernel
+
+    def start(self) -> None:
+        """Start kernels until ``size`` of them are idle."""
+        while len(self._idle) < self.size:
+            self._idle.append(self._start_kernel())
+
+    def acquire(self) -> PooledKernel:
+        """Take an idle kernel, starting a new one if none is available."""
+        if self._idle:
+            return self._idle.pop()
+        return self._start_kernel()
+
+    def release(self, kernel: PooledKernel, healthy: bool = True) -> None:
+        """
+        Return a kernel after a notebook ran on it.
+
+        The namespace is reset; the kernel is shut down instead of being reused
+        when the notebook failed abnormally, when it reached ``max_uses``, when
+        its memory exceeds ``max_rss_mb``, when non-allowlisted modules were
+        imported or when shell settings could not be restored.
+        """
+        kernel.uses += 1
+        reason = None
+
+        if not healthy:
+            reason = "unhealthy"
+        elif kernel.uses >= self.max_uses:
+            reason = f"reached {kernel.uses} uses"
+        else:
+            try:
+                state = kernel.execute_silent(
+                    f"{PROBE}.reset_namespace()",
+                    user_expressions={
+                        "rss": f"{PROBE}.rss_mb()",
+                        "modules": f"{PROBE}.new_modules({self.module_allowlist!r})",
+                        "shell": f"{PROBE}.shell_drift()",
+                    },
+                )
+                if self.max_rss_mb and state["rss"] and state["rss"] > self.max_rss_mb:
+                    reason = f"RSS {state['rss']:.0f} MB over {self.max_rss_mb:.0f} MB"
+                elif state["modules"]:
+                    reason = f"imported non-allowlisted modules {state['modules']}"
+                elif state["shell"]:
+                    reason = f"changed shell settings {state['shell']}"
+            except Exception as e:
+                reason = f"reset failed: {e}"
+
+        if reason:
+            logger.debug(f"Recycling kernel: {reason}")
+            kernel.shutdown()
+            return
+
+        self._idle.append(kernel)
+
+    def shutdown(self) -> None:
+        """Shut down every idle kernel."""
+        while self._idle:
+            self._idle.pop().shutdown()
+
+
+_WORKER_POOL: Optional[KernelPool] = None
+
+
+def init_worker_pool(options: dict) -> None:
+    """
+    ``ProcessPoolExecutor`` initializer creating and warming this worker's pool.
+
+    Failures are logged rather than raised so a broken kernel setup does not
+    break the executor; notebooks then fall back to cold kernels.
+    """
+    global _WORKER_POOL
+    pool = KernelPool(**options)
+    try:
+        pool.start()
+    except Exception as e:
+        logger.warning(f"Could not warm kernel pool: {e}")
+        pool.shutdown()
+        return
+
+    _WORKER_POOL = pool
+    atexit.register(pool.shutdown)
+    multiprocessing.util.Finalize(pool, pool.shutdown, exitpriority=10)
+
+
+def get_worker_pool() -> Optional[KernelPool]:
+    """Return this worker's kernel pool, if one was initialised."""
+    return _WORKER_POOL
@@ -0,0 +1,234 @@
+"""
+Helpers imported inside build kernels.
+
+The build process calls these through silent kernel executions, so this module
+only depends on the standard library and never touches the user namespace
+except to reset it.
+"""
+
+import sys
+import time
+from typing import Callable, Iterable, List, Optional
+
+_BASELINE_MODULES = set()
+_SHELL_BASELINE: dict = {}
+_RESET_HOOKS: List[Callable[[], None]] = []
+_CELL_RECORDS: List[dict] = []
+_CELL_START: dict = {}
+
+
+def rss_mb() -> Optional[float]:
+    """Return the current resident set size of this process in MB."""
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+
+    try:
+        import os
+
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident set size of this process in MB."""
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / 2**20
+    return peak / 2**10
+
+
+def mark_baseline() -> int:
+    """Remember the currently loaded top-level modules as the kernel baseline."""
+    _BASELINE_MODULES.clear()
+    _BASELINE_MODULES.update(name.partition(".")[0] for name in sys.modules)
+    return len(_BASELINE_MODULES)
+
+
+def new_modules(allowlist: Iterable[str] = ()) -> List[str]:
+    """
+    List top-level modules imported since the baseline that are not allowlisted.
+
+    Standard library modules are always allowed.
+    """
+    allowed = set(allowlist) | set(getattr(sys, "stdlib_module_names", ()))
+    loaded = {name.partition(".")[0] for name in sys.modules}
+    return sorted(
+        name for name in loaded - _BASELINE_MODULES
+        if name not in allowed and not name.startswith("_")
+    )
+
+
+def _formatter_state(shell) -> dict:
+    display = shell.display_formatter
+    return {
+        "active_types": list(display.active_types),
+        "enabled": {mime: f.enabled for mime, f in display.formatters.items()},
+    }
+
+
+def _printers(shell) -> dict:
+    return {
+        mime: (dict(f.type_printers), dict(f.deferred_printers))
+        for mime, f in shell.display_formatter.formatters.items()
+    }
+
+
+def _backend() -> Optional[str]:
+    matplotlib = sys.modules.get("matplotlib")
+    if matplotlib is None:
+        return None
+    # The raw value: get_backend() would resolve and import an automatic backend
+    return dict.__getitem__(matplotlib.rcParams, "backend")
+
+
+def mark_shell_baseline() -> None:
+    """Remember the shell settings notebooks may change, restored by ``reset_namespace``."""
+    from IPython import get_ipython
+
+    shell = get_ipython()
+    _SHELL_BASELINE.clear()
+    _SHELL_BASELINE.update(
+        ast_node_interactivity=shell.ast_node_interactivity,
+        formatters=_formatter_state(shell),
+        printers=_printers(shell),
+        backend=_backend(),
+    )
+
+
+def _restore_shell(shell) -> None:
+    shell.ast_node_interactivity = _SHELL_BASELINE["ast_node_interactivity"]
+    display = shell.display_formatter
+    display.active_types = list(_SHELL_BASELINE["formatters"]["active_types"])
+    for mime, enabled in _SHELL_BASELINE["formatters"]["enabled"].items():
+        if mime in display.formatters:
+            display.formatters[mime].enabled = enabled
+
+    matplotlib = sys.modules.get("matplotlib")
+    if matplotlib is not None:
+        backend = _SHELL_BASELINE["backend"] or matplotlib.rcParamsOrig["backend"]
+        if isinstance(backend, str) and _backend() != backend:
+            import matplotlib.pyplot as plt
+
+            plt.close("all")
+            plt.switch_backend(backend)
+
+
+def shell_drift() -> List[str]:
+    """
+    Shell settings that still differ from the baseline after a reset.
+
+    Display printers registered by a notebook are not undone, since a module
+    imported by it may have registered them once for every later notebook; a
+    kernel with changed printers is recycled instead.
+    """
+    from IPython import get_ipython
+
+    if not _SHELL_BASELINE:
+        return []
+    shell = get_ipython()
+    drift = []
+    if shell.ast_node_interactivity != _SHELL_BASELINE["ast_node_interactivity"]:
+        drift.append("ast_node_interactivity")
+    if _formatter_state(shell) != _SHELL_BASELINE["formatters"]:
+        drift.append("display formatters")
+    if _printers(shell) != _SHELL_BASELINE["printers"]:
+        drift.append("display printers")
+    backend = _SHELL_BASELINE["backend"]
+    if backend is not None and _backend() != backend:
+        drift.append("matplotlib backend")
+    return drift
+
+
+def on_reset(func: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback run whenever the kernel namespace is reset."""
+    if func not in _RESET_HOOKS:
+        _RESET_HOOKS.append(func)
+    return func
+
+
+def reset_namespace() -> None:
+    """
+    Clear the user namespace and per-page module state before the next notebook.
+
+    ``%reset`` leaves shell configuration alone, so the settings remembered by
+    ``mark_shell_baseline`` (expression display, display formatters, the
+    Matplotlib backend) are restored too.
+    """
+    from IPython import get_ipython
+
+    shell = get_ipython()
+    shell.run_line_magic("reset", "-f")
+    shell.execution_count = 1
+    if _SHELL_BASELINE:
+        try:
+            _restore_shell(shell)
+        except Exception:
+            # Left to shell_drift, which gets the kernel recycled
+            pass
+    for hook in list(_RESET_HOOKS):
+        try:
+            hook()
+        except Exception:
+            pass
+
+
+def _pre_run_cell(info=None) -> None:
+    _CELL_START.update(start=time.perf_counter(), rss=rss_mb(), peak=peak_rss_mb())
+
+
+def _post_run_cell(result=None) -> None:
+    if not _CELL_START:
+        return
+    rss, peak = rss_mb(), peak_rss_mb()
+    record = {
+        "execution_count": getattr(result, "execution_count", None),
+        "wall_s": time.perf_counter() - _CELL_START["start"],
+        "rss_mb": rss,
+        "rss_delta_mb": None,
+        "peak_rss_delta_mb": None,
+    }
+    if rss is not None and _CELL_START["rss"] is not None:
+        record["rss_delta_mb"] = rss - _CELL_START["rss"]
+    if peak is not None and _CELL_START["peak"] is not None:
+        record["peak_rss_delta_mb"] = peak - _CELL_START["peak"]
+    _CELL_RECORDS.append(record)
+    _CELL_START.clear()
+
+
+def install_cell_probe() -> None:
+    """Start recording wall time and memory of every (non-silent) cell run."""
+    from IPython import get_ipython
+
+    events = get_ipython().events
+    _CELL_RECORDS.clear()
+    _CELL_START.clear()
+    if _pre_run_cell not in events.callbacks["pre_run_cell"]:
+        events.register("pre_run_cell", _pre_run_cell)
+    if _post_run_cell not in events.callbacks["post_run_cell"]:
+        events.register("post_run_cell", _post_run_cell)
+
+
+def collect_cell_probe() -> List[dict]:
+    """Stop recording and return the per-cell records in execution order."""
+    from IPython import get_ipython
+
+    events = get_ipython().events
+    for name, callback in (("pre_run_cell", _pre_run_cell), ("post_run_cell", _post_run_cell)):
+        if callback in events.callbacks[name]:
+            events.unregister(name, callback)
+    records = list(_CELL_RECORDS)
+    _CELL_RECORDS.clear()
+    return records
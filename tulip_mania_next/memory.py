@@ -0,0 +1,196 @@
+"""
+Memory-aware execution: kernel watchdog and admission control.
+
+Inside a worker, ``KernelWatchdog`` samples the resident memory of the kernel
+running a notebook (including any processes it spawned), records the peak and
+kills the kernel when it exceeds a per-notebook cap, which nbclient then
+reports as a dead kernel.
+
+In the build process, ``MemoryAdmission`` decides whether the next notebook may
+start: its expected peak (from the duration history) must fit both in the
+memory still uncommitted to running notebooks and in what the system currently
+reports as available, minus a reserve. A notebook is always admitted when
+nothing else runs, so an oversized notebook runs alone instead of never.
+
+psutil is used when installed; otherwise ``/proc`` is read, which covers Linux
+build hosts.
+"""
+
+import os
+import signal
+import threading
+from typing import Dict, Optional
+
+
+def available_mb() -> Optional[float]:
+    """Memory available to new processes without swapping, in MB."""
+    try:
+        import psutil
+
+        return psutil.virtual_memory().available / 2**20
+    except ImportError:
+        pass
+
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) / 2**10
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _proc_children(pid: int) -> list:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children", "r") as f:
+            return [int(child) for child in f.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _proc_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/statm", "r") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def tree_rss_mb(pid: int) -> Optional[float]:
+    """Resident memory of a process and its descendants in MB (None if it is gone)."""
+    try:
+        import psutil
+
+        try:
+            process = psutil.Process(pid)
+            processes = [process, *process.children(recursive=True)]
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.NoSuchProcess:
+                    pass
+            return total / 2**20
+        except psutil.NoSuchProcess:
+            return None
+    except ImportError:
+        pass
+
+    try:
+        total = _proc_rss_mb(pid)
+    except (OSError, ValueError, AttributeError):
+        return None
+    pending = _proc_children(pid)
+    while pending:
+        child = pending.pop()
+        try:
+            total += _proc_rss_mb(child)
+        except (OSError, ValueError):
+            continue
+        pending.extend(_proc_children(child))
+    return total
+
+
+def kernel_pid(km) -> Optional[int]:
+    """Process id of the kernel managed by ``km``, if it runs locally."""
+    provisioner = getattr(km, "provisioner", None)
+    pid = getattr(provisioner, "pid", None)
+    if pid is None:
+        pid = getattr(getattr(km, "kernel", None), "pid", None)
+    return pid
+
+
+class KernelWatchdog:
+    """
+    Thread sampling a kernel's memory while a notebook runs.
+
+    Use as a context manager around the execution.
+
+    Args:
+        pid: Process id of the kernel
+        limit_mb: Kill the kernel once its memory exceeds this (None: only record the peak)
+        interval: Seconds between samples
+    """
+
+    def __init__(self, pid: int, limit_mb: Optional[float] = None, interval: float = 0.5):
+        self.pid = pid
+        self.limit_mb = limit_mb
+        self.interval = interval
+        self.peak_mb = 0.0
+        self.killed_at_mb: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kernel-watchdog", daemon=True)
+
+    def _sample(self) -> bool:
+        rss = tree_rss_mb(self.pid)
+        if rss is None:
+            return False
+        self.peak_mb = max(self.peak_mb, rss)
+        if self.limit_mb and rss > self.limit_mb:
+            self.killed_at_mb = rss
+            try:
+                os.kill(self.pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+            except OSError:
+                pass
+            return False
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.is_set() and self._sample():
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "KernelWatchdog":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        if self.killed_at_mb is None:
+            # Catch a peak reached after the last sample
+            self._sample()
+
+    @property
+    def exceeded(self) -> bool:
+        """Whether the kernel was killed for exceeding the cap."""
+        return self.killed_at_mb is not None
+
+    def message(self) -> str:
+        return f"Memory cap exceeded: kernel reached {self.killed_at_mb:.0f} MB (cap {self.limit_mb:.0f} MB)"
+
+
+class MemoryAdmission:
+    """
+    Admission control of notebooks by expected peak memory.
+
+    Args:
+        reserve_mb: Memory kept free for the system and the build itself
+        budget_mb: Memory notebooks may commit in total (default: available
+            memory when created, minus the reserve)
+    """
+
+    def __init__(self, reserve_mb: float = 2048, budget_mb: Optional[float] = None):
+        self.reserve_mb = reserve_mb
+        if budget_mb is None:
+            available = available_mb()
+            budget_mb = None if available is None else max(0.0, available - reserve_mb)
+        self.budget_mb = budget_mb
+        self.running: Dict[object, float] = {}
+
+    @property
+    def committed_mb(self) -> float:
+        return sum(self.running.values())
+
+    def admits(self, expected_mb: float) -> bool:
+        """Whether a notebook expected to peak at ``expected_mb`` may start now."""
+        if not self.running or self.budget_mb is None:
+            return True
+        if self.committed_mb + expected_mb > self.budget_mb:
+            return False
+        available = available_mb()
+        return available is None or available - self.reserve_mb >= expected_mb
+
+    def start(self, key, expected_mb: float) -> None:
+        self.running[key] = expected_mb
+
+    def finish(self, key) -> None:
+        self.running.pop(key, None)
@@ -0,0 +1,108 @@
+"""
+Checkpoints of a kernel's user namespace, imported inside build kernels.
+
+The build process calls these through silent kernel executions to save the
+namespace after an expensive cell and to restore it in a fresh kernel, so that
+a notebook can resume from that cell. Only the standard library is used.
+
+Modules are recorded by name and imported again. Everything else is pickled;
+functions and classes defined in the notebook itself cannot be restored from a
+pickle (they pickle as references to ``__main__``), so a namespace holding one
+is reported as unpicklable and no checkpoint is written.
+"""
+
+import os
+import pickle
+import re
+import types
+from typing import Dict, List
+
+# IPython's own names in the user namespace
+_SKIP_NAMES = {"In", "Out", "get_ipython", "exit", "quit", "open"}
+
+# IPython's output and input history (``_``, ``_5``, ``_i``, ``_i5``, ``_oh``, ...)
+# and the module attributes of ``__main__``; other underscored names are the user's
+_HISTORY_NAME = re.compile(r"_{1,3}|_\d+|_i{1,3}|_i\d+|_oh|_ih|_dh|__\w+__")
+
+
+class _CheckpointPickler(pickle.Pickler):
+    """Pickler refusing references to objects defined in ``__main__``."""
+
+    def reducer_override(self, obj):
+        if isinstance(obj, (type, types.FunctionType)) and getattr(obj, "__module__", None) == "__main__":
+            raise pickle.PicklingError(f"{obj.__qualname__} is defined in the notebook")
+        return NotImplemented
+
+
+def _user_names(shell) -> Dict[str, object]:
+    hidden = getattr(shell, "user_ns_hidden", {})
+    return {
+        name: value
+        for name, value in shell.user_ns.items()
+        if not _HISTORY_NAME.fullmatch(name) and name not in _SKIP_NAMES and name not in hidden
+    }
+
+
+def save_namespace(path: str) -> dict:
+    """
+    Write the user namespace to ``path``.
+
+    Returns:
+        ``{"saved": <number of names>, "bytes": <size>}``, or
+        ``{"unpicklable": [names]}`` when nothing was written
+    """
+    import io
+
+    from IPython import get_ipython
+
+    shell = get_ipython()
+    modules: Dict[str, str] = {}
+    picklable: Dict[str, object] = {}
+    for name, value in _user_names(shell).items():
+        if isinstance(value, types.ModuleType):
+            modules[name] = value.__name__
+        else:
+            picklable[name] = value
+
+    values = io.BytesIO()
+    try:
+        # One pickle for the whole namespace keeps shared references shared
+        _CheckpointPickler(values, protocol=pickle.HIGHEST_PROTOCOL).dump(picklable)
+    except Exception:
+        unpicklable: List[str] = []
+        for name, value in picklable.items():
+            try:
+                _CheckpointPickler(io.BytesIO(), protocol=pickle.HIGHEST_PROTOCOL).dump(value)
+            except Exception:
+                unpicklable.append(name)
+        return {"unpicklable": sorted(unpicklable) or ["<namespace>"]}
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"modules": modules, "execution_count": shell.execution_count}, f)
+        f.write(values.getbuffer())
+    os.replace(tmp_path, path)
+    return {"saved": len(picklable) + len(modules), "bytes": os.path.getsize(path)}
+
+
+def load_namespace(path: str) -> dict:
+    """
+    Restore a namespace written by ``save_namespace`` into the user namespace.
+
+    Returns:
+        ``{"restored": <number of names>, "execution_count": <count at save time>}``
+    """
+    import importlib
+
+    from IPython import get_ipython
+
+    shell = get_ipython()
+    with open(path, "rb") as f:
+        header = pickle.load(f)
+        values = pickle.load(f)
+
+    for name, module_name in header["modules"].items():
+        values[name] = importlib.import_module(module_name)
+    shell.user_ns.update(values)
+    shell.execution_count = header["execution_count"]
+    return {"restored": len(values), "execution_count": header["execution_count"]}
@@ -0,0 +1,114 @@
+"""
+Change-aware, atomic write-back of executed notebooks.
+
+Re-executing an unchanged notebook produces the same outputs apart from
+volatile details: execution counts, nbclient's per-cell timing metadata and
+the random element ids of column layouts, tables, lazy outputs and Plotly
+divs. ``write_notebook`` compares the new content with the file on disk with
+those details normalized away and leaves the file untouched when nothing else
+differs, so its mtime does not change and neither the book build nor git sees
+a change.
+
+When the notebook did change, it is serialized exactly like ``nbformat.write``
+(without validating the schema again, as execution does not change the
+structure) into a temp file next to it, fsynced and moved over the original
+with ``os.replace``, so a crash never leaves a truncated notebook behind.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Optional, Union
+
+# Random ids generated by columns_framework, tables, hydration and Plotly
+VOLATILE_IDS = re.compile(
+    r"\b(?:columns|col|tmn-lazy|tmn-table)-[0-9a-f]{8}\b"
+    r"|\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b"
+)
+
+
+def serialize(nb) -> str:
+    """Notebook JSON text, byte for byte as ``nbformat.write`` produces it."""
+    from nbformat.v4 import nbjson
+
+    text = nbjson.writes(nb)
+    return text if text.endswith("\n") else text + "\n"
+
+
+def normalized_hash(text: str) -> str:
+    """
+    Hash of notebook JSON text ignoring volatile details.
+
+    Execution counts and ``execution`` timing metadata are cleared, and random
+    ids are renumbered in order of appearance, so two runs producing the same
+    layout hash alike.
+    """
+    nb = json.loads(text)
+    for cell in nb.get("cells", []):
+        if "execution_count" in cell:
+            cell["execution_count"] = None
+        cell.get("metadata", {}).pop("execution", None)
+        for output in cell.get("outputs", []):
+            if "execution_count" in output:
+                output["execution_count"] = None
+
+    # The compact form uses the C encoder, unlike nbformat's indented one
+    canonical = json.dumps(nb, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    ids = {}
+    canonical = VOLATILE_IDS.sub(lambda match: ids.setdefault(match.group(), f"<id {len(ids)}>"), canonical)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _unchanged(original: str, text: str) -> bool:
+    if original == text:
+        return True
+    try:
+        return normalized_hash(original) == normalized_hash(text)
+    except ValueError:
+        # The file on disk is not valid JSON
+        return False
+
+
+def write_notebook(nb, notebook_path: Union[str, Path], original: Optional[str] = None) -> bool:
+    """
+    Write a notebook back unless only volatile details changed.
+
+    Args:
+        nb: Notebook node to write
+        notebook_path: Destination file
+        original: Content of the file as read before execution (default: read it now)
+
+    Returns:
+        True if the file was written, False if it was left untouched
+    """
+    path = Path(notebook_path)
+    text = serialize(nb)
+    if original is None:
+        original = _read_text(path)
+    if original is not None and _unchanged(original, text):
+        return False
+
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return True
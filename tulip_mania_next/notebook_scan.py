@@ -0,0 +1,103 @@
+"""
+Fast scanning of executed notebooks for error outputs.
+
+Error outputs are found with a byte-level search for the ``"output_type":
+"error"`` key, which cannot occur inside a JSON string value (quotes there are
+escaped). Large ``text/html`` and Plotly payloads are therefore never decoded;
+a notebook is only parsed as JSON when it actually contains an error output.
+Results are kept in an index keyed on file mtime and size so unchanged files
+are not read again.
+"""
+
+import json
+import mmap
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from tulip_mania_next.exec_cache import CACHE_DIR, atomic_write_json
+
+ERROR_OUTPUT = re.compile(rb'"output_type"\s*:\s*"error"')
+
+
+def scan_notebook_errors(notebook_path: Union[str, Path]) -> List[str]:
+    """
+    List the error outputs of a notebook.
+
+    Args:
+        notebook_path: Path to the notebook
+
+    Returns:
+        Error descriptions like ``"Cell 3: KeyError: 'x'"`` (empty if clean)
+
+    Raises:
+        ValueError: If the file is not a complete JSON document
+    """
+    with open(notebook_path, "rb") as f:
+        size = f.seek(0, 2)
+        if size == 0:
+            raise ValueError("Empty notebook file")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Cheap truncation check: a notebook is a single JSON object
+            if data[: min(size, 64)].lstrip()[:1] != b"{" or data[max(0, size - 64):].rstrip()[-1:] != b"}":
+                raise ValueError("Notebook file is truncated or not a JSON object")
+            if ERROR_OUTPUT.search(data) is None:
+                return []
+            nb = json.loads(data[:])
+
+    errors = []
+    for idx, cell in enumerate(nb.get("cells", [])):
+        if cell.get("cell_type") != "code":
+            continue
+        for output in cell.get("outputs", []):
+            if output.get("output_type") == "error":
+                error_name = output.get("ename", "Unknown")
+                error_value = output.get("evalue", "Unknown error")
+                errors.append(f"Cell {idx + 1}: {error_name}: {error_value}")
+    return errors
+
+
+class ScanIndex:
+    """
+    Check results keyed on each notebook's mtime and size.
+
+    Args:
+        path: JSON file backing the index
+    """
+
+    def __init__(self, path: Union[str, Path] = CACHE_DIR / "check_index.json"):
+        self.path = Path(path)
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries: Dict[str, dict] = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def _signature(notebook_path: Path) -> List[int]:
+        stat = Path(notebook_path).stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def lookup(self, notebook_path: Path, kind: str = "errors") -> Optional[list]:
+        """Return the stored result for an unchanged notebook, or None."""
+        entry = self.entries.get(str(Path(notebook_path).resolve()))
+        try:
+            if entry and entry["signature"] == self._signature(notebook_path) and kind in entry:
+                return entry[kind]
+        except OSError:
+            pass
+        return None
+
+    def store(self, notebook_path: Path, result: list, kind: str = "errors") -> None:
+        """Record the result of a scan of the notebook's current content."""
+        key = str(Path(notebook_path).resolve())
+        signature = self._signature(notebook_path)
+        entry = self.entries.get(key)
+        if not entry or entry.get("signature") != signature:
+            entry = {"signature": signature}
+        entry[kind] = result
+        self.entries[key] = entry
+
+    def save(self) -> None:
+        """Persist the index atomically."""
+        atomic_write_json(self.path, self.entries)
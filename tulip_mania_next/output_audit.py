@@ -0,0 +1,226 @@
+"""
+Output size audit of executed notebooks.
+
+``audit_notebook_outputs`` measures what every cell's outputs weigh, broken
+down by MIME type, at three levels:
+
+- cell: all stored outputs of one cell
+- notebook: the ``.ipynb`` file on disk
+- page: what the rendered page ships, i.e. per output only the richest MIME
+  type the site displays (Plotly JSON over HTML over images over text, the
+  order MyST prefers), skipping cells tagged ``remove-output``/``remove-cell``
+
+Sizes are of the JSON values as stored, so base64 images count at their
+encoded size. Outputs moved to the output store count as their small
+placeholders.
+
+``OutputBudgets`` holds a warn and a fail threshold per level and turns an
+audit into ``Violation``s naming the cells and MIME types responsible.
+"""
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+AUDIT_REPORT = Path("_build") / "output_audit.json"
+
+REMOVE_TAGS = {"remove-output", "remove-cell"}
+
+# MIME types in the order the site picks one to display
+DISPLAY_PRIORITY = (
+    "application/vnd.jupyter.widget-view+json",
+    "application/vnd.plotly.v1+json",
+    "text/html",
+    "image/svg+xml",
+    "image/png",
+    "image/jpeg",
+    "image/gif",
+    "text/markdown",
+    "text/latex",
+    "text/plain",
+)
+
+SCOPES = ("cell", "notebook", "page")
+
+
+def _size(value) -> int:
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return sum(len(item.encode("utf-8")) for item in value)
+    return len(json.dumps(value, separators=(",", ":")).encode("utf-8"))
+
+
+def _output_sizes(output: dict) -> Tuple[Dict[str, int], int]:
+    """Bytes per MIME type of one output, and the bytes of the one displayed."""
+    output_type = output.get("output_type")
+    if output_type == "stream":
+        size = _size(output.get("text", ""))
+        return {f"stream/{output.get('name', 'stdout')}": size}, size
+    if output_type == "error":
+        size = _size(output.get("traceback", []))
+        return {"error": size}, size
+
+    data = output.get("data", {})
+    sizes = {mime: _size(value) for mime, value in data.items()}
+    displayed = next((mime for mime in DISPLAY_PRIORITY if mime in data), None)
+    if displayed is None and sizes:
+        displayed = max(sizes, key=sizes.get)
+    return sizes, sizes.get(displayed, 0)
+
+
+def audit_notebook_outputs(notebook_path: Union[str, Path]) -> dict:
+    """
+    Measure the outputs of a notebook.
+
+    Returns:
+        A JSON-serializable dict with ``file_bytes``, ``output_bytes``,
+        ``page_bytes``, ``by_mime`` and, for every cell with outputs,
+        ``cells`` entries holding its 1-based ``cell`` number, ``id``,
+        ``bytes``, ``page_bytes`` and ``by_mime``
+    """
+    path = Path(notebook_path)
+    with open(path, "rb") as f:
+        data = f.read()
+    nb = json.loads(data)
+
+    by_mime: Dict[str, int] = {}
+    cells = []
+    for index, cell in enumerate(nb.get("cells", [])):
+        outputs = cell.get("outputs") or []
+        if not outputs:
+            continue
+        removed = bool(REMOVE_TAGS & set(cell.get("metadata", {}).get("tags", [])))
+        cell_mime: Dict[str, int] = {}
+        page_bytes = 0
+        for output in outputs:
+            sizes, displayed = _output_sizes(output)
+            for mime, size in sizes.items():
+                cell_mime[mime] = cell_mime.get(mime, 0) + size
+            if not removed:
+                page_bytes += displayed
+        for mime, size in cell_mime.items():
+            by_mime[mime] = by_mime.get(mime, 0) + size
+        cells.append({
+            "cell": index + 1,
+            "id": cell.get("id"),
+            "bytes": sum(cell_mime.values()),
+            "page_bytes": page_bytes,
+            "by_mime": cell_mime,
+        })
+
+    return {
+        "file_bytes": len(data),
+        "output_bytes": sum(by_mime.values()),
+        "page_bytes": sum(cell["page_bytes"] for cell in cells),
+        "by_mime": by_mime,
+        "cells": cells,
+    }
+
+
+def format_bytes(size: float) -> str:
+    if size >= 2**20:
+        return f"{size / 2**20:.1f} MB"
+    return f"{size / 2**10:.0f} KB"
+
+
+def _largest_mime(by_mime: Dict[str, int]) -> str:
+    mime = max(by_mime, key=by_mime.get)
+    return f"{mime} {format_bytes(by_mime[mime])}"
+
+
+def _top_cells(audit: dict, key: str, count: int = 3) -> str:
+    cells = sorted(audit["cells"], key=lambda cell: cell[key], reverse=True)[:count]
+    return ", ".join(
+        f"cell {cell['cell']} ({_largest_mime(cell['by_mime'])})" for cell in cells if cell[key]
+    )
+
+
+@dataclass
+class Budget:
+    """Warn and fail thresholds in KB (None: no threshold)."""
+
+    warn_kb: Optional[float] = None
+    fail_kb: Optional[float] = None
+
+    def level(self, size: int) -> Optional[str]:
+        if self.fail_kb is not None and size > self.fail_kb * 1024:
+            return "fail"
+        if self.warn_kb is not None and size > self.warn_kb * 1024:
+            return "warn"
+        return None
+
+    def limit_kb(self, level: str) -> float:
+        return self.fail_kb if level == "fail" else self.warn_kb
+
+
+@dataclass
+class Violation:
+    """A budget exceeded by a notebook."""
+
+    level: str
+    scope: str
+    message: str
+
+
+@dataclass
+class OutputBudgets:
+    """Budgets per scope: ``cell``, ``notebook`` and ``page``."""
+
+    cell: Budget = field(default_factory=lambda: Budget(warn_kb=1024))
+    notebook: Budget = field(default_factory=lambda: Budget(warn_kb=4096))
+    page: Budget = field(default_factory=lambda: Budget(warn_kb=3072))
+
+    @classmethod
+    def parse(cls, specs: List[str]) -> "OutputBudgets":
+        """
+        Budgets from ``SCOPE=WARN_KB[:FAIL_KB]`` specs over the defaults.
+
+        ``page=2048:4096`` warns above 2 MB and fails above 4 MB; an empty
+        part (``cell=:2048``) removes that threshold.
+
+        Raises:
+            ValueError: On an unknown scope or a malformed spec
+        """
+        budgets = cls()
+        for spec in specs:
+            scope, _, limits = spec.partition("=")
+            if scope not in SCOPES or not limits:
+                raise ValueError(
+                    f"Invalid output budget {spec!r}: expected SCOPE=WARN_KB[:FAIL_KB] with SCOPE one of "
+                    f"{', '.join(SCOPES)}"
+                )
+            warn, _, fail = limits.partition(":")
+            try:
+                setattr(budgets, scope, Budget(
+                    warn_kb=float(warn) if warn else None,
+                    fail_kb=float(fail) if fail else None,
+                ))
+            except ValueError:
+                raise ValueError(f"Invalid output budget {spec!r}: limits must be numbers of KB") from None
+        return budgets
+
+    def evaluate(self, audit: dict) -> List[Violation]:
+        """The budgets an audited notebook exceeds, most severe first."""
+        violations = []
+        for cell in audit["cells"]:
+            level = self.cell.level(cell["bytes"])
+            if level:
+                violations.append(Violation(level, "cell", (
+                    f"Cell {cell['cell']} outputs {format_bytes(cell['bytes'])} "
+                    f"(cell budget {format_bytes(self.cell.limit_kb(level) * 1024)}), "
+                    f"mostly {_largest_mime(cell['by_mime'])}"
+                )))
+
+        for scope, key, what in (("notebook", "file_bytes", "Notebook file"), ("page", "page_bytes", "Page outputs")):
+            budget = getattr(self, scope)
+            level = budget.level(audit[key])
+            if level:
+                top_key = "page_bytes" if scope == "page" else "bytes"
+                violations.append(Violation(level, scope, (
+                    f"{what} {format_bytes(audit[key])} ({scope} budget "
+                    f"{format_bytes(budget.limit_kb(level) * 1024)}), largest: {_top_cells(audit, top_key)}"
+                )))
+
+        return sorted(violations, key=lambda violation: violation.level != "fail")
@@ -0,0 +1,262 @@
+"""
+Sidecar store for large notebook outputs.
+
+Executed notebooks carry megabytes of regenerated HTML and Plotly JSON. In
+output-store mode, every rich output value above a size threshold is moved to
+a content-addressed JSON blob (``<store>/<k[:2]>/<key>.json``) and the
+notebook keeps only a reference in the output's metadata, plus a short
+``text/plain`` note. Rehydrating puts the values back, e.g. before the book
+build. Unchanged outputs map to existing blobs and are never written twice.
+
+The store is committed next to the notebooks that reference it, so any
+checkout (the deploy workflow included) can rehydrate them; a store that git
+would not commit is refused rather than producing notebooks nobody else can
+render. Blobs are stored uncompressed so that git can delta a changed output
+against its previous version, and ``prune`` deletes the blobs no notebook
+references any more, so the store only grows with what the outputs change.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import Optional, Union
+
+METADATA_KEY = "tulip_output_store"
+
+DEFAULT_STORE_DIR = Path("_output_store")
+
+# Output types with a MIME bundle
+_RICH_OUTPUTS = ("display_data", "execute_result")
+
+
+class MissingBlob(LookupError):
+    """Raised when a referenced output is not in the store."""
+
+
+def unpublished_reason(store_dir: Union[str, Path]) -> Optional[str]:
+    """
+    Why blobs written to ``store_dir`` would not reach other checkouts.
+
+    Returns:
+        A reason if the store is outside the git work tree or ignored by git,
+        None if it would be committed (or the project is not a git repository)
+    """
+    store_dir = Path(store_dir).resolve()
+    try:
+        top = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    if not store_dir.is_relative_to(Path(top).resolve()):
+        return f"{store_dir} is outside the repository"
+    # Any blob path will do: ignore rules on the store's directories apply to it
+    probe = store_dir / "00" / "probe.json.gz"
+    if subprocess.run(["git", "check-ignore", "-q", str(probe)], capture_output=True).returncode == 0:
+        return f"{store_dir} is ignored by git"
+    return None
+
+
+def _references(nb) -> set:
+    """Keys of the blobs a notebook (as a plain dict) references."""
+    keys = set()
+    for cell in nb.get("cells", []):
+        for output in cell.get("outputs", []):
+            keys.update(output.get("metadata", {}).get(METADATA_KEY, {}).get("refs", {}).values())
+    return keys
+
+
+class OutputStore:
+    """
+    Content-addressed store of notebook output values.
+
+    Args:
+        store_dir: Directory holding the blobs
+        threshold: Minimum serialized size in bytes of an output value worth moving
+    """
+
+    def __init__(self, store_dir: Union[str, Path] = DEFAULT_STORE_DIR, threshold: int = 16384):
+        self.store_dir = Path(store_dir).resolve()
+        self.threshold = threshold
+
+    def _blob_path(self, key: str) -> Path:
+        return self.store_dir / key[:2] / f"{key}.json"
+
+    def put(self, value) -> str:
+        """Store an output value (unless already present) and return its key."""
+        payload = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        key = hashlib.sha256(payload).hexdigest()
+        path = self._blob_path(key)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{key}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(payload)
+                os.replace(tmp_path, path)
+            except Exception:
+                tmp_path.unlink(missing_ok=True)
+                raise
+        return key
+
+    def get(self, key: str):
+        """Load an output value; raises ``MissingBlob`` if it is not stored."""
+        path = self._blob_path(key)
+        try:
+            with open(path, "rb") as f:
+                return json.loads(f.read())
+        except FileNotFoundError:
+            pass
+        try:
+            # Blobs written before the store was uncompressed
+            with open(path.with_suffix(".json.gz"), "rb") as f:
+                return json.loads(gzip.decompress(f.read()))
+        except FileNotFoundError:
+            raise MissingBlob(f"Output {key} is not in {self.store_dir}") from None
+
+    def prune(self, notebooks) -> dict:
+        """
+        Delete the blobs none of the given notebook files references.
+
+        Pass every notebook of the tree: a blob only referenced by a notebook
+        left out is deleted. A rehydrated notebook references nothing, which
+        is safe since it holds the values; dehydrating it writes them again.
+
+        Returns:
+            Stats with the number of blobs deleted and their size
+        """
+        referenced = set()
+        for notebook_path in notebooks:
+            with open(notebook_path, "r", encoding="utf-8") as f:
+                referenced.update(_references(json.load(f)))
+
+        stats = {"deleted": 0, "bytes_deleted": 0}
+        if not self.store_dir.is_dir():
+            return stats
+        for path in self.store_dir.glob("*/*.json*"):
+            if path.name.split(".")[0] in referenced:
+                continue
+            stats["bytes_deleted"] += path.stat().st_size
+            path.unlink()
+            stats["deleted"] += 1
+            if not any(path.parent.iterdir()):
+                path.parent.rmdir()
+        return stats
+
+    def dehydrate(self, nb) -> dict:
+        """
+        Move large output values of a notebook to the store, in place.
+
+        Returns:
+            Stats with the number of values moved and their serialized size
+        """
+        stats = {"moved": 0, "bytes_moved": 0}
+        for cell in nb.get("cells", []):
+            for output in cell.get("outputs", []) if cell.get("cell_type") == "code" else []:
+                if output.get("output_type") not in _RICH_OUTPUTS:
+                    continue
+                data = output.get("data", {})
+                refs = output.setdefault("metadata", {}).get(METADATA_KEY, {})
+                for mime, value in list(data.items()):
+                    if mime == "text/plain" and refs.get("placeholder"):
+                        continue
+                    size = len(value) if isinstance(value, str) else len(json.dumps(value))
+                    if size < self.threshold:
+                        continue
+                    refs.setdefault("refs", {})[mime] = self.put(value)
+                    del data[mime]
+                    stats["moved"] += 1
+                    stats["bytes_moved"] += size
+                if refs and "text/plain" not in data:
+                    data["text/plain"] = "[output kept in the output store; run main.py --rehydrate]"
+                    refs["placeholder"] = True
+                if refs:
+                    output["metadata"][METADATA_KEY] = refs
+        return stats
+
+    def rehydrate(self, nb) -> dict:
+        """
+        Put stored output values back into a notebook, in place.
+
+        Returns:
+            Stats with the number of values restored
+
+        Raises:
+            MissingBlob: If a referenced value is not in the store
+        """
+        stats = {"restored": 0}
+        for cell in nb.get("cells", []):
+            for output in cell.get("outputs", []) if cell.get("cell_type") == "code" else []:
+                refs = output.get("metadata", {}).get(METADATA_KEY)
+                if not refs:
+                    continue
+                data = output.setdefault("data", {})
+                if refs.get("placeholder"):
+                    data.pop("text/plain", None)
+                for mime, key in refs.get("refs", {}).items():
+                    data[mime] = self.get(key)
+                    stats["restored"] += 1
+                del output["metadata"][METADATA_KEY]
+        return stats
+
+    def _transform_file(self, notebook_path: Union[str, Path], method) -> dict:
+        """Apply ``method`` to a notebook file, writing it back only if it changed."""
+        import nbformat
+
+        with open(notebook_path, "r", encoding="utf-8") as f:
+            nb = nbformat.read(f, as_version=4)
+        stats = method(nb)
+        if any(stats.values()):
+            tmp_path = Path(notebook_path).with_name(f".{Path(notebook_path).name}.{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                nbformat.write(nb, f)
+            os.replace(tmp_path, notebook_path)
+        return stats
+
+    def dehydrate_file(self, notebook_path: Union[str, Path]) -> dict:
+        """Dehydrate a notebook file in place."""
+        return self._transform_file(notebook_path, self.dehydrate)
+
+    def rehydrate_file(self, notebook_path: Union[str, Path]) -> dict:
+        """Rehydrate a notebook file in place."""
+        return self._transform_file(notebook_path, self.rehydrate)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    from tulip_mania_next.discovery import walk_notebooks
+
+    parser = argparse.ArgumentParser(prog="python -m tulip_mania_next.output_store")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="rehydrate",
+        choices=["rehydrate", "prune"],
+        help="rehydrate every notebook, failing on a missing output (used by the deploy workflow), "
+             "or delete the blobs no notebook references (default: rehydrate)",
+    )
+    parser.add_argument("--store", default=str(DEFAULT_STORE_DIR), help=f"Store directory (default: {DEFAULT_STORE_DIR})")
+    args = parser.parse_args()
+
+    store = OutputStore(args.store)
+    notebooks = walk_notebooks(Path.cwd())
+    if args.command == "prune":
+        stats = store.prune(notebooks)
+        print(f"Deleted {stats['deleted']} unreferenced outputs ({stats['bytes_deleted'] / 2**20:.1f} MB)")
+        sys.exit(0)
+
+    restored, missing = 0, []
+    for notebook in notebooks:
+        try:
+            restored += store.rehydrate_file(notebook)["restored"]
+        except MissingBlob as e:
+            missing.append(f"{notebook}: {e}")
+    print(f"Rehydrated {restored} outputs from {store.store_dir}")
+    if missing:
+        print("Outputs missing from the store:\n  " + "\n  ".join(missing), file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,158 @@
+"""
+Parameterized notebooks rendered from a template.
+
+A parameter matrix is a TOML file declaring a template notebook, an output
+path pattern and one table of parameters per run::
+
+    [[matrix]]
+    template = "ctry_template.ipynb"
+    output = "generated/ctry_{key}.ipynb"
+
+    [matrix.runs.canada]
+    ctry_iso2 = "CA"
+
+Paths are relative to the matrix file. Like papermill, each run gets a copy of
+the template with an ``injected-parameters`` cell inserted right after the cell
+tagged ``parameters`` (or at the top when there is none), overriding its
+defaults. Outputs are only rewritten when their code changes, so unchanged runs
+keep their previous outputs and execution-cache entry.
+"""
+
+import copy
+import json
+import os
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Union
+
+DEFAULT_MATRIX = Path("notebooks") / "Countries" / "matrix.toml"
+
+PARAMETERS_TAG = "parameters"
+INJECTED_TAG = "injected-parameters"
+
+
+@dataclass
+class MatrixRun:
+    """One parameter set of a matrix."""
+
+    key: str
+    template: Path
+    output: Path
+    parameters: Dict[str, object] = field(default_factory=dict)
+
+
+def load_matrix(path: Union[str, Path] = DEFAULT_MATRIX) -> List[MatrixRun]:
+    """
+    Read a parameter matrix.
+
+    Raises:
+        ValueError: If an entry lacks a template, an output pattern or runs
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        config = tomllib.load(f)
+
+    runs = []
+    for entry in config.get("matrix", []):
+        if not entry.get("template") or not entry.get("output") or not entry.get("runs"):
+            raise ValueError(f"{path}: every [[matrix]] entry needs template, output and runs")
+        template = (path.parent / entry["template"]).resolve()
+        for key, parameters in entry["runs"].items():
+            output = (path.parent / entry["output"].format(key=key, **parameters)).resolve()
+            runs.append(MatrixRun(key=key, template=template, output=output, parameters=dict(parameters)))
+    return runs
+
+
+def without_rendered(notebooks: List[Path], path: Union[str, Path] = DEFAULT_MATRIX) -> List[Path]:
+    """The notebooks that are not rendered by the matrix at ``path`` (all of them without one)."""
+    if not Path(path).exists():
+        return list(notebooks)
+    rendered = {run.output for run in load_matrix(path)}
+    return [nb for nb in notebooks if Path(nb).resolve() not in rendered]
+
+
+def parameters_source(parameters: Dict[str, object]) -> str:
+    """Python source assigning the parameters."""
+    lines = ["# Parameters"]
+    lines.extend(f"{name} = {value!r}" for name, value in parameters.items())
+    return "\n".join(lines) + "\n"
+
+
+def parameterize(template_nb, parameters: Dict[str, object], key: str = ""):
+    """
+    Copy of a template notebook with the parameters injected.
+
+    Args:
+        template_nb: The template notebook
+        parameters: Values overriding the template's defaults
+        key: Name of the run, recorded in the notebook metadata
+    """
+    import nbformat
+
+    nb = copy.deepcopy(template_nb)
+    nb.cells = [c for c in nb.cells if INJECTED_TAG not in c.get("metadata", {}).get("tags", [])]
+
+    injected = nbformat.v4.new_code_cell(parameters_source(parameters))
+    injected.metadata["tags"] = [INJECTED_TAG, "remove-cell"]
+    # Stable ids keep regenerated notebooks byte-identical
+    injected.id = "injected-parameters"
+
+    position = 0
+    for index, cell in enumerate(nb.cells):
+        if PARAMETERS_TAG in cell.get("metadata", {}).get("tags", []):
+            position = index + 1
+            break
+    nb.cells.insert(position, injected)
+
+    nb.metadata["tulip_parameters"] = {"key": key, "parameters": parameters}
+    return nb
+
+
+def _code_sources(nb) -> List[str]:
+    return [cell.source for cell in nb.cells if cell.cell_type == "code"]
+
+
+def materialize(run: MatrixRun) -> bool:
+    """
+    Write the notebook of a run unless its code is already up to date.
+
+    Markdown and metadata changes of the template are applied to an existing
+    output without clearing its outputs.
+
+    Returns:
+        True if the output's code changed (it needs executing)
+    """
+    import nbformat
+
+    with open(run.template, "r", encoding="utf-8") as f:
+        template_nb = nbformat.read(f, as_version=4)
+    nb = parameterize(template_nb, run.parameters, run.key)
+
+    if run.output.exists():
+        with open(run.output, "r", encoding="utf-8") as f:
+            current = nbformat.read(f, as_version=4)
+        if _code_sources(current) == _code_sources(nb):
+            # Same code: carry the executed outputs over to the refreshed cells
+            code_cells = iter(c for c in current.cells if c.cell_type == "code")
+            for cell in nb.cells:
+                if cell.cell_type == "code":
+                    previous = next(code_cells)
+                    cell.outputs = previous.outputs
+                    cell.execution_count = previous.execution_count
+            if json.dumps(nb, sort_keys=True) != json.dumps(current, sort_keys=True):
+                _write(nb, run.output)
+            return False
+
+    _write(nb, run.output)
+    return True
+
+
+def _write(nb, path: Path) -> None:
+    import nbformat
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        nbformat.write(nb, f)
+    os.replace(tmp_path, path)
@@ -0,0 +1,45 @@
+"""
+Default prelude imported by warm build kernels.
+
+The modules stay in ``sys.modules`` after the namespace is reset between
+notebooks, so each notebook's own imports become cache lookups instead of a
+cold import of pandas, plotly and the tulip data clients.
+"""
+
+import importlib
+import sys
+
+PRELUDE_MODULES = (
+    "pandas",
+    "numpy",
+    "plotly.graph_objects",
+    "plotly.offline",
+    "IPython.display",
+    "pycountry",
+    "tulip.core.collection",
+    "tulip.data.bloomberg",
+    "tulip.data.haver",
+    "tulip.data.gs",
+    "tulip.data.fred",
+    "tulip.plots",
+    "tulip.genai",
+    "tulip.analysis.country_related.analytics",
+    "tulip_mania_next.columns_framework",
+)
+
+LOADED = []
+FAILED = {}
+
+for _name in PRELUDE_MODULES:
+    try:
+        importlib.import_module(_name)
+        LOADED.append(_name)
+    except Exception as e:
+        FAILED[_name] = repr(e)
+
+if "pycountry" in LOADED:
+    try:
+        # pycountry parses its JSON database on the first lookup
+        sys.modules["pycountry"].countries.get(alpha_2="US")
+    except Exception as e:
+        FAILED["pycountry.countries"] = repr(e)
@@ -0,0 +1,170 @@
+"""
+Per-cell execution profiles for the notebook build.
+
+Records combine nbclient's cell timing metadata, the kernel-side cell probe in
+``kernel_probe`` (wall time and memory) and the size of each cell's outputs.
+They are appended to a JSONL file, one line per executed code cell.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+PROFILE_PATH = Path("_build") / "profile" / "cells.jsonl"
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def output_size(output: dict) -> Tuple[int, str]:
+    """
+    Serialized size of an output and its heaviest MIME type.
+
+    Returns:
+        Tuple of (bytes, mime type or output type)
+    """
+    total = len(json.dumps(output, ensure_ascii=False).encode("utf-8"))
+    data = output.get("data") or {}
+    if data:
+        sizes = {mime: len(json.dumps(value, ensure_ascii=False)) for mime, value in data.items()}
+        return total, max(sizes, key=sizes.get)
+    return total, output.get("output_type", "unknown")
+
+
+def cell_records(
+    nb,
+    notebook: str,
+    probe_records: Iterable[dict],
+    run_id: Optional[str] = None,
+) -> List[dict]:
+    """
+    Build profile records for the executed code cells of a notebook.
+
+    nbclient skips empty code cells, so probe records are matched in order to
+    the non-empty code cells.
+
+    Args:
+        nb: Executed notebook (dict-like)
+        notebook: Notebook path as reported in the profile
+        probe_records: Records returned by ``kernel_probe.collect_cell_probe``
+        run_id: Identifier of the build run
+
+    Returns:
+        List of JSON-serializable records
+    """
+    run_id = run_id or datetime.now().isoformat(timespec="seconds")
+    probes = iter(probe_records)
+    records = []
+
+    for index, cell in enumerate(nb["cells"]):
+        if cell.get("cell_type") != "code":
+            continue
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+        if not source.strip():
+            continue
+
+        probe = next(probes, None)
+        timing = cell.get("metadata", {}).get("execution", {})
+        started = _parse_timestamp(timing.get("iopub.execute_input"))
+        replied = _parse_timestamp(timing.get("shell.execute_reply"))
+
+        outputs = cell.get("outputs", [])
+        sizes = [output_size(output) for output in outputs]
+        heaviest = max(sizes, default=(0, None))
+
+        records.append({
+            "run_id": run_id,
+            "notebook": notebook,
+            "cell_index": index,
+            "source": source.strip().splitlines()[0][:80],
+            "client_s": (replied - started).total_seconds() if started and replied else None,
+            "wall_s": probe["wall_s"] if probe else None,
+            "rss_mb": probe["rss_mb"] if probe else None,
+            "rss_delta_mb": probe["rss_delta_mb"] if probe else None,
+            "peak_rss_delta_mb": probe["peak_rss_delta_mb"] if probe else None,
+            "output_bytes": sum(size for size, _ in sizes),
+            "output_count": len(outputs),
+            "largest_output_type": heaviest[1],
+        })
+
+    return records
+
+
+def append_profile(records: Iterable[dict], path: Union[str, Path] = PROFILE_PATH) -> None:
+    """Append records to the JSONL profile."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_profile(path: Union[str, Path] = PROFILE_PATH) -> List[dict]:
+    """
+    Load the latest record of every (notebook, cell) pair from the profile.
+
+    Later lines win, so a partial run (e.g. ``--only``) only replaces the
+    notebooks it executed.
+    """
+    latest: Dict[Tuple[str, int], dict] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            latest[(record["notebook"], record["cell_index"])] = record
+
+    # Drop cells of an older run of the same notebook (e.g. cells since removed)
+    last_run = {}
+    for record in latest.values():
+        last_run[record["notebook"]] = max(last_run.get(record["notebook"], ""), record["run_id"])
+    return [r for r in latest.values() if r["run_id"] == last_run[r["notebook"]]]
+
+
+def summarize_profile(records: List[dict], top: int = 15) -> List[str]:
+    """
+    Rank the slowest cells, the biggest outputs and the slowest notebooks.
+
+    Returns:
+        Report lines ready to be logged or printed
+    """
+
+    def seconds(record: dict) -> float:
+        return record["wall_s"] if record["wall_s"] is not None else (record["client_s"] or 0.0)
+
+    def where(record: dict) -> str:
+        return f"{record['notebook']} [cell {record['cell_index'] + 1}] {record['source']}"
+
+    lines = [f"Slowest {top} cells:"]
+    for record in sorted(records, key=seconds, reverse=True)[:top]:
+        memory = record["peak_rss_delta_mb"]
+        memory_str = f"{memory:+8.1f} MB peak" if memory is not None else " " * 16
+        lines.append(f"  {seconds(record):8.1f}s {memory_str}  {where(record)}")
+
+    lines.append(f"Biggest {top} outputs:")
+    for record in sorted(records, key=lambda r: r["output_bytes"], reverse=True)[:top]:
+        lines.append(
+            f"  {record['output_bytes'] / 2**20:8.2f} MB {str(record['largest_output_type']):<32} {where(record)}"
+        )
+
+    totals: Dict[str, List[float]] = {}
+    for record in records:
+        total = totals.setdefault(record["notebook"], [0.0, 0.0])
+        total[0] += seconds(record)
+        total[1] += record["output_bytes"]
+
+    lines.append("Notebooks by total cell time:")
+    for notebook, (total_s, total_bytes) in sorted(totals.items(), key=lambda item: -item[1][0]):
+        lines.append(f"  {total_s:8.1f}s {total_bytes / 2**20:8.2f} MB  {notebook}")
+
+    return lines
@@ -0,0 +1,245 @@
+"""
+Append-only run journal and retry policy for notebook execution.
+
+Every execution run appends to ``_build/.exec_cache/run_journal.jsonl``: a
+``start`` record with the run id and the notebooks selected, one ``result``
+record per notebook as soon as its outcome is known, and an ``end`` record
+with the totals when the run was not interrupted. Each line is flushed and
+fsynced before the build moves on, so a record survives Ctrl-C, a killed
+process or a host restart.
+
+A ``result`` of a successful notebook carries the sha256 of the notebook file
+as written. ``--resume`` continues the last run in the journal under its run
+id and skips the notebooks it completed whose file still has that hash, so a
+notebook edited since is executed again. Only a last run whose ``end``
+record shows every notebook succeeded is over; ``--resume`` then begins a new
+run instead.
+
+``RetryPolicy`` decides whether a failure is transient: its error message must
+match one of the patterns (timeouts, HTTP 429 and 5xx responses, dropped
+connections by default) and none of the non-retryable ones: a cell that hit
+the execution timeout would most likely hang as long again, so it is not
+retried. Such notebooks are executed again after an exponentially growing
+delay; the journal records every attempt.
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from tulip_mania_next.exec_cache import CACHE_DIR, _hash_file
+
+JOURNAL_PATH = CACHE_DIR / "run_journal.jsonl"
+
+_ANSI = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+
+# Matched case-insensitively against a notebook's error message, which includes
+# the failing cell's source, so they target exception text rather than keywords
+DEFAULT_RETRY_PATTERNS = (
+    r"(read|connect|pool)?timeout(error)?:|timed out",
+    r"too many requests|(status|http)\W{0,3}(code\W{0,3})?429\b",
+    r"\b5\d\d (server error|internal server error|bad gateway|service unavailable|gateway time-?out)",
+    r"(status|http)\W{0,3}(code\W{0,3})?5\d\d\b",
+    r"connection(reset|refused|aborted)?error|remotedisconnected|temporary failure in name resolution",
+)
+
+# Failures that are never retried, whatever else the message matches: nbclient's
+# cell timeout and the async engine's notebook deadline
+NON_RETRYABLE_PATTERNS = (
+    r"a cell timed out while it was being executed",
+    r"notebook deadline",
+)
+
+
+class RetryPolicy:
+    """
+    Which failures to retry, how often and after how long.
+
+    Args:
+        retries: Extra attempts per notebook (0 disables retrying)
+        patterns: Regular expressions of transient errors
+        never: Regular expressions of errors never retried, checked first
+        backoff: Seconds before the first retry
+        factor: Multiplier of the delay for every further retry
+        max_backoff: Upper bound of the delay in seconds
+    """
+
+    def __init__(
+        self,
+        retries: int = 2,
+        patterns: Sequence[str] = DEFAULT_RETRY_PATTERNS,
+        backoff: float = 30.0,
+        factor: float = 2.0,
+        max_backoff: float = 600.0,
+        never: Sequence[str] = NON_RETRYABLE_PATTERNS,
+    ):
+        self.retries = retries
+        self.patterns = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        self.never = [re.compile(pattern, re.IGNORECASE) for pattern in never]
+        self.backoff = backoff
+        self.factor = factor
+        self.max_backoff = max_backoff
+
+    def should_retry(self, error_msg: str, attempt: int) -> bool:
+        """Whether a notebook that failed on its ``attempt``-th try (from 1) should run again."""
+        if attempt > self.retries:
+            return False
+        if any(pattern.search(error_msg or "") for pattern in self.never):
+            return False
+        return any(pattern.search(error_msg or "") for pattern in self.patterns)
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to wait after the ``attempt``-th failed try."""
+        return min(self.max_backoff, self.backoff * self.factor ** (attempt - 1))
+
+
+def error_summary(error_msg: str) -> str:
+    """Last line of an error message (the exception) without terminal colors."""
+    lines = _ANSI.sub("", error_msg or "").strip().splitlines()
+    return lines[-1] if lines else ""
+
+
+def _relative(notebook_path: Path) -> str:
+    try:
+        return Path(notebook_path).resolve().relative_to(Path.cwd().resolve()).as_posix()
+    except ValueError:
+        return Path(notebook_path).resolve().as_posix()
+
+
+def _read(path: Path) -> List[dict]:
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A line torn by a crash mid-write
+                    continue
+    except OSError:
+        pass
+    return records
+
+
+class RunJournal:
+    """
+    Journal of one execution run.
+
+    Use ``RunJournal.start`` for a new run or ``RunJournal.resume`` to continue
+    the last one, and ``close`` when the run is over.
+
+    Args:
+        run_id: Identifier of the run
+        path: Journal file
+        completed: Notebooks (relative paths) the run completed, with their output hash
+        resumed: Whether this continues an earlier, interrupted run
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        path: Union[str, Path] = JOURNAL_PATH,
+        completed: Optional[Dict[str, str]] = None,
+        resumed: bool = False,
+    ):
+        self.run_id = run_id
+        self.resumed = resumed
+        self.path = Path(path)
+        self.completed: Dict[str, str] = dict(completed or {})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @classmethod
+    def start(cls, notebooks: List[Path], path: Union[str, Path] = JOURNAL_PATH) -> "RunJournal":
+        """Begin a new run."""
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S.%f}-{os.getpid()}"
+        journal = cls(run_id, path)
+        journal._append({"event": "start", "notebooks": [_relative(nb) for nb in notebooks]})
+        return journal
+
+    @classmethod
+    def resume(cls, notebooks: List[Path], path: Union[str, Path] = JOURNAL_PATH) -> "RunJournal":
+        """
+        Continue the last run in the journal, interrupted or finished with failures.
+
+        A new run begins if there is none, or if the last one ended with
+        every notebook successful.
+        """
+        records = _read(Path(path))
+        starts = [record for record in records if record.get("event") == "start"]
+        if not starts:
+            return cls.start(notebooks, path)
+
+        run_id = starts[-1]["run"]
+        ends = [record for record in records if record.get("run") == run_id and record.get("event") == "end"]
+        if ends and not ends[-1].get("failed"):
+            return cls.start(notebooks, path)
+        completed = {}
+        for record in records:
+            if record.get("run") == run_id and record.get("event") == "result":
+                if record.get("success"):
+                    completed[record["path"]] = record.get("output_hash")
+                else:
+                    completed.pop(record["path"], None)
+        journal = cls(run_id, path, completed, resumed=True)
+        journal._append({"event": "resume", "notebooks": [_relative(nb) for nb in notebooks]})
+        return journal
+
+    def _append(self, record: dict) -> None:
+        record = {"run": self.run_id, "time": datetime.now().isoformat(timespec="seconds"), **record}
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def is_completed(self, notebook_path: Path) -> bool:
+        """Whether this run completed the notebook and its file is unchanged since."""
+        expected = self.completed.get(_relative(notebook_path))
+        if not expected:
+            return False
+        try:
+            return _hash_file(Path(notebook_path)) == expected
+        except OSError:
+            return False
+
+    def remaining(self, notebooks: List[Path]) -> List[Path]:
+        """The notebooks this run has not completed yet."""
+        return [nb for nb in notebooks if not self.is_completed(nb)]
+
+    def record(
+        self,
+        notebook_path: Path,
+        success: bool,
+        error_msg: str = "",
+        stats: Optional[dict] = None,
+        attempt: int = 1,
+    ) -> None:
+        """Append the outcome of one attempt at a notebook."""
+        stats = stats or {}
+        output_hash = None
+        if success:
+            try:
+                output_hash = _hash_file(Path(notebook_path))
+            except OSError:
+                pass
+        record = {
+            "event": "result",
+            "path": _relative(notebook_path),
+            "success": success,
+            "attempt": attempt,
+            "elapsed": round(stats.get("elapsed", 0.0), 3),
+            "output_hash": output_hash,
+        }
+        if not success:
+            record["error"] = (error_msg or "")[:2000]
+        self._append(record)
+        if success and output_hash:
+            self.completed[record["path"]] = output_hash
+
+    def close(self, successful: Optional[int] = None, failed: Optional[int] = None) -> None:
+        """Append the totals (when the run finished) and close the file."""
+        if successful is not None:
+            self._append({"event": "end", "successful": successful, "failed": failed})
+        self._file.close()
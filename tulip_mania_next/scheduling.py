@@ -0,0 +1,145 @@
+"""
+Duration-aware scheduling for notebook execution.
+
+Per-notebook wall times are kept in a small JSON history store. Notebooks are
+then submitted longest-expected-first (LPT), which keeps a slow notebook from
+starting last and running on its own while the other workers sit idle. The
+same store keeps each notebook's peak kernel memory for admission control.
+"""
+
+import heapq
+import json
+import statistics
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+from tulip_mania_next.exec_cache import CACHE_DIR, atomic_write_json
+
+
+class DurationHistory:
+    """
+    History of notebook wall times keyed by path relative to the project root.
+
+    Each entry keeps an exponentially weighted mean of successful runs so a
+    single outlier does not dominate the estimate.
+
+    Args:
+        path: JSON file backing the store
+        alpha: Weight of the newest observation in the moving average
+        default_seconds: Estimate used when no notebook has any history yet
+        default_peak_mb: Peak memory assumed when no notebook has any history yet
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path] = CACHE_DIR / "durations.json",
+        alpha: float = 0.5,
+        default_seconds: float = 120.0,
+        default_peak_mb: float = 1024.0,
+        project_root: Optional[Path] = None,
+    ):
+        self.path = Path(path)
+        self.alpha = alpha
+        self.default_seconds = default_seconds
+        self.default_peak_mb = default_peak_mb
+        self.project_root = project_root or Path.cwd()
+        self.entries: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _key(self, notebook_path: Path) -> str:
+        try:
+            return Path(notebook_path).resolve().relative_to(self.project_root.resolve()).as_posix()
+        except ValueError:
+            return Path(notebook_path).resolve().as_posix()
+
+    def fallback(self) -> float:
+        """Estimate for notebooks without history: the median of known notebooks."""
+        known = [entry["mean"] for entry in self.entries.values() if "mean" in entry]
+        if known:
+            return statistics.median(known)
+        return self.default_seconds
+
+    def estimate(self, notebook_path: Path, fallback: Optional[float] = None) -> float:
+        """Expected wall time of a notebook in seconds."""
+        entry = self.entries.get(self._key(notebook_path))
+        if entry and "mean" in entry:
+            return entry["mean"]
+        return self.fallback() if fallback is None else fallback
+
+    def record(self, notebook_path: Path, seconds: float) -> None:
+        """Fold a successful run's wall time into the history (not persisted until ``save``)."""
+        key = self._key(notebook_path)
+        entry = self.entries.get(key, {})
+        if "mean" in entry:
+            entry["mean"] = self.alpha * seconds + (1 - self.alpha) * entry["mean"]
+        else:
+            entry["mean"] = seconds
+        entry["last"] = seconds
+        entry["runs"] = entry.get("runs", 0) + 1
+        entry["updated_at"] = datetime.now().isoformat(timespec="seconds")
+        self.entries[key] = entry
+
+    def peak_fallback(self) -> float:
+        """Peak memory assumed for notebooks without history: the largest known peak."""
+        known = [entry["peak_mb"] for entry in self.entries.values() if "peak_mb" in entry]
+        if known:
+            return max(known)
+        return self.default_peak_mb
+
+    def peak_mb(self, notebook_path: Path, fallback: Optional[float] = None) -> float:
+        """Expected peak kernel memory of a notebook in MB."""
+        entry = self.entries.get(self._key(notebook_path))
+        if entry and "peak_mb" in entry:
+            return entry["peak_mb"]
+        return self.peak_fallback() if fallback is None else fallback
+
+    def record_peak(self, notebook_path: Path, peak_mb: float) -> None:
+        """
+        Fold a run's peak kernel memory into the history (not persisted until ``save``).
+
+        A higher peak replaces the estimate outright, so admission never
+        plans with less than the last run needed; lower peaks are averaged in.
+        """
+        key = self._key(notebook_path)
+        entry = self.entries.get(key, {})
+        if "peak_mb" in entry:
+            peak_mb = max(peak_mb, self.alpha * peak_mb + (1 - self.alpha) * entry["peak_mb"])
+        entry["peak_mb"] = round(peak_mb, 1)
+        self.entries[key] = entry
+
+    def save(self) -> None:
+        """Persist the history atomically."""
+        atomic_write_json(self.path, self.entries)
+
+
+def order_longest_first(notebooks: Sequence[Path], history: DurationHistory) -> List[Path]:
+    """
+    Sort notebooks by expected wall time, longest first.
+
+    Ties keep path order so the schedule is deterministic.
+    """
+    fallback = history.fallback()
+    return sorted(notebooks, key=lambda nb: (-history.estimate(nb, fallback), str(nb)))
+
+
+def predict_makespan(durations: Sequence[float], workers: int) -> float:
+    """
+    Simulate list scheduling of ``durations`` (in submission order) on ``workers``.
+
+    Returns:
+        Expected wall time in seconds until the last notebook finishes
+    """
+    if not durations:
+        return 0.0
+    finish_times = [0.0] * max(1, min(workers, len(durations)))
+    for duration in durations:
+        start = heapq.heappop(finish_times)
+        heapq.heappush(finish_times, start + duration)
+    return max(finish_times)
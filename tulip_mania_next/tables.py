@@ -0,0 +1,229 @@
+"""
+HTML rendering of tables for column layouts.
+
+Cells are formatted one column at a time and the markup is assembled in a
+single join; styling comes from a shared stylesheet instead of a ``style``
+attribute on every cell. Tables longer than a row threshold are emitted as a
+compact JSON payload that a small script renders one page at a time.
+"""
+
+import json
+import uuid
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+TABLE_CSS = """
+.tmn-table { width: 100%; border-collapse: collapse; }
+.tmn-table th, .tmn-table td { border: 1px solid #ddd; padding: 8px; }
+.tmn-table th { background-color: #f2f2f2; }
+.tmn-table td.num, .tmn-table th.num { text-align: right; font-variant-numeric: tabular-nums; }
+.tmn-table-pager { display: flex; gap: 8px; align-items: center; margin: 6px 0; font-size: 0.9em; }
+"""
+
+# Renders the JSON payload of paged tables; idempotent so it can be emitted more than once
+TABLE_JS = """
+window.tmnTable = window.tmnTable || function (id) {
+    var root = document.getElementById(id);
+    if (!root || root.dataset.ready) return;
+    root.dataset.ready = "1";
+    var data = JSON.parse(root.querySelector("script[type='application/json']").textContent);
+    var pages = Math.max(1, Math.ceil(data.rows.length / data.page_size));
+    var page = 0;
+    var table = document.createElement("table");
+    table.className = "tmn-table";
+    if (data.headers) {
+        var head = table.createTHead().insertRow();
+        data.headers.forEach(function (text, i) {
+            var th = document.createElement("th");
+            th.innerHTML = text;
+            if (data.numeric[i]) th.className = "num";
+            head.appendChild(th);
+        });
+    }
+    var body = table.createTBody();
+    var pager = document.createElement("div");
+    pager.className = "tmn-table-pager";
+    var prev = document.createElement("button");
+    var next = document.createElement("button");
+    var label = document.createElement("span");
+    prev.textContent = "\\u2039";
+    next.textContent = "\\u203a";
+    pager.append(prev, label, next);
+    function show() {
+        var start = page * data.page_size;
+        var rows = data.rows.slice(start, start + data.page_size);
+        body.innerHTML = rows.map(function (row) {
+            return "<tr>" + row.map(function (cell, i) {
+                return (data.numeric[i] ? '<td class="num">' : "<td>") + cell + "</td>";
+            }).join("") + "</tr>";
+        }).join("");
+        label.textContent = "Rows " + (start + 1) + "\\u2013" + (start + rows.length) + " of " + data.rows.length;
+        prev.disabled = page === 0;
+        next.disabled = page >= pages - 1;
+    }
+    prev.onclick = function () { page = Math.max(0, page - 1); show(); };
+    next.onclick = function () { page = Math.min(pages - 1, page + 1); show(); };
+    root.append(table, pager);
+    show();
+};
+"""
+
+Formatter = Union[str, Callable]
+
+
+# format(value, spec) over a whole column in one ufunc call
+_FORMAT = np.frompyfunc(format, 2, 1)
+
+
+def _format_column(values: np.ndarray, fmt: Optional[Formatter], na_rep: str) -> List[str]:
+    """
+    Format the cells of one column.
+
+    ``fmt`` is a format spec (``",.2f"``), a format string (``"{:.1%}"``) or a
+    callable, applied to the whole column as a NumPy ufunc; without one,
+    numeric columns use NumPy's string conversion and datetimes pandas' (no
+    time of day when every value is midnight). Missing values become
+    ``na_rep`` without being passed to ``fmt``.
+    """
+    missing = None
+    if values.dtype.kind in "fcOM":
+        import pandas as pd
+
+        missing = np.asarray(pd.isna(values), dtype=bool)
+        if not missing.any():
+            missing = None
+
+    if fmt is None:
+        if values.dtype.kind in "iufb":
+            cells = values.astype(str)
+        elif values.dtype.kind == "M":
+            import pandas as pd
+
+            # As pandas prints them: dates alone when every value is midnight
+            cells = pd.Index(values).astype(str).to_numpy(dtype=object)
+        else:
+            cells = np.array([str(v) for v in values], dtype=object)
+    else:
+        if values.dtype.kind == "M":
+            import pandas as pd
+
+            # Timestamps rather than the integers datetime64[ns] converts to
+            items = pd.Index(values).astype(object).to_numpy()
+        else:
+            # Python scalars, as formatters expect
+            items = values.astype(object)
+        present = items if missing is None else items[~missing]
+        if callable(fmt):
+            formatted = np.frompyfunc(fmt, 1, 1)(present)
+        elif "{" in fmt:
+            formatted = np.frompyfunc(fmt.format, 1, 1)(present)
+        else:
+            formatted = _FORMAT(present, fmt)
+        if missing is None:
+            cells = formatted
+        else:
+            cells = np.full(len(values), na_rep, dtype=object)
+            cells[~missing] = formatted
+
+    if missing is not None:
+        cells = cells.astype(object)
+        cells[missing] = na_rep
+    return cells.tolist()
+
+
+def _normalize(data, headers: Optional[Sequence], index: bool) -> Tuple[Optional[List[str]], List[np.ndarray]]:
+    """Split a DataFrame or list of rows into headers and per-column arrays."""
+    if hasattr(data, "columns") and hasattr(data, "iloc"):
+        frame = data.reset_index() if index else data
+        if headers is None:
+            headers = [str(c) for c in frame.columns]
+        return headers, [frame.iloc[:, i].to_numpy() for i in range(frame.shape[1])]
+
+    rows = list(data)
+    width = max((len(row) for row in rows), default=len(headers or []))
+    columns = []
+    for i in range(width):
+        column = [row[i] if i < len(row) else "" for row in rows]
+        try:
+            array = np.asarray(column)
+        except ValueError:
+            array = np.asarray(column, dtype=object)
+        if array.dtype.kind not in "iufb":
+            array = np.asarray(column, dtype=object)
+        columns.append(array)
+    return (list(headers) if headers else None), columns
+
+
+def render_table(
+    data,
+    headers: Optional[Sequence] = None,
+    formats: Optional[Dict[str, Formatter]] = None,
+    index: bool = False,
+    na_rep: str = "",
+    max_rows: int = 500,
+    page_size: int = 50,
+) -> Tuple[str, List[str]]:
+    """
+    HTML of a table.
+
+    Args:
+        data: DataFrame or list of rows
+        headers: Column headers (defaults to the DataFrame's columns)
+        formats: Formatter per column header, or for every other numeric column
+            under the key ``"*"``
+        index: Include the DataFrame index as the first columns
+        na_rep: Text of missing values
+        max_rows: Tables with more rows are paged client side
+        page_size: Rows per page of a paged table
+
+    Returns:
+        Tuple of (html, page assets the HTML needs)
+    """
+    headers, columns = _normalize(data, headers, index)
+    formats = formats or {}
+    default_format = formats.get("*")
+    # Columns beyond the headers are still rendered, under their position
+    names = list(headers or []) + [str(i) for i in range(len(headers or []), len(columns))]
+
+    numeric = [bool(column.dtype.kind in "iuf") for column in columns]
+    cells = [
+        _format_column(column, formats.get(name, default_format if is_numeric else None), na_rep)
+        for name, column, is_numeric in zip(names, columns, numeric)
+    ]
+    n_rows = len(cells[0]) if cells else 0
+
+    if n_rows > max_rows:
+        table_id = f"tmn-table-{uuid.uuid4().hex[:8]}"
+        payload = {
+            "headers": [str(h) for h in headers] if headers else None,
+            "numeric": numeric,
+            "page_size": page_size,
+            "rows": [list(row) for row in zip(*cells)],
+        }
+        # "</" would end the script element early
+        text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).replace("</", "<\\/")
+        html = (
+            f'<div id="{table_id}" class="tmn-table-paged">'
+            f'<script type="application/json">{text}</script></div>'
+            f'<script>if (window.tmnTable) tmnTable("{table_id}");</script>'
+        )
+        return html, ["table.css", "table.js"]
+
+    # Per-column cell openings, so the row loop is a plain join
+    openings = ['<td class="num">' if is_numeric else "<td>" for is_numeric in numeric]
+    for i, opening in enumerate(openings):
+        cells[i] = [opening + cell for cell in cells[i]]
+
+    parts = ['<table class="tmn-table">']
+    if headers:
+        parts.append("<thead><tr>")
+        parts.extend(
+            f'<th class="num">{h}</th>' if is_numeric else f"<th>{h}</th>"
+            for h, is_numeric in zip(headers, numeric + [False] * (len(headers) - len(numeric)))
+        )
+        parts.append("</tr></thead>")
+    parts.append("<tbody>")
+    parts.extend(f"<tr>{'</td>'.join(row)}</td></tr>" for row in zip(*cells))
+    parts.append("</tbody></table>")
+    return "".join(parts), ["table.css"]
@@ -0,0 +1,173 @@
+"""
+Structured telemetry of a build run.
+
+``BuildTelemetry`` collects, for every executed notebook, the time it waited
+for a worker, the time its kernel took to start, its execution time, the peak
+resident memory of its kernel, the bytes written and whether it succeeded,
+plus the duration and outcome of the execute, check and build phases.
+
+At the end of the run it is written twice into one directory:
+
+- ``tulip_build.prom``: OpenMetrics text, replaced atomically, so a Prometheus
+  node-exporter textfile collector pointed at the directory scrapes a complete
+  file; every sample is a gauge of the last run
+- ``build_summary.json``: the same data for scripts and dashboards
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+
+from tulip_mania_next.exec_cache import atomic_write_json
+
+METRICS_DIR = Path("_build") / "metrics"
+PROM_FILE = "tulip_build.prom"
+SUMMARY_FILE = "build_summary.json"
+PREFIX = "tulip_build"
+
+# (entry key, metric name without prefix, help)
+NOTEBOOK_METRICS = (
+    ("queue_wait", "notebook_queue_wait_seconds", "Time the notebook waited for a worker"),
+    ("kernel_start", "notebook_kernel_start_seconds", "Time to start or acquire the notebook's kernel"),
+    ("execution", "notebook_execution_seconds", "Execution time of the notebook's cells"),
+    ("peak_rss_mb", "notebook_peak_rss_bytes", "Peak resident memory of the notebook's kernel"),
+    ("bytes_written", "notebook_written_bytes", "Bytes written back (0 when the outputs were unchanged)"),
+    ("success", "notebook_success", "Whether the notebook executed without errors"),
+    ("attempts", "notebook_attempts", "Executions of the notebook, including retries"),
+)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+class BuildTelemetry:
+    """Metrics of one build run; see the module docstring."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.notebooks: Dict[str, dict] = {}
+        self.phases: Dict[str, dict] = {}
+
+    def record_notebook(self, notebook_path: Path, success: bool, stats: dict, attempts: int = 1) -> None:
+        """Record the final outcome of a notebook from its ``execute_notebook`` stats."""
+        try:
+            key = Path(notebook_path).resolve().relative_to(Path.cwd().resolve()).as_posix()
+        except ValueError:
+            key = Path(notebook_path).resolve().as_posix()
+        elapsed = stats.get("elapsed", 0.0)
+        entry = {
+            "success": success,
+            "attempts": attempts,
+            "execution": max(0.0, elapsed - stats.get("kernel_start", 0.0)),
+        }
+        for name in ("queue_wait", "kernel_start", "peak_rss_mb", "bytes_written"):
+            if stats.get(name) is not None:
+                entry[name] = stats[name]
+        self.notebooks[key] = entry
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[dict]:
+        """
+        Time a phase of the build.
+
+        The yielded dict takes the phase's outcome (``success``, counts); a
+        phase left by an exception is recorded as failed.
+        """
+        record: dict = {}
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record["success"] = False
+            raise
+        else:
+            record.setdefault("success", True)
+        finally:
+            record["duration_seconds"] = time.perf_counter() - start
+            self.phases[name] = record
+
+    def summary(self) -> dict:
+        """The run as a JSON-serializable dict."""
+        succeeded = sum(entry["success"] for entry in self.notebooks.values())
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "duration_seconds": time.time() - self.started_at,
+            "phases": self.phases,
+            "notebooks": self.notebooks,
+            "totals": {
+                "notebooks": len(self.notebooks),
+                "successful": succeeded,
+                "failed": len(self.notebooks) - succeeded,
+                "execution_seconds": sum(entry["execution"] for entry in self.notebooks.values()),
+                "bytes_written": sum(entry.get("bytes_written", 0) for entry in self.notebooks.values()),
+            },
+        }
+
+    def openmetrics(self) -> str:
+        """The run in the OpenMetrics text format."""
+        lines: List[str] = []
+
+        def family(name: str, help_text: str, samples: List[Tuple[str, float]]) -> None:
+            if not samples:
+                return
+            lines.append(f"# TYPE {PREFIX}_{name} gauge")
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.extend(f"{PREFIX}_{name}{labels} {_number(value)}" for labels, value in samples)
+
+        for key, name, help_text in NOTEBOOK_METRICS:
+            samples = []
+            for path, entry in sorted(self.notebooks.items()):
+                if key not in entry:
+                    continue
+                value = entry[key]
+                if key == "peak_rss_mb":
+                    value = int(value * 2**20)
+                samples.append((f'{{notebook="{_label(path)}"}}', value))
+            family(name, help_text, samples)
+
+        family("phase_duration_seconds", "Duration of the build phase", [
+            (f'{{phase="{_label(phase)}"}}', record["duration_seconds"]) for phase, record in self.phases.items()
+        ])
+        family("phase_success", "Whether the build phase succeeded", [
+            (f'{{phase="{_label(phase)}"}}', int(bool(record.get("success")))) for phase, record in self.phases.items()
+        ])
+        family("phase_notebooks", "Notebooks of the build phase by outcome", [
+            (f'{{phase="{_label(phase)}",outcome="{_label(outcome)}"}}', value)
+            for phase, record in self.phases.items()
+            for outcome, value in record.items()
+            if outcome not in ("success", "duration_seconds") and isinstance(value, int)
+        ])
+        family("last_run_timestamp_seconds", "Start of the last build run", [("", self.started_at)])
+        family("last_run_duration_seconds", "Duration of the last build run", [("", time.time() - self.started_at)])
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Union[str, Path] = METRICS_DIR) -> Tuple[Path, Path]:
+        """
+        Write the OpenMetrics textfile and the JSON summary.
+
+        Returns:
+            Tuple of (textfile path, summary path)
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        prom_path = directory / PROM_FILE
+        # The collector must never read a half-written file
+        tmp_path = directory / f".{PROM_FILE}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.openmetrics())
+        os.replace(tmp_path, prom_path)
+
+        summary_path = directory / SUMMARY_FILE
+        atomic_write_json(summary_path, self.summary())
+        return prom_path, summary_path